@@ -3,14 +3,21 @@ Implementación de A* con gestión de batería para vehículos eléctricos.
 Versión optimizada SIN visualización para benchmarking y comparaciones.
 """
 
-import heapq
 import time
+from time import perf_counter_ns
 from typing import Dict, List, Optional, Set, Tuple
 
+from algorithms.heuristic_table import NodeHeuristic
+from algorithms.priority_queues import make_priority_queue, queue_counters
+from algorithms.search_context import SearchContext
+from algorithms.search_profile import ProfiledQueue
+from graph.compiled_graph import CompiledGraph, min_energy_edge
 from utils.helpers import (
+    BATTERY_STEP,
+    battery_to_units,
     count_recharges,
-    discretize_battery,
     euclidean_distance,
+    reconstruct_packed_path,
     reconstruct_path,
     reconstruct_path_with_battery,
 )
@@ -27,12 +34,18 @@ def astar_battery(
     recharge_amount: float = 80.0,
     heuristic_func=None,
     return_battery_info: bool = False,  # <-- NUEVO PARÁMETRO
+    stats: Optional[Dict] = None,
+    battery_step: float = BATTERY_STEP,
+    queue="heapq",
+    profile: bool = False,
 ) -> Optional[Tuple[List[int], float, int, int, float]]:
     """
     Algoritmo A* con gestión de batería para vehículos eléctricos.
 
     El estado se representa como (nodo, batería_restante), permitiendo múltiples
-    visitas al mismo nodo con diferentes niveles de batería.
+    visitas al mismo nodo con diferentes niveles de batería. La batería se
+    guarda como un entero de unidades de battery_step kWh: al cruzar una
+    arista se redondea a la unidad más cercana.
 
     Args:
         G: Grafo de NetworkX con atributo 'energy_cost' en las aristas
@@ -43,6 +56,22 @@ def astar_battery(
         gamma_min: Consumo mínimo de energía por km para heurística (kWh/km)
         charger_nodes: Lista de nodos donde hay cargadores
         recharge_amount: Cantidad de energía recargada en cada estación (kWh)
+        stats: Diccionario opcional donde se dejan los contadores de la
+            búsqueda (nodes_expanded, heap_pushes, heap_pops, heap_peak,
+            heuristic_evaluations)
+        battery_step: Tamaño de la unidad de batería (kWh)
+        queue: Cola de prioridad de la lista abierta ("heapq", "indexed",
+            "binary", "bucket" o una fábrica; ver algorithms/priority_queues.py).
+            Todas devuelven el mismo camino; "bucket" necesita una
+            heurística consistente (f no decreciente).
+        profile: Si True (y se pasa stats), agrega a stats los contadores de
+            algorithms/search_profile.py: stale_pops, recharge_states,
+            states_stored y el tiempo de expansión y de
+            reconstrucción en nanosegundos. Sin profile la búsqueda no paga
+            nada por la instrumentación.
+
+    G también puede ser un CompiledGraph (ver graph.compiled_graph); en ese caso
+    la búsqueda recorre los arreglos CSR y devuelve exactamente el mismo camino.
 
     Returns:
         Si return_battery_info=False:
@@ -62,7 +91,26 @@ def astar_battery(
     if heuristic_func is None:
         heuristic_func = euclidean_distance
 
-    start_time = time.time()
+    if isinstance(G, CompiledGraph):
+        return _astar_battery_compiled(
+            G,
+            orig,
+            dest,
+            max_capacity,
+            initial_charge,
+            gamma_min,
+            charger_nodes,
+            recharge_amount,
+            heuristic_func,
+            return_battery_info,
+            stats,
+            battery_step,
+            queue,
+            profile,
+        )
+
+    start_time = time.perf_counter()
+    profile = profile and stats is not None
 
     if charger_nodes is None:
         charger_nodes = []
@@ -70,35 +118,35 @@ def astar_battery(
     # Se genera un set para poder hacer búsquedas de O(1)
     charger_set = set(charger_nodes)
 
-    # Estado: (nodo, batería_discretizada)
-    initial_state = (orig, discretize_battery(initial_charge))
+    # Capacidad y recarga expresadas en unidades de batería
+    capacity_units = max_capacity / battery_step
+    recharge_units = recharge_amount / battery_step
+
+    # Estado: (nodo, unidades_de_batería)
+    initial_state = (orig, battery_to_units(initial_charge, battery_step))
 
     # g_score: costo energético acumulado desde el origen
-    g_score: Dict[Tuple[int, float], float] = {initial_state: 0.0} # En el estado inicial es costo acumulado es 0
+    g_score: Dict[Tuple[int, int], float] = {initial_state: 0.0} # En el estado inicial es costo acumulado es 0
     
-    # f_score: g + heurística
-    f_score: Dict[Tuple[int, float], float] = {
-        initial_state: heuristic_func(G, orig, dest) * gamma_min
-    }
-
     # Para reconstruir el camino
-    came_from: Dict[Tuple[int, float], Tuple[int, float]] = {}
+    came_from: Dict[Tuple[int, int], Tuple[int, int]] = {}
 
-    # Mejor batería alcanzada por nodo (para optimización)
-    best_battery_at_node: Dict[int, float] = {orig: initial_charge}
+    # h de cada nodo ya calculada: un nodo aparece con muchos niveles de batería
+    h_cache: Dict[int, float] = {orig: heuristic_func(G, orig, dest) * gamma_min}
 
-    # Cola de prioridad: (f_score, contador, estado)
-    counter = 0 # El contador se utiliza para desempatar cuando dos estados tienen el mismo f_score
-    pq = [(f_score[initial_state], counter, initial_state)]
-    counter += 1
+    # Cola de prioridad por f_score (los empates salen por orden de llegada)
+    pq = make_priority_queue(queue)
+    if profile:
+        pq = ProfiledQueue(pq, tuple)
+    pq.push(initial_state, h_cache[orig])
 
     # Estados visitados (completamente explorados)
-    visited: Set[Tuple[int, float]] = set()
+    visited: Set[Tuple[int, int]] = set()
 
     nodes_expanded = 0
 
     while pq:
-        current_f, _, current_state = heapq.heappop(pq)
+        current_f, current_state = pq.pop()
         current_node, current_battery = current_state
 
         # Si ya fue visitado, continuar
@@ -110,24 +158,39 @@ def astar_battery(
 
         # Si llegamos al destino
         if current_node == dest:
-            # Reconstruir camino
+            if profile:
+                found_ns = perf_counter_ns()
+
+            # Reconstruir camino (la batería se devuelve en kWh)
             if return_battery_info:
-                path = reconstruct_path_with_battery(came_from, current_state, charger_set)
+                path = [
+                    (node, units * battery_step, recharged)
+                    for node, units, recharged in reconstruct_path_with_battery(
+                        came_from, current_state, charger_set
+                    )
+                ]
             else:
                 path = reconstruct_path(came_from, current_state)
             
             energy_total = g_score[current_state]
             num_recharges = count_recharges(came_from, current_state, charger_set)
-            execution_time = time.time() - start_time
+            execution_time = time.perf_counter() - start_time
+
+            if stats is not None:
+                stats.update(
+                    nodes_expanded=nodes_expanded,
+                    heuristic_evaluations=len(h_cache),
+                    **queue_counters(pq),
+                )
+                if profile:
+                    stats.update(pq.counters(nodes_expanded, found_ns))
 
             return (path, energy_total, nodes_expanded, num_recharges, execution_time)
 
         # Expandir vecinos
         for neighbor in G.neighbors(current_node):
-            # Obtener costo energético de la arista
-            edge_data = G.get_edge_data(
-                current_node, neighbor, 0
-            )  # Key 0 para MultiDiGraph
+            # Obtener costo energético de la arista (la paralela de menor energía)
+            _, edge_data = min_energy_edge(G.adj[current_node][neighbor])
             # Usar energy_cost si está disponible, sino calcular con distancia
             if edge_data and "energy_cost" in edge_data:
                 energy_cost = edge_data["energy_cost"]
@@ -136,12 +199,13 @@ def astar_battery(
                 distance = euclidean_distance(G, current_node, neighbor)
                 energy_cost = distance * gamma_min
 
+            cost_units = energy_cost / battery_step
+
             # Verificar si hay suficiente batería para llegar al vecino
-            if current_battery >= energy_cost:
-                new_battery = current_battery - energy_cost
-                new_battery_disc = discretize_battery(new_battery)
+            if current_battery >= cost_units:
+                new_battery = int(current_battery - cost_units + 0.5)
 
-                neighbor_state = (neighbor, new_battery_disc)
+                neighbor_state = (neighbor, new_battery)
                 tentative_g = g_score[current_state] + energy_cost
 
                 # Si el estado vecino no se conocía o Si encontramos un camino mejor (menor g) hacia él entonces acutalizamos
@@ -154,31 +218,21 @@ def astar_battery(
                     g_score[neighbor_state] = tentative_g
 
                     # Heurística: distancia * consumo mínimo
-                    h = heuristic_func(G, neighbor, dest) * gamma_min
-                    f_score[neighbor_state] = tentative_g + h
-
-                    heapq.heappush(
-                        pq, (f_score[neighbor_state], counter, neighbor_state)
-                    )
-                    counter += 1
+                    h = h_cache.get(neighbor)
+                    if h is None:
+                        h = h_cache[neighbor] = heuristic_func(G, neighbor, dest) * gamma_min
 
-                    # Actualizar mejor batería en este nodo
-                    if (
-                        neighbor not in best_battery_at_node
-                        or new_battery > best_battery_at_node[neighbor]
-                    ):
-                        best_battery_at_node[neighbor] = new_battery
+                    pq.push(neighbor_state, tentative_g + h)
 
         # Si el nodo actual es un cargador, SIEMPRE generar estado con batería recargada
         # Esto asegura que el algoritmo considere recargas incluso con batería alta
         if current_node in charger_set:
             # Recargar batería (incluso si ya está casi llena)
-            recharged_battery = min(max_capacity, current_battery + recharge_amount)
-            recharged_battery_disc = discretize_battery(recharged_battery)
+            recharged_battery = int(min(capacity_units, current_battery + recharge_units) + 0.5)
 
             # Solo generar estado de recarga si realmente recarga algo significativo
-            if recharged_battery_disc > current_battery:
-                recharged_state = (current_node, recharged_battery_disc)
+            if recharged_battery > current_battery:
+                recharged_state = (current_node, recharged_battery)
 
                 # El costo de recargar es 0 en términos de energía consumida del vehículo
                 # (asumimos que la recarga es externa)
@@ -189,12 +243,221 @@ def astar_battery(
                     came_from[recharged_state] = current_state
                     g_score[recharged_state] = tentative_g
 
-                    h = heuristic_func(G, current_node, dest) * gamma_min
-                    f_score[recharged_state] = tentative_g + h
+                    # El nodo ya se encoló antes: su h está en h_cache
+                    h = h_cache[current_node]
 
-                    heapq.heappush(pq, (f_score[recharged_state], counter, recharged_state))
-                    counter += 1
+                    pq.push(recharged_state, tentative_g + h)
 
     # No se encontró camino
-    execution_time = time.time() - start_time
+    execution_time = time.perf_counter() - start_time
+    if stats is not None:
+        stats.update(
+            nodes_expanded=nodes_expanded,
+            heuristic_evaluations=len(h_cache),
+            **queue_counters(pq),
+        )
+        if profile:
+            stats.update(pq.counters(nodes_expanded))
+    return None
+
+
+def _astar_battery_compiled(
+    G: CompiledGraph,
+    orig: int,
+    dest: int,
+    max_capacity: float,
+    initial_charge: float,
+    gamma_min: float,
+    charger_nodes: Optional[List[int]],
+    recharge_amount: float,
+    heuristic_func,
+    return_battery_info: bool,
+    stats: Optional[Dict],
+    battery_step: float,
+    queue,
+    profile: bool,
+) -> Optional[Tuple[List, float, int, int, float]]:
+    """
+    Misma búsqueda que astar_battery pero sobre un CompiledGraph.
+
+    Arma el SearchContext de la consulta y llama a astar_search con la
+    heurística memorizada por nodo (algorithms/heuristic_table.py).
+    """
+    start_time = time.perf_counter()
+
+    context = SearchContext(G, charger_nodes)
+    node_heuristic = NodeHeuristic(heuristic_func, G, dest, gamma_min)
+
+    result = astar_search(
+        context,
+        G.node_index[orig],
+        G.node_index[dest],
+        max_capacity,
+        initial_charge,
+        gamma_min,
+        recharge_amount,
+        node_heuristic.lookup,
+        return_battery_info,
+        stats,
+        battery_step,
+        queue,
+        start_time,
+        profile,
+    )
+    if stats is not None:
+        stats["heuristic_evaluations"] = node_heuristic.evaluations()
+    return result
+
+
+def astar_search(
+    context: SearchContext,
+    orig_i: int,
+    dest_i: int,
+    max_capacity: float,
+    initial_charge: float,
+    gamma_min: float,
+    recharge_amount: float,
+    heuristic,
+    return_battery_info: bool = False,
+    stats: Optional[Dict] = None,
+    battery_step: float = BATTERY_STEP,
+    queue="heapq",
+    start_time: Optional[float] = None,
+    profile: bool = False,
+) -> Optional[Tuple[List, float, int, int, float]]:
+    """
+    Núcleo de A* sobre un SearchContext (índices internos, no IDs).
+
+    Cada estado es un único entero, índice_nodo * levels + unidades, y
+    g_score / came_from / visited viven en el StateStore del contexto, que
+    se reutiliza entre consultas. El orden de expansión y el desempate son
+    idénticos a la versión sobre NetworkX, por lo que el camino devuelto es
+    el mismo.
+
+    Args:
+        context: Grafo compilado, cargadores y StateStore
+        orig_i: Índice del nodo origen
+        dest_i: Índice del nodo destino
+        heuristic: heuristic(índice_nodo) -> cota inferior en kWh (ya
+            multiplicada por gamma_min)
+        start_time: Inicio de la consulta (time.perf_counter()), si empezó antes
+        profile: Instrumentar la búsqueda (ver astar_battery)
+
+    Returns:
+        Lo mismo que astar_battery
+    """
+    if start_time is None:
+        start_time = time.perf_counter()
+    profile = profile and stats is not None
+
+    G = context.graph
+    adjacency = context.adjacency
+    node_ids = context.node_ids
+    charger_set = context.charger_set
+    is_charger = context.is_charger
+
+    capacity_units = max_capacity / battery_step
+    recharge_units = recharge_amount / battery_step
+
+    initial_units = battery_to_units(initial_charge, battery_step)
+    # Unidades posibles: 0..levels-1 (ninguna recarga supera la capacidad)
+    levels = max(initial_units, battery_to_units(max_capacity, battery_step)) + 1
+    num_states = G.num_nodes * levels
+
+    initial_state = orig_i * levels + initial_units
+
+    store = context.store
+    generation = store.reset(num_states)
+    g_score = store.g
+    came_from = store.parent
+    seen = store.seen
+    closed = store.closed
+
+    g_score[initial_state] = 0.0
+    came_from[initial_state] = -1
+    seen[initial_state] = generation
+
+    pq = make_priority_queue(queue)
+    if profile:
+        pq = ProfiledQueue(pq, lambda state: divmod(state, levels))
+    pq.push(initial_state, heuristic(orig_i))
+
+    nodes_expanded = 0
+
+    while pq:
+        current_f, current_state = pq.pop()
+
+        if closed[current_state] == generation:
+            continue
+
+        closed[current_state] = generation
+        nodes_expanded += 1
+
+        current_node, current_battery = divmod(current_state, levels)
+
+        if current_node == dest_i:
+            if profile:
+                found_ns = perf_counter_ns()
+
+            steps = reconstruct_packed_path(came_from, current_state, levels, charger_set)
+            if return_battery_info:
+                path = [
+                    (node_ids[node], units * battery_step, recharged)
+                    for node, units, recharged in steps
+                ]
+            else:
+                path = []
+                for node, _, _ in steps:
+                    if not path or path[-1] != node_ids[node]:
+                        path.append(node_ids[node])
+
+            energy_total = g_score[current_state]
+            num_recharges = sum(1 for _, _, recharged in steps if recharged)
+            execution_time = time.perf_counter() - start_time
+
+            if stats is not None:
+                stats.update(nodes_expanded=nodes_expanded, **queue_counters(pq))
+                if profile:
+                    stats.update(pq.counters(nodes_expanded, found_ns))
+
+            return (path, energy_total, nodes_expanded, num_recharges, execution_time)
+
+        current_g = g_score[current_state]
+
+        for neighbor, energy_cost in adjacency[current_node]:
+            # NaN = la arista no tenía energy_cost: mismo fallback que en NetworkX
+            if energy_cost != energy_cost:
+                distance = euclidean_distance(G, node_ids[current_node], node_ids[neighbor])
+                energy_cost = distance * gamma_min
+
+            cost_units = energy_cost / battery_step
+
+            if current_battery >= cost_units:
+                neighbor_state = neighbor * levels + int(current_battery - cost_units + 0.5)
+                tentative_g = current_g + energy_cost
+
+                if seen[neighbor_state] != generation or tentative_g < g_score[neighbor_state]:
+                    seen[neighbor_state] = generation
+                    came_from[neighbor_state] = current_state
+                    g_score[neighbor_state] = tentative_g
+
+                    pq.push(neighbor_state, tentative_g + heuristic(neighbor))
+
+        if is_charger[current_node]:
+            recharged_battery = int(min(capacity_units, current_battery + recharge_units) + 0.5)
+
+            if recharged_battery > current_battery:
+                recharged_state = current_node * levels + recharged_battery
+
+                if seen[recharged_state] != generation or current_g < g_score[recharged_state]:
+                    seen[recharged_state] = generation
+                    came_from[recharged_state] = current_state
+                    g_score[recharged_state] = current_g
+                    pq.push(recharged_state, current_g + heuristic(current_node))
+
+    if stats is not None:
+        stats.update(nodes_expanded=nodes_expanded, **queue_counters(pq))
+        if profile:
+            stats.update(pq.counters(nodes_expanded))
     return None
+
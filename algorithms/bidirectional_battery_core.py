@@ -0,0 +1,438 @@
+"""
+A* bidireccional con gestión de batería.
+
+astar_battery busca solo hacia adelante desde el origen. Acá corren dos
+búsquedas a la vez:
+
+- Hacia adelante, desde el origen, sobre estados (nodo, batería) como en
+  astar_battery (con frentes de Pareto como pareto_battery).
+- Hacia atrás, desde el destino, sobre etiquetas (nodo, batería requerida):
+  "desde este nodo, con al menos estas unidades de batería, se llega al
+  destino gastando e kWh". Cada nodo guarda un frente de Pareto de
+  (batería requerida, energía) y una etiqueta domina a otra si pide menos
+  batería y gasta menos.
+
+Al cruzar una arista u -> v hacia atrás, la batería requerida en u es la
+mínima cantidad entera de unidades b con b >= costo y redondeo(b - costo)
+>= requerida en v, es decir, exactamente la condición de astar_battery. En
+un cargador, la etiqueta nueva pide la batería mínima desde la que recargar
+(mismo redondeo y tope de capacidad) deja la requerida.
+
+Las búsquedas se encuentran cuando un estado (v, b) hacia adelante y una
+etiqueta (v, r) hacia atrás cumplen b >= r: hay una ruta de energía g + e.
+Se corta cuando la clave mínima de cualquiera de las dos colas ya no puede
+mejorar la mejor ruta encontrada, así que con heurísticas consistentes la
+energía es la misma que la de astar_battery.
+"""
+
+import heapq
+import time
+from typing import Dict, List, Optional, Tuple
+
+from algorithms.state_store import get_state_store
+from graph.compiled_graph import get_compiled_graph
+from utils.helpers import (
+    BATTERY_STEP,
+    battery_to_units,
+    euclidean_distance,
+    reconstruct_packed_path,
+)
+
+
+def _min_units_before_edge(required: int, cost_units: float) -> int:
+    """
+    Unidades mínimas desde las que se cruza una arista y se llega con al
+    menos required (mismas cuentas que astar_battery).
+    """
+    units = max(0, int(required + cost_units) - 1)
+    while units < cost_units or int(units - cost_units + 0.5) < required:
+        units += 1
+    return units
+
+
+def _min_units_before_recharge(
+    required: int, capacity_units: float, recharge_units: float
+) -> Optional[int]:
+    """
+    Unidades mínimas desde las que una recarga deja al menos required, o
+    None si ni con la batería llena se llega.
+    """
+    if int(capacity_units + 0.5) < required:
+        return None
+    units = max(0, int(required - recharge_units) - 1)
+    while int(min(capacity_units, units + recharge_units) + 0.5) < required:
+        units += 1
+    return units
+
+
+def _add_label(
+    fronts: Dict[int, List[Tuple[int, float]]],
+    superseded,
+    generation: int,
+    levels: int,
+    node: int,
+    battery: int,
+    energy: float,
+    more_is_better: bool,
+) -> bool:
+    """
+    Agrega (batería, energía) al frente de Pareto del nodo; False si está dominada.
+
+    Hacia adelante conviene más batería (more_is_better=True); hacia atrás,
+    pedir menos batería. Las etiquetas eliminadas se sellan en superseded
+    con la generación de la consulta.
+    """
+    front = fronts.get(node)
+    if front is None:
+        fronts[node] = [(battery, energy)]
+        return True
+
+    sign = 1 if more_is_better else -1
+    for front_battery, front_energy in front:
+        if sign * front_battery >= sign * battery and front_energy <= energy:
+            return False
+
+    kept = []
+    for front_battery, front_energy in front:
+        if sign * front_battery <= sign * battery and front_energy >= energy:
+            superseded[node * levels + front_battery] = generation
+        else:
+            kept.append((front_battery, front_energy))
+    kept.append((battery, energy))
+    fronts[node] = kept
+    superseded[node * levels + battery] = 0
+    return True
+
+
+def bidirectional_astar_battery(
+    G,
+    orig: int,
+    dest: int,
+    max_capacity: float = 100.0,
+    initial_charge: float = 100.0,
+    gamma_min: float = 0.15,
+    charger_nodes: Optional[List[int]] = None,
+    recharge_amount: float = 80.0,
+    heuristic_func=None,
+    return_battery_info: bool = False,
+    stats: Optional[Dict] = None,
+    reverse_heuristic_func=None,
+    battery_step: float = BATTERY_STEP,
+) -> Optional[Tuple[List, float, int, int, float]]:
+    """
+    A* bidireccional con gestión de batería.
+
+    Mismos parámetros y valor de retorno que astar_battery; nodos_expandidos
+    es la suma de las expansiones de las dos búsquedas.
+
+    Args:
+        heuristic_func: Cota hacia el destino, h(G, nodo, dest), para la
+            búsqueda hacia adelante
+        reverse_heuristic_func: Cota de la energía desde el origen hasta el
+            nodo para la búsqueda hacia atrás; se llama como h(G, nodo, orig),
+            así que una heurística geométrica (simétrica) sirve tal cual. Las
+            que precalculan por destino (utils/metric_heuristics.py) necesitan
+            una instancia propia. Por defecto, euclidean_distance
+        stats: Diccionario opcional donde se dejan los contadores:
+            nodes_expanded, nodes_expanded_forward, nodes_expanded_backward,
+            heap_pushes y labels_dominated
+        battery_step: Tamaño de la unidad de batería (kWh)
+
+    Returns:
+        Tupla (camino, energia_total, nodos_expandidos, num_recargas, tiempo_ejecucion),
+        con camino_con_bateria si return_battery_info=True, o None si no hay
+        camino viable.
+    """
+    if heuristic_func is None:
+        heuristic_func = euclidean_distance
+    if reverse_heuristic_func is None:
+        reverse_heuristic_func = euclidean_distance
+
+    start_time = time.perf_counter()
+
+    compiled = get_compiled_graph(G)
+    adjacency = compiled.adjacency()
+    reverse_adjacency = compiled.reverse_adjacency()
+    node_ids = compiled.node_ids_list
+
+    if charger_nodes is None:
+        charger_nodes = []
+
+    charger_set = {compiled.node_index[n] for n in charger_nodes if n in compiled.node_index}
+
+    orig_i = compiled.node_index[orig]
+    dest_i = compiled.node_index[dest]
+
+    capacity_units = max_capacity / battery_step
+    recharge_units = recharge_amount / battery_step
+
+    # Estados y etiquetas empaquetados: índice_nodo * levels + unidades.
+    # Ninguna batería del lado de adelante supera levels - 1
+    initial_units = battery_to_units(initial_charge, battery_step)
+    levels = max(initial_units, battery_to_units(max_capacity, battery_step)) + 1
+    max_units = levels - 1
+    num_states = compiled.num_nodes * levels
+
+    initial_state = orig_i * levels + initial_units
+    final_label = dest_i * levels
+
+    def edge_energy(u: int, v: int, energy_cost: float) -> float:
+        # NaN = la arista no tenía energy_cost: mismo fallback que astar_battery
+        if energy_cost != energy_cost:
+            return euclidean_distance(G, node_ids[u], node_ids[v]) * gamma_min
+        return energy_cost
+
+    # ---- Hacia adelante: estados (nodo, batería) ----
+    # Arreglos en StateStore compartidos (ver algorithms/state_store.py): solo
+    # se leen estados que entraron al frente en esta consulta
+    forward_store = get_state_store()
+    forward_generation = forward_store.reset(num_states)
+    g_score = forward_store.g
+    came_from = forward_store.parent
+    forward_superseded = forward_store.dropped
+    forward_visited = forward_store.closed
+    forward_fronts: Dict[int, List[Tuple[int, float]]] = {orig_i: [(initial_units, 0.0)]}
+    forward_closed: Dict[int, List[Tuple[int, float]]] = {orig_i: [(initial_units, 0.0)]}
+    g_score[initial_state] = 0.0
+    came_from[initial_state] = -1
+
+    # ---- Hacia atrás: etiquetas (nodo, batería requerida) ----
+    # next_label[etiqueta] = etiqueta siguiente; next_cost = costo de la
+    # arista, o -1 si la transición es una recarga
+    backward_store = get_state_store("backward")
+    backward_generation = backward_store.reset(num_states)
+    e_score = backward_store.g
+    next_label = backward_store.parent
+    next_cost = backward_store.aux
+    backward_superseded = backward_store.dropped
+    backward_visited = backward_store.closed
+    backward_fronts: Dict[int, List[Tuple[int, float]]] = {dest_i: [(0, 0.0)]}
+    backward_closed: Dict[int, List[Tuple[int, float]]] = {dest_i: [(0, 0.0)]}
+    e_score[final_label] = 0.0
+
+    forward_counter = 0
+    forward_pq = [(heuristic_func(G, orig, dest) * gamma_min, forward_counter, initial_state)]
+    forward_counter += 1
+
+    backward_counter = 0
+    backward_pq = [
+        (reverse_heuristic_func(G, dest, orig) * gamma_min, backward_counter, final_label)
+    ]
+    backward_counter += 1
+
+    best_energy = float("inf")
+    meeting: Optional[Tuple[int, int]] = None
+
+    forward_expanded = 0
+    backward_expanded = 0
+    labels_dominated = 0
+
+    # Las claves mínimas son cotas inferiores de cualquier ruta que falte
+    # encontrar en esa dirección; con la menor cola se balancea el trabajo
+    while forward_pq and backward_pq:
+        if forward_pq[0][0] >= best_energy or backward_pq[0][0] >= best_energy:
+            break
+
+        if len(forward_pq) <= len(backward_pq):
+            _, _, current_state = heapq.heappop(forward_pq)
+            if (
+                forward_visited[current_state] == forward_generation
+                or forward_superseded[current_state] == forward_generation
+            ):
+                continue
+
+            forward_visited[current_state] = forward_generation
+            forward_expanded += 1
+
+            current_node, current_battery = divmod(current_state, levels)
+            current_g = g_score[current_state]
+            if current_state != initial_state:
+                forward_closed.setdefault(current_node, []).append((current_battery, current_g))
+
+            for required, energy in backward_closed.get(current_node, ()):
+                if required <= current_battery and current_g + energy < best_energy:
+                    best_energy = current_g + energy
+                    meeting = (current_state, current_node * levels + required)
+
+            for neighbor, energy_cost in adjacency[current_node]:
+                energy_cost = edge_energy(current_node, neighbor, energy_cost)
+                cost_units = energy_cost / battery_step
+                if current_battery < cost_units:
+                    continue
+
+                new_battery = int(current_battery - cost_units + 0.5)
+                tentative_g = current_g + energy_cost
+
+                if not _add_label(
+                    forward_fronts,
+                    forward_superseded,
+                    forward_generation,
+                    levels,
+                    neighbor,
+                    new_battery,
+                    tentative_g,
+                    True,
+                ):
+                    labels_dominated += 1
+                    continue
+
+                neighbor_state = neighbor * levels + new_battery
+                came_from[neighbor_state] = current_state
+                g_score[neighbor_state] = tentative_g
+
+                f = tentative_g + heuristic_func(G, node_ids[neighbor], dest) * gamma_min
+                if f < best_energy:
+                    heapq.heappush(forward_pq, (f, forward_counter, neighbor_state))
+                    forward_counter += 1
+
+            if current_node in charger_set:
+                recharged_battery = int(min(capacity_units, current_battery + recharge_units) + 0.5)
+
+                if recharged_battery > current_battery:
+                    if _add_label(
+                        forward_fronts,
+                        forward_superseded,
+                        forward_generation,
+                        levels,
+                        current_node,
+                        recharged_battery,
+                        current_g,
+                        True,
+                    ):
+                        recharged_state = current_node * levels + recharged_battery
+                        came_from[recharged_state] = current_state
+                        g_score[recharged_state] = current_g
+
+                        f = current_g + heuristic_func(G, node_ids[current_node], dest) * gamma_min
+                        if f < best_energy:
+                            heapq.heappush(forward_pq, (f, forward_counter, recharged_state))
+                            forward_counter += 1
+                    else:
+                        labels_dominated += 1
+
+        else:
+            _, _, current_label = heapq.heappop(backward_pq)
+            if (
+                backward_visited[current_label] == backward_generation
+                or backward_superseded[current_label] == backward_generation
+            ):
+                continue
+
+            backward_visited[current_label] = backward_generation
+            backward_expanded += 1
+
+            current_node, current_required = divmod(current_label, levels)
+            current_e = e_score[current_label]
+            if current_label != final_label:
+                backward_closed.setdefault(current_node, []).append((current_required, current_e))
+
+            for battery, g in forward_closed.get(current_node, ()):
+                if battery >= current_required and g + current_e < best_energy:
+                    best_energy = g + current_e
+                    meeting = (current_node * levels + battery, current_label)
+
+            for previous, energy_cost in reverse_adjacency[current_node]:
+                energy_cost = edge_energy(previous, current_node, energy_cost)
+                required = _min_units_before_edge(current_required, energy_cost / battery_step)
+                if required > max_units:
+                    continue
+
+                tentative_e = current_e + energy_cost
+
+                if not _add_label(
+                    backward_fronts,
+                    backward_superseded,
+                    backward_generation,
+                    levels,
+                    previous,
+                    required,
+                    tentative_e,
+                    False,
+                ):
+                    labels_dominated += 1
+                    continue
+
+                previous_label = previous * levels + required
+                next_label[previous_label] = current_label
+                next_cost[previous_label] = energy_cost
+                e_score[previous_label] = tentative_e
+
+                f = tentative_e + reverse_heuristic_func(G, node_ids[previous], orig) * gamma_min
+                if f < best_energy:
+                    heapq.heappush(backward_pq, (f, backward_counter, previous_label))
+                    backward_counter += 1
+
+            if current_node in charger_set:
+                required = _min_units_before_recharge(
+                    current_required, capacity_units, recharge_units
+                )
+
+                if required is not None and required < current_required:
+                    if _add_label(
+                        backward_fronts,
+                        backward_superseded,
+                        backward_generation,
+                        levels,
+                        current_node,
+                        required,
+                        current_e,
+                        False,
+                    ):
+                        previous_label = current_node * levels + required
+                        next_label[previous_label] = current_label
+                        next_cost[previous_label] = -1.0
+                        e_score[previous_label] = current_e
+
+                        f = current_e + reverse_heuristic_func(G, node_ids[current_node], orig) * gamma_min
+                        if f < best_energy:
+                            heapq.heappush(backward_pq, (f, backward_counter, previous_label))
+                            backward_counter += 1
+                    else:
+                        labels_dominated += 1
+
+    if stats is not None:
+        stats.update(
+            nodes_expanded=forward_expanded + backward_expanded,
+            nodes_expanded_forward=forward_expanded,
+            nodes_expanded_backward=backward_expanded,
+            heap_pushes=forward_counter + backward_counter,
+            labels_dominated=labels_dominated,
+        )
+
+    if meeting is None:
+        return None
+
+    # Tramo de adelante hasta el encuentro, y desde ahí se siguen las
+    # etiquetas de atrás aplicando las mismas transiciones que astar_battery
+    forward_state, label = meeting
+    steps = reconstruct_packed_path(came_from, forward_state, levels, charger_set)
+    energy_total = g_score[forward_state]
+    battery = forward_state % levels
+
+    while label != final_label:
+        following = next_label[label]
+        energy_cost = next_cost[label]
+        if energy_cost < 0:
+            recharged_battery = int(min(capacity_units, battery + recharge_units) + 0.5)
+            if recharged_battery > battery:
+                battery = recharged_battery
+                steps.append((label // levels, battery, True))
+        else:
+            battery = int(battery - energy_cost / battery_step + 0.5)
+            energy_total += energy_cost
+            steps.append((following // levels, battery, False))
+        label = following
+
+    num_recharges = sum(1 for _, _, recharged in steps if recharged)
+
+    if return_battery_info:
+        path = [(node_ids[node], units * battery_step, recharged) for node, units, recharged in steps]
+    else:
+        path = []
+        for node, _, _ in steps:
+            if not path or path[-1] != node_ids[node]:
+                path.append(node_ids[node])
+
+    execution_time = time.perf_counter() - start_time
+    nodes_expanded = forward_expanded + backward_expanded
+    return (path, energy_total, nodes_expanded, num_recharges, execution_time)
@@ -0,0 +1,464 @@
+"""
+Tabla de energía entre cargadores y ruteo sobre el grafo de cargadores.
+
+Cada consulta de A* redescubre cuán lejos están los cargadores entre sí
+expandiendo estados (nodo, batería) por toda la ciudad. Acá se precalcula,
+una sola vez por grafo y conjunto de cargadores:
+
+- la matriz cargador x cargador de energía mínima (Dijkstra sobre energy_cost)
+- los árboles de predecesores de cada cargador (para reconstruir los tramos)
+- la energía de cada nodo al cargador más cercano y desde el más cercano,
+  que descartan en O(1) los viajes sin cargador al alcance del origen o sin
+  cargador que llegue al destino (sin correr los tramos ni el overlay)
+
+Con esa tabla, un viaje largo se resuelve como una búsqueda chica sobre el
+"overlay" de cargadores: solo el primer tramo (origen -> cargador) y el
+último (cargador -> destino) requieren búsquedas sobre el grafo completo.
+
+Modelo: en cada parada del overlay se recarga recharge_amount (hasta
+max_capacity), y se puede recargar más de una vez en la misma estación, como
+en astar_battery. Cualquier ruta óptima se descompone en tramos entre recargas
+y cada tramo se puede reemplazar por el camino de menor energía entre sus
+extremos, así que el overlay encuentra la energía óptima con batería
+continua. Puede diferir levemente de astar_battery, que discretiza la batería.
+"""
+
+import hashlib
+import heapq
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from scipy.sparse.csgraph import dijkstra
+
+from graph.compiled_graph import CompiledGraph
+from graph.graph_snapshot import SNAPSHOT_DIR, snapshot_path
+
+CHARGER_TABLE_VERSION = 2
+
+# Valor que usa scipy.sparse.csgraph para "sin predecesor"
+_NO_PRED = -9999
+
+
+class ChargerTable:
+    """
+    Distancias energéticas precalculadas entre cargadores.
+
+    Atributos:
+        charger_ids: ID original de cada cargador (fila/columna de la matriz)
+        charger_index: Índice en el CompiledGraph de cada cargador
+        matrix: Energía mínima (kWh) del cargador i al j (inf si no hay camino)
+        predecessors: predecessors[i, v] = nodo anterior a v en el camino
+            óptimo desde el cargador i (índices del CompiledGraph, -9999 si no hay)
+        dist_to_nearest: Energía de cada nodo al cargador más cercano
+        dist_from_nearest: Energía desde el cargador más cercano a cada nodo
+        graph_fingerprint: Huella del CompiledGraph con el que se calculó
+    """
+
+    def __init__(
+        self,
+        charger_ids: np.ndarray,
+        charger_index: np.ndarray,
+        matrix: np.ndarray,
+        predecessors: np.ndarray,
+        dist_to_nearest: np.ndarray,
+        dist_from_nearest: np.ndarray,
+        graph_fingerprint: str,
+    ):
+        self.charger_ids = charger_ids
+        self.charger_index = charger_index
+        self.matrix = matrix
+        self.predecessors = predecessors
+        self.dist_to_nearest = dist_to_nearest
+        self.dist_from_nearest = dist_from_nearest
+        self.graph_fingerprint = graph_fingerprint
+
+    @property
+    def num_chargers(self) -> int:
+        return len(self.charger_ids)
+
+    def save(self, path: Path) -> None:
+        """Guarda la tabla en un .npz (escritura atómica)."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        header = {
+            "version": CHARGER_TABLE_VERSION,
+            "graph_fingerprint": self.graph_fingerprint,
+        }
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                header=np.frombuffer(json.dumps(header).encode("utf-8"), dtype=np.uint8),
+                charger_ids=self.charger_ids,
+                charger_index=self.charger_index,
+                matrix=self.matrix,
+                predecessors=self.predecessors,
+                dist_to_nearest=self.dist_to_nearest,
+                dist_from_nearest=self.dist_from_nearest,
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path) -> Optional["ChargerTable"]:
+        """Carga una tabla guardada (None si no existe o es de otra versión)."""
+        path = Path(path)
+        if not path.exists():
+            return None
+        try:
+            with np.load(path) as data:
+                header = json.loads(data["header"].tobytes().decode("utf-8"))
+                if header.get("version") != CHARGER_TABLE_VERSION:
+                    return None
+                return cls(
+                    charger_ids=data["charger_ids"],
+                    charger_index=data["charger_index"],
+                    matrix=data["matrix"],
+                    predecessors=data["predecessors"],
+                    dist_to_nearest=data["dist_to_nearest"],
+                    dist_from_nearest=data["dist_from_nearest"],
+                    graph_fingerprint=header["graph_fingerprint"],
+                )
+        except (OSError, KeyError, ValueError):
+            return None
+
+
+def build_charger_table(G: CompiledGraph, charger_nodes: List[int]) -> ChargerTable:
+    """
+    Precalcula la tabla de energía entre cargadores.
+
+    Corre Dijkstra sobre energy_cost desde cada cargador (en una sola llamada
+    a scipy) y dos Dijkstra multi-origen para el cargador más cercano a/desde
+    cada nodo.
+
+    Args:
+        G: Grafo compilado
+        charger_nodes: IDs de los nodos con cargador (ver get_charger_nodes)
+
+    Returns:
+        ChargerTable
+    """
+    chargers = [n for n in dict.fromkeys(charger_nodes) if n in G.node_index]
+    charger_index = np.array([G.node_index[n] for n in chargers], dtype=np.int64)
+
+    dist, pred = dijkstra(
+        G.to_csr(), directed=True, indices=charger_index, return_predecessors=True
+    )
+    matrix = dist[:, charger_index]
+
+    # nodo -> cargador más cercano = multi-origen sobre el grafo invertido
+    dist_to = dijkstra(G.to_csr(reverse=True), directed=True, indices=charger_index, min_only=True)
+    dist_from = dijkstra(G.to_csr(), directed=True, indices=charger_index, min_only=True)
+
+    return ChargerTable(
+        charger_ids=np.array(chargers, dtype=np.int64),
+        charger_index=charger_index,
+        matrix=matrix,
+        predecessors=pred.astype(np.int32),
+        dist_to_nearest=dist_to,
+        dist_from_nearest=dist_from,
+        graph_fingerprint=G.fingerprint(),
+    )
+
+
+def charger_table_path(
+    place_name: str,
+    gamma: float,
+    charger_nodes: List[int],
+    snapshot_dir: str = SNAPSHOT_DIR,
+) -> Path:
+    """
+    Ruta de la tabla de cargadores, junto al snapshot del grafo.
+
+    La clave incluye el conjunto de cargadores: si cambia, se usa otra tabla.
+    """
+    graph_path = snapshot_path(place_name, gamma, snapshot_dir)
+    key = hashlib.sha1(
+        ",".join(str(n) for n in sorted(set(charger_nodes))).encode("utf-8")
+    ).hexdigest()[:12]
+    return graph_path.with_name(f"{graph_path.stem}_chargers_{key}.npz")
+
+
+def load_or_build_charger_table(
+    G: CompiledGraph, charger_nodes: List[int], path: Optional[Path] = None
+) -> ChargerTable:
+    """
+    Carga la tabla desde disco si corresponde a este grafo y cargadores; si
+    no, la calcula (y la guarda si se indicó path).
+    """
+    expected = [n for n in dict.fromkeys(charger_nodes) if n in G.node_index]
+
+    if path is not None:
+        table = ChargerTable.load(path)
+        if (
+            table is not None
+            and table.graph_fingerprint == G.fingerprint()
+            and table.charger_ids.tolist() == expected
+        ):
+            return table
+
+    table = build_charger_table(G, charger_nodes)
+    if path is not None:
+        try:
+            table.save(path)
+        except OSError:
+            pass
+    return table
+
+
+def _unwind(pred: np.ndarray, target: int) -> List[int]:
+    """Camino (índices) desde la raíz de un árbol de predecesores hasta target."""
+    path = [target]
+    node = pred[target]
+    while node != _NO_PRED:
+        path.append(int(node))
+        node = pred[node]
+    path.reverse()
+    return path
+
+
+def _edge_energy(G: CompiledGraph, u: int, v: int) -> float:
+    for neighbor, energy_cost in G.adjacency()[u]:
+        if neighbor == v:
+            return energy_cost
+    raise KeyError(f"No hay arista {u} -> {v}")
+
+
+def charger_overlay_route(
+    G: CompiledGraph,
+    table: ChargerTable,
+    orig: int,
+    dest: int,
+    max_capacity: float = 100.0,
+    initial_charge: float = 100.0,
+    recharge_amount: float = 80.0,
+    return_battery_info: bool = False,
+    ch=None,
+) -> Optional[Tuple[List, float, int, int, float]]:
+    """
+    Ruteo con batería sobre el overlay de cargadores.
+
+    1. Dijkstra desde el origen acotado por initial_charge (primer tramo).
+       Si el destino ya es alcanzable, ese es el camino óptimo. Si no, y el
+       cargador más cercano al origen está a más de initial_charge o el
+       destino está a más de max_capacity de todo cargador
+       (dist_to_nearest / dist_from_nearest), no hay camino.
+    2. Dijkstra hacia atrás desde el destino acotado por max_capacity (último tramo).
+    3. Búsqueda de etiquetas (energía, batería) sobre los cargadores usando
+       la matriz precalculada; se descartan etiquetas dominadas.
+
+    Con una jerarquía de contracción (ch), los pasos 1 y 2 se reemplazan por
+    una consulta CH origen-destino y consultas uno-a-muchos con buckets hacia
+    y desde los cargadores: no se recorre el grafo completo.
+
+    Args:
+        G: Grafo compilado (el mismo con el que se construyó la tabla)
+        table: Tabla de cargadores (ver build_charger_table)
+        orig: Nodo origen (ID original)
+        dest: Nodo destino (ID original)
+        max_capacity: Capacidad máxima de batería (kWh)
+        initial_charge: Carga inicial de batería (kWh)
+        recharge_amount: Cantidad de energía recargada en cada estación (kWh)
+        return_battery_info: Igual que en astar_battery
+        ch: ContractionHierarchy del mismo grafo (opcional)
+
+    Returns:
+        Misma tupla que astar_battery (camino, energia_total, nodos_expandidos,
+        num_recargas, tiempo_ejecucion), o None si no hay camino viable.
+        nodos_expandidos cuenta los nodos alcanzados por los dos tramos más
+        las etiquetas del overlay.
+    """
+    if table.graph_fingerprint != G.fingerprint():
+        raise ValueError("La tabla de cargadores fue calculada para otro grafo.")
+
+    start_time = time.perf_counter()
+
+    o = G.node_index[orig]
+    d = G.node_index[dest]
+
+    if ch is not None:
+        direct, nodes_expanded, path = ch.query(o, d, return_path=True)
+        if direct <= initial_charge:
+            # Alcanzable sin recargar: el camino de menor energía es óptimo
+            return _build_result(
+                G, path, [], direct, nodes_expanded, initial_charge,
+                max_capacity, recharge_amount, return_battery_info, start_time,
+            )
+        if not _chargers_in_reach(table, o, d, initial_charge, max_capacity):
+            return None
+
+        first_dist, settled_o = ch.one_to_many(o, table.charger_index)
+        last_dist, settled_d = ch.many_to_one(table.charger_index, d)
+        nodes_expanded += settled_o + settled_d
+
+        def first_leg_path(c: int) -> List[int]:
+            return ch.query(o, c, return_path=True)[2]
+
+        def last_leg_path(c: int) -> List[int]:
+            return ch.query(c, d, return_path=True)[2]
+    else:
+        dist_o, pred_o = dijkstra(
+            G.to_csr(), directed=True, indices=o, limit=initial_charge, return_predecessors=True
+        )
+        nodes_expanded = int(np.isfinite(dist_o).sum())
+
+        if np.isfinite(dist_o[d]):
+            # Alcanzable sin recargar: el camino de menor energía es óptimo
+            path = _unwind(pred_o, d)
+            return _build_result(
+                G, path, [], float(dist_o[d]), nodes_expanded, initial_charge,
+                max_capacity, recharge_amount, return_battery_info, start_time,
+            )
+        if not _chargers_in_reach(table, o, d, initial_charge, max_capacity):
+            return None
+
+        dist_d, pred_d = dijkstra(
+            G.to_csr(reverse=True), directed=True, indices=d, limit=max_capacity,
+            return_predecessors=True,
+        )
+        nodes_expanded += int(np.isfinite(dist_d).sum())
+        first_dist = dist_o[table.charger_index]
+        last_dist = dist_d[table.charger_index]
+
+        def first_leg_path(c: int) -> List[int]:
+            return _unwind(pred_o, c)
+
+        def last_leg_path(c: int) -> List[int]:
+            # El árbol del destino es sobre el grafo invertido: pred_d[v] es el siguiente nodo
+            path = [c]
+            while path[-1] != d:
+                path.append(int(pred_d[path[-1]]))
+            return path
+
+    charger_index = table.charger_index.tolist()
+    first_leg = first_dist.tolist()
+    last_leg = last_dist.tolist()
+    matrix = table.matrix.tolist()
+    k = len(charger_index)
+
+    # Etiquetas: (energía acumulada, batería tras recargar, cargador, etiqueta padre)
+    labels: List[Tuple[float, float, int, int]] = []
+    pq: List[Tuple[float, int, int]] = []  # (energía, contador, id_etiqueta o -1 = destino)
+    counter = 0
+
+    def push(g: float, battery: float, pos: int, parent: int) -> None:
+        nonlocal counter
+        labels.append((g, battery, pos, parent))
+        heapq.heappush(pq, (g, counter, len(labels) - 1))
+        counter += 1
+
+    for pos in range(k):
+        e = first_leg[pos]
+        if e <= initial_charge:
+            push(e, min(max_capacity, initial_charge - e + recharge_amount), pos, -1)
+
+    # Frente de Pareto por cargador: baterías de las etiquetas ya asentadas
+    # (se asientan en orden de energía, así que basta comparar la batería)
+    settled_battery: List[float] = [-1.0] * k
+    dest_labels: Dict[int, Tuple[float, int]] = {}
+
+    while pq:
+        g, _, label_id = heapq.heappop(pq)
+
+        if label_id in dest_labels:
+            total, last = dest_labels[label_id]
+            chain = []
+            while last != -1:
+                chain.append(labels[last][2])
+                last = labels[last][3]
+            chain.reverse()
+            return _assemble(
+                G, table, first_leg_path, last_leg_path, chain, total, nodes_expanded,
+                initial_charge, max_capacity, recharge_amount, return_battery_info,
+                start_time,
+            )
+
+        _, battery, pos, _ = labels[label_id]
+        if battery <= settled_battery[pos]:
+            continue  # dominada: igual o más energía y no más batería
+        settled_battery[pos] = battery
+        nodes_expanded += 1
+
+        # Cerrar con el último tramo hasta el destino
+        if last_leg[pos] <= battery:
+            labels.append((g + last_leg[pos], battery, pos, label_id))
+            dest_id = len(labels) - 1
+            dest_labels[dest_id] = (g + last_leg[pos], label_id)
+            heapq.heappush(pq, (g + last_leg[pos], counter, dest_id))
+            counter += 1
+
+        # nxt == pos (costo 0) es volver a recargar en la misma estación
+        row = matrix[pos]
+        for nxt in range(k):
+            e = row[nxt]
+            if e <= battery:
+                new_battery = min(max_capacity, battery - e + recharge_amount)
+                if new_battery > settled_battery[nxt]:
+                    push(g + e, new_battery, nxt, label_id)
+
+    return None
+
+
+def _chargers_in_reach(
+    table: ChargerTable, o: int, d: int, initial_charge: float, max_capacity: float
+) -> bool:
+    """
+    False si el viaje no puede pasar por ningún cargador: el más cercano al
+    origen no se alcanza con initial_charge, o ninguno llega al destino con
+    la batería llena.
+    """
+    return (
+        table.dist_to_nearest[o] <= initial_charge
+        and table.dist_from_nearest[d] <= max_capacity
+    )
+
+
+def _assemble(
+    G, table, first_leg_path, last_leg_path, chain, total, nodes_expanded,
+    initial_charge, max_capacity, recharge_amount, return_battery_info, start_time,
+):
+    """Une primer tramo, tramos entre cargadores y último tramo en un camino."""
+    charger_index = table.charger_index
+    path = first_leg_path(int(charger_index[chain[0]]))
+
+    for prev, nxt in zip(chain, chain[1:]):
+        leg = _unwind(table.predecessors[prev], int(charger_index[nxt]))
+        path.extend(leg[1:])
+
+    path.extend(last_leg_path(int(charger_index[chain[-1]]))[1:])
+
+    stops = [int(charger_index[pos]) for pos in chain]
+    return _build_result(
+        G, path, stops, total, nodes_expanded, initial_charge, max_capacity,
+        recharge_amount, return_battery_info, start_time,
+    )
+
+
+def _build_result(
+    G, path, stops, energy, nodes_expanded, initial_charge, max_capacity,
+    recharge_amount, return_battery_info, start_time,
+):
+    node_ids = G.node_ids_list
+
+    if return_battery_info:
+        # Recorrer el camino simulando la batería, con una entrada extra en
+        # cada parada de recarga (mismo formato que reconstruct_path_with_battery)
+        pending_stops = list(stops)
+        battery = initial_charge
+        path_out = []
+        for i, node in enumerate(path):
+            if i > 0:
+                battery -= _edge_energy(G, path[i - 1], node)
+            path_out.append((node_ids[node], battery, False))
+            while pending_stops and node == pending_stops[0]:
+                pending_stops.pop(0)
+                battery = min(max_capacity, battery + recharge_amount)
+                path_out.append((node_ids[node], battery, True))
+    else:
+        path_out = [node_ids[node] for node in path]
+
+    execution_time = time.perf_counter() - start_time
+    return (path_out, energy, nodes_expanded, len(stops), execution_time)
@@ -0,0 +1,782 @@
+"""
+Contraction Hierarchies (CH) sobre la métrica energy_cost.
+
+El grafo de Montevideo es estático y se consulta muchas veces punto a punto.
+CH lo preprocesa una vez: contrae los nodos de a uno (del menos al más
+"importante") y agrega atajos (shortcuts) que preservan las distancias entre
+los nodos que quedan. Una consulta es después una búsqueda bidireccional que
+solo sube en la jerarquía y explora unos pocos cientos de nodos.
+
+Qué ofrece este módulo:
+
+- build_contraction_hierarchy / get_contraction_hierarchy: preproceso, con
+  los atajos guardados en un .npz junto a los snapshots del grafo
+- ContractionHierarchy.query: distancia energética mínima (sin restricción de
+  batería) y camino, con consulta bidireccional
+- ContractionHierarchy.distances_to: distancia de todos los nodos a un
+  destino (PHAST), la cota inferior exacta que usa CHHeuristic
+- one_to_many / many_to_one con buckets, para los tramos del overlay de
+  cargadores (ver algorithms/charger_overlay.py), y many_to_many para la
+  matriz de energías (ver algorithms/energy_matrix.py)
+- ch_battery_route: si el viaje se puede hacer sin cargar, lo resuelve solo
+  con la consulta CH; si no, corre astar_battery con la cota de CH
+"""
+
+import heapq
+import json
+import os
+import time
+import weakref
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from algorithms.astar_battery_core import astar_battery
+from graph.compiled_graph import CompiledGraph, get_compiled_graph
+from graph.graph_snapshot import SNAPSHOT_DIR
+from utils.helpers import BATTERY_STEP, battery_to_units
+
+CH_VERSION = 1
+
+# Nodos que puede asentar cada búsqueda de testigos durante la contracción.
+# Cortarla antes solo agrega atajos de más (nunca da distancias incorrectas).
+WITNESS_SETTLE_LIMIT = 60
+
+# Índices de buckets (conjuntos de destinos u orígenes) que se conservan por
+# jerarquía; se descartan los menos usados recientemente
+MAX_BUCKET_INDEXES = 8
+
+INF = float("inf")
+
+# Una jerarquía por grafo, liberada automáticamente cuando el grafo se destruye
+_CH_CACHE: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+class ContractionHierarchy:
+    """
+    Jerarquía de contracción de un CompiledGraph.
+
+    Las aristas (originales y atajos) se guardan en dos grafos "hacia arriba"
+    en formato CSR, indexados por el índice del nodo en el CompiledGraph:
+
+    - fwd: aristas v -> x con rank[x] > rank[v] (búsqueda desde el origen)
+    - bwd: aristas u -> v con rank[u] > rank[v], guardadas en v (búsqueda
+      hacia atrás desde el destino)
+
+    via es el nodo intermedio de cada atajo (-1 si es una arista original).
+
+    Atributos:
+        rank: Orden de contracción de cada nodo
+        depth: Nivel para PHAST (los vecinos más altos tienen depth menor)
+        graph_fingerprint: Huella del CompiledGraph con el que se construyó
+    """
+
+    def __init__(
+        self,
+        rank: np.ndarray,
+        depth: np.ndarray,
+        fwd_offsets: np.ndarray,
+        fwd_targets: np.ndarray,
+        fwd_weights: np.ndarray,
+        fwd_via: np.ndarray,
+        bwd_offsets: np.ndarray,
+        bwd_targets: np.ndarray,
+        bwd_weights: np.ndarray,
+        bwd_via: np.ndarray,
+        graph_fingerprint: str,
+    ):
+        self.rank = rank
+        self.depth = depth
+        self.fwd_offsets = fwd_offsets
+        self.fwd_targets = fwd_targets
+        self.fwd_weights = fwd_weights
+        self.fwd_via = fwd_via
+        self.bwd_offsets = bwd_offsets
+        self.bwd_targets = bwd_targets
+        self.bwd_weights = bwd_weights
+        self.bwd_via = bwd_via
+        self.graph_fingerprint = graph_fingerprint
+
+        # Vistas de Python para las búsquedas y el desempaquetado (a demanda)
+        self._fwd = None
+        self._bwd = None
+        self._edge_via: Optional[Dict[Tuple[int, int], int]] = None
+        self._phast = None
+        self._buckets: "OrderedDict[Tuple[bytes, bool], Dict[int, List[Tuple[int, float]]]]" = (
+            OrderedDict()
+        )
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.rank)
+
+    @property
+    def num_shortcuts(self) -> int:
+        return int((self.fwd_via >= 0).sum() + (self.bwd_via >= 0).sum())
+
+    # ------------------------------------------------------------------
+    # Persistencia
+    # ------------------------------------------------------------------
+
+    def save(self, path: Path) -> None:
+        """Guarda la jerarquía en un .npz (escritura atómica)."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        header = {"version": CH_VERSION, "graph_fingerprint": self.graph_fingerprint}
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                header=np.frombuffer(json.dumps(header).encode("utf-8"), dtype=np.uint8),
+                rank=self.rank,
+                depth=self.depth,
+                fwd_offsets=self.fwd_offsets,
+                fwd_targets=self.fwd_targets,
+                fwd_weights=self.fwd_weights,
+                fwd_via=self.fwd_via,
+                bwd_offsets=self.bwd_offsets,
+                bwd_targets=self.bwd_targets,
+                bwd_weights=self.bwd_weights,
+                bwd_via=self.bwd_via,
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path) -> Optional["ContractionHierarchy"]:
+        """Carga una jerarquía guardada (None si no existe o es de otra versión)."""
+        path = Path(path)
+        if not path.exists():
+            return None
+        try:
+            with np.load(path) as data:
+                header = json.loads(data["header"].tobytes().decode("utf-8"))
+                if header.get("version") != CH_VERSION:
+                    return None
+                arrays = {
+                    name: data[name]
+                    for name in (
+                        "rank", "depth",
+                        "fwd_offsets", "fwd_targets", "fwd_weights", "fwd_via",
+                        "bwd_offsets", "bwd_targets", "bwd_weights", "bwd_via",
+                    )
+                }
+            return cls(graph_fingerprint=header["graph_fingerprint"], **arrays)
+        except (OSError, KeyError, ValueError):
+            return None
+
+    # ------------------------------------------------------------------
+    # Búsquedas
+    # ------------------------------------------------------------------
+
+    def _views(self):
+        if self._fwd is None:
+            self._fwd = _csr_to_lists(self.fwd_offsets, self.fwd_targets, self.fwd_weights)
+            self._bwd = _csr_to_lists(self.bwd_offsets, self.bwd_targets, self.bwd_weights)
+        return self._fwd, self._bwd
+
+    def _upward_search(self, source: int, backward: bool = False):
+        """
+        Dijkstra completo sobre el grafo hacia arriba desde source.
+
+        Returns:
+            Diccionario {nodo: distancia} con los nodos asentados
+        """
+        fwd, bwd = self._views()
+        adjacency = bwd if backward else fwd
+
+        dist = {source: 0.0}
+        settled: Dict[int, float] = {}
+        pq = [(0.0, source)]
+        while pq:
+            d, node = heapq.heappop(pq)
+            if node in settled:
+                continue
+            settled[node] = d
+            for neighbor, w in adjacency[node]:
+                nd = d + w
+                if nd < dist.get(neighbor, INF):
+                    dist[neighbor] = nd
+                    heapq.heappush(pq, (nd, neighbor))
+        return settled
+
+    def query(self, source: int, target: int, return_path: bool = False):
+        """
+        Distancia energética mínima de source a target (índices del
+        CompiledGraph), sin restricción de batería.
+
+        Búsqueda bidireccional hacia arriba: cada lado se detiene cuando su
+        mínimo en la cola ya no puede mejorar la mejor distancia encontrada.
+
+        Args:
+            source: Índice del nodo origen
+            target: Índice del nodo destino
+            return_path: Si True, devuelve también el camino desempaquetado
+
+        Returns:
+            Tupla (distancia, nodos_asentados) o (distancia, nodos_asentados,
+            camino) con camino como lista de índices (None si no hay camino).
+            La distancia es inf si target no es alcanzable.
+        """
+        if source == target:
+            return (0.0, 0, [source]) if return_path else (0.0, 0)
+
+        fwd, bwd = self._views()
+        adjacency = (fwd, bwd)
+        dist = ({source: 0.0}, {target: 0.0})
+        parent = ({source: -1}, {target: -1})
+        settled = (set(), set())
+        queues = ([(0.0, source)], [(0.0, target)])
+
+        best = INF
+        meeting = -1
+        num_settled = 0
+
+        side = 0
+        while queues[0] or queues[1]:
+            # Alternar lados; si uno terminó, seguir con el otro
+            if not queues[side] or queues[side][0][0] >= best:
+                other = 1 - side
+                if not queues[other] or queues[other][0][0] >= best:
+                    break
+                side = other
+
+            d, node = heapq.heappop(queues[side])
+            if node in settled[side]:
+                side = 1 - side
+                continue
+            settled[side].add(node)
+            num_settled += 1
+
+            other_dist = dist[1 - side].get(node)
+            if other_dist is not None and d + other_dist < best:
+                best = d + other_dist
+                meeting = node
+
+            side_dist = dist[side]
+            side_parent = parent[side]
+
+            # Stall-on-demand: si un vecino más alto ya llega a node con menos
+            # energía, d no es la distancia real y no vale la pena expandirlo
+            stalled = False
+            for higher, w in adjacency[1 - side][node]:
+                higher_dist = side_dist.get(higher)
+                if higher_dist is not None and higher_dist + w < d:
+                    stalled = True
+                    break
+            if stalled:
+                side = 1 - side
+                continue
+            for neighbor, w in adjacency[side][node]:
+                nd = d + w
+                if nd < side_dist.get(neighbor, INF):
+                    side_dist[neighbor] = nd
+                    side_parent[neighbor] = node
+                    heapq.heappush(queues[side], (nd, neighbor))
+
+                    # Encuentro al relajar: mantiene best igual al camino de parent
+                    other_dist = dist[1 - side].get(neighbor)
+                    if other_dist is not None and nd + other_dist < best:
+                        best = nd + other_dist
+                        meeting = neighbor
+
+            side = 1 - side
+
+        if not return_path:
+            return best, num_settled
+        if meeting < 0:
+            return best, num_settled, None
+
+        # Cadena de aristas CH origen -> meeting -> destino
+        up = []
+        node = meeting
+        while node != -1:
+            up.append(node)
+            node = parent[0][node]
+        up.reverse()
+        node = parent[1][meeting]
+        while node != -1:
+            up.append(node)
+            node = parent[1][node]
+
+        return best, num_settled, self.unpack(up)
+
+    def unpack(self, ch_path: List[int]) -> List[int]:
+        """Reemplaza cada atajo de un camino CH por las aristas originales."""
+        edge_via = self._edge_via_map()
+        path = [ch_path[0]]
+        # Pila de aristas pendientes (en orden inverso para sacar la primera)
+        stack = [(ch_path[i], ch_path[i + 1]) for i in range(len(ch_path) - 2, -1, -1)]
+        while stack:
+            u, v = stack.pop()
+            via = edge_via[(u, v)]
+            if via < 0:
+                path.append(v)
+            else:
+                stack.append((via, v))
+                stack.append((u, via))
+        return path
+
+    def _edge_via_map(self) -> Dict[Tuple[int, int], int]:
+        if self._edge_via is None:
+            n = self.num_nodes
+            fwd_src = np.repeat(np.arange(n), np.diff(self.fwd_offsets))
+            bwd_dst = np.repeat(np.arange(n), np.diff(self.bwd_offsets))
+            edge_via = dict(
+                zip(zip(fwd_src.tolist(), self.fwd_targets.tolist()), self.fwd_via.tolist())
+            )
+            # En bwd la arista es targets -> v
+            edge_via.update(
+                zip(zip(self.bwd_targets.tolist(), bwd_dst.tolist()), self.bwd_via.tolist())
+            )
+            self._edge_via = edge_via
+        return self._edge_via
+
+    def distances_to(self, target: int) -> np.ndarray:
+        """
+        Distancia energética mínima de cada nodo hasta target (PHAST).
+
+        Una búsqueda hacia arriba desde target por el grafo bwd y luego un
+        barrido de todos los nodos de arriba hacia abajo en la jerarquía
+        (por niveles, vectorizado con NumPy).
+
+        Returns:
+            Arreglo de largo n (inf donde target no es alcanzable)
+        """
+        levels = self._phast_levels()
+        dist = np.full(self.num_nodes, np.inf)
+        for node, d in self._upward_search(target, backward=True).items():
+            dist[node] = d
+
+        for sources, starts, edge_targets, edge_weights in levels:
+            candidates = np.minimum.reduceat(edge_weights + dist[edge_targets], starts)
+            np.minimum(dist[sources], candidates, out=candidates)
+            dist[sources] = candidates
+        return dist
+
+    def _phast_levels(self):
+        """Aristas fwd agrupadas por depth del origen (de arriba hacia abajo)."""
+        if self._phast is None:
+            n = self.num_nodes
+            src = np.repeat(np.arange(n), np.diff(self.fwd_offsets))
+            order = np.lexsort((src, self.depth[src]))
+            src = src[order]
+            targets = self.fwd_targets[order]
+            weights = self.fwd_weights[order]
+            edge_depth = self.depth[src]
+
+            levels = []
+            bounds = np.flatnonzero(np.diff(edge_depth)) + 1
+            for lo, hi in zip(np.r_[0, bounds], np.r_[bounds, len(src)]):
+                level_src = src[lo:hi]
+                starts = np.r_[0, np.flatnonzero(np.diff(level_src)) + 1]
+                levels.append((level_src[starts], starts, targets[lo:hi], weights[lo:hi]))
+            self._phast = levels
+        return self._phast
+
+    def _bucket_index(self, nodes: np.ndarray, backward: bool):
+        """
+        Buckets para consultas uno-a-muchos: por cada nodo alcanzado al subir
+        desde cada uno de nodes, la lista de (posición, distancia).
+
+        Se guardan los últimos MAX_BUCKET_INDEXES conjuntos usados (LRU).
+        """
+        key = (np.ascontiguousarray(nodes).tobytes(), backward)
+        buckets = self._buckets.get(key)
+        if buckets is not None:
+            self._buckets.move_to_end(key)
+            return buckets
+
+        buckets = {}
+        for pos, node in enumerate(nodes.tolist()):
+            for reached, d in self._upward_search(node, backward=backward).items():
+                buckets.setdefault(reached, []).append((pos, d))
+        self._buckets[key] = buckets
+        while len(self._buckets) > MAX_BUCKET_INDEXES:
+            self._buckets.popitem(last=False)
+        return buckets
+
+    def one_to_many(self, source: int, targets: np.ndarray) -> Tuple[np.ndarray, int]:
+        """
+        Distancia de source a cada uno de targets.
+
+        Los buckets de targets se calculan una vez y se reutilizan.
+
+        Returns:
+            Tupla (distancias, nodos_asentados en la búsqueda desde source)
+        """
+        buckets = self._bucket_index(targets, backward=True)
+        result = [INF] * len(targets)
+        settled = self._upward_search(source)
+        for node, d in settled.items():
+            for pos, d_target in buckets.get(node, ()):
+                if d + d_target < result[pos]:
+                    result[pos] = d + d_target
+        return np.array(result), len(settled)
+
+    def many_to_many(self, sources: np.ndarray, targets: np.ndarray) -> Tuple[np.ndarray, int]:
+        """
+        Distancia de cada uno de sources a cada uno de targets.
+
+        Los buckets de targets se arman una vez (una búsqueda hacia arriba por
+        destino) y cada origen hace una sola búsqueda hacia arriba.
+
+        Returns:
+            Tupla (matriz len(sources) x len(targets), nodos_asentados en las
+            búsquedas desde los orígenes)
+        """
+        result = np.full((len(sources), len(targets)), INF)
+        num_settled = 0
+        for i, source in enumerate(np.asarray(sources).tolist()):
+            result[i], settled = self.one_to_many(source, targets)
+            num_settled += settled
+        return result, num_settled
+
+    def many_to_one(self, sources: np.ndarray, target: int) -> Tuple[np.ndarray, int]:
+        """
+        Distancia de cada uno de sources a target.
+
+        Returns:
+            Tupla (distancias, nodos_asentados en la búsqueda desde target)
+        """
+        buckets = self._bucket_index(sources, backward=False)
+        result = [INF] * len(sources)
+        settled = self._upward_search(target, backward=True)
+        for node, d in settled.items():
+            for pos, d_source in buckets.get(node, ()):
+                if d + d_source < result[pos]:
+                    result[pos] = d + d_source
+        return np.array(result), len(settled)
+
+
+def _csr_to_lists(offsets: np.ndarray, targets: np.ndarray, weights: np.ndarray):
+    offsets = offsets.tolist()
+    targets = targets.tolist()
+    weights = weights.tolist()
+    return [
+        tuple(zip(targets[offsets[i]:offsets[i + 1]], weights[offsets[i]:offsets[i + 1]]))
+        for i in range(len(offsets) - 1)
+    ]
+
+
+def _to_csr(n: int, edges: List[List[Tuple[int, float, int]]]):
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum([len(e) for e in edges], out=offsets[1:])
+    flat = [edge for node_edges in edges for edge in node_edges]
+    return (
+        offsets,
+        np.array([e[0] for e in flat], dtype=np.int64),
+        np.array([e[1] for e in flat], dtype=np.float64),
+        np.array([e[2] for e in flat], dtype=np.int64),
+    )
+
+
+def build_contraction_hierarchy(G: CompiledGraph) -> ContractionHierarchy:
+    """
+    Contrae el grafo sobre energy_cost.
+
+    Orden de contracción perezoso por "diferencia de aristas" (atajos que
+    agregaría menos aristas que elimina) más la cantidad de vecinos ya
+    contraídos, que reparte la contracción por todo el grafo. Las aristas sin
+    energy_cost (NaN) y los bucles se ignoran.
+
+    Args:
+        G: Grafo compilado
+
+    Returns:
+        ContractionHierarchy
+    """
+    n = G.num_nodes
+    adjacency = G.adjacency()
+
+    out_adj: List[Dict[int, float]] = [{} for _ in range(n)]
+    in_adj: List[Dict[int, float]] = [{} for _ in range(n)]
+    for u in range(n):
+        for v, w in adjacency[u]:
+            if w != w or v == u:
+                continue
+            if w < out_adj[u].get(v, INF):
+                out_adj[u][v] = w
+                in_adj[v][u] = w
+
+    # Nodo intermedio de cada atajo vigente (u, x)
+    via: Dict[Tuple[int, int], int] = {}
+
+    def witness_distances(u: int, skip: int, max_cost: float, targets) -> Dict[int, float]:
+        """Dijkstra local desde u sin pasar por skip (acotado; termina al asentar targets)."""
+        dist = {u: 0.0}
+        pq = [(0.0, u)]
+        settled = 0
+        remaining = len(targets)
+        while pq:
+            d, x = heapq.heappop(pq)
+            if d > dist[x]:
+                continue
+            if d > max_cost or settled >= WITNESS_SETTLE_LIMIT:
+                break
+            settled += 1
+            if x in targets:
+                remaining -= 1
+                if remaining == 0:
+                    break
+            for y, w in out_adj[x].items():
+                if y == skip:
+                    continue
+                nd = d + w
+                if nd < dist.get(y, INF):
+                    dist[y] = nd
+                    heapq.heappush(pq, (nd, y))
+        return dist
+
+    def needed_shortcuts(v: int) -> List[Tuple[int, int, float]]:
+        shortcuts = []
+        outs = out_adj[v]
+        if not outs:
+            return shortcuts
+        max_out = max(outs.values())
+        for u, w_in in in_adj[v].items():
+            dist = witness_distances(u, v, w_in + max_out, outs)
+            for x, w_out in outs.items():
+                if x != u and dist.get(x, INF) > w_in + w_out:
+                    shortcuts.append((u, x, w_in + w_out))
+        return shortcuts
+
+    deleted_neighbors = [0] * n
+
+    def priority(v: int, shortcuts) -> int:
+        return len(shortcuts) - len(in_adj[v]) - len(out_adj[v]) + deleted_neighbors[v]
+
+    pq = [(priority(v, needed_shortcuts(v)), v) for v in range(n)]
+    heapq.heapify(pq)
+
+    rank = np.zeros(n, dtype=np.int64)
+    up_edges: List[List[Tuple[int, float, int]]] = [[] for _ in range(n)]
+    down_edges: List[List[Tuple[int, float, int]]] = [[] for _ in range(n)]
+    contracted = [False] * n
+    next_rank = 0
+
+    while pq:
+        _, v = heapq.heappop(pq)
+        if contracted[v]:
+            continue
+
+        # Prioridad perezosa: recalcular y reencolar si ya no es la mínima
+        shortcuts = needed_shortcuts(v)
+        current = priority(v, shortcuts)
+        if pq and current > pq[0][0]:
+            heapq.heappush(pq, (current, v))
+            continue
+
+        # Las aristas que quedan van a vecinos todavía sin contraer (más arriba)
+        up_edges[v] = [(x, w, via.get((v, x), -1)) for x, w in out_adj[v].items()]
+        down_edges[v] = [(u, w, via.get((u, v), -1)) for u, w in in_adj[v].items()]
+
+        for u in in_adj[v]:
+            del out_adj[u][v]
+            deleted_neighbors[u] += 1
+        for x in out_adj[v]:
+            del in_adj[x][v]
+            deleted_neighbors[x] += 1
+
+        for u, x, w in shortcuts:
+            if w < out_adj[u].get(x, INF):
+                out_adj[u][x] = w
+                in_adj[x][u] = w
+                via[(u, x)] = v
+
+        out_adj[v] = {}
+        in_adj[v] = {}
+        contracted[v] = True
+        rank[v] = next_rank
+        next_rank += 1
+
+    # depth: 0 para los nodos más altos; cada nodo queda por debajo de todos
+    # sus vecinos de mayor rank (lo necesita el barrido de PHAST)
+    depth = [0] * n
+    for v in np.argsort(rank)[::-1].tolist():
+        higher = [x for x, _, _ in up_edges[v]] + [u for u, _, _ in down_edges[v]]
+        if higher:
+            depth[v] = 1 + max(depth[x] for x in higher)
+
+    fwd = _to_csr(n, up_edges)
+    bwd = _to_csr(n, down_edges)
+    return ContractionHierarchy(
+        rank, np.array(depth, dtype=np.int64), *fwd, *bwd, graph_fingerprint=G.fingerprint()
+    )
+
+
+def contraction_hierarchy_path(G: CompiledGraph, directory: str = SNAPSHOT_DIR) -> Path:
+    """Ruta del .npz de la jerarquía (el nombre incluye la huella del grafo)."""
+    return Path(directory) / f"ch_{G.fingerprint()}.npz"
+
+
+def get_contraction_hierarchy(G, directory: Optional[str] = SNAPSHOT_DIR) -> ContractionHierarchy:
+    """
+    Devuelve la jerarquía de G: en memoria, desde disco o construyéndola.
+
+    Args:
+        G: Grafo de NetworkX o CompiledGraph
+        directory: Carpeta donde se guarda (None = no usar disco)
+    """
+    ch = _CH_CACHE.get(G)
+    compiled = get_compiled_graph(G)
+    if ch is not None and ch.graph_fingerprint == compiled.fingerprint():
+        return ch
+
+    path = contraction_hierarchy_path(compiled, directory) if directory else None
+    ch = ContractionHierarchy.load(path) if path else None
+    if ch is None or ch.graph_fingerprint != compiled.fingerprint():
+        ch = build_contraction_hierarchy(compiled)
+        if path is not None:
+            try:
+                ch.save(path)
+            except OSError:
+                pass
+
+    _CH_CACHE[G] = ch
+    return ch
+
+
+class CHHeuristic:
+    """
+    Cota inferior exacta para A*: la energía mínima sin restricción de
+    batería desde cada nodo hasta el destino (PHAST sobre la jerarquía).
+
+    Misma interfaz que heuristic_func: h(G, nodo, destino). Devuelve kWh, así
+    que va con gamma_min=1.0.
+    """
+
+    def __init__(self, directory: Optional[str] = SNAPSHOT_DIR):
+        self.directory = directory
+        self.__name__ = "ch"
+
+        self._graph_ref: Optional[weakref.ref] = None
+        self._node_index = None
+        self._dest = None
+        self._values: List[float] = []
+
+    def __call__(self, G, node, dest) -> float:
+        if dest != self._dest or self._graph_ref is None or self._graph_ref() is not G:
+            self.precompute(G, dest)
+        return self._values[self._node_index[node]]
+
+    def prepare(self, G) -> None:
+        """Carga o construye la jerarquía de G (antes de un fork, por ejemplo)."""
+        get_contraction_hierarchy(G, self.directory)
+
+    def precompute(self, G, dest) -> np.ndarray:
+        compiled = get_compiled_graph(G)
+        ch = get_contraction_hierarchy(G, self.directory)
+        values = ch.distances_to(compiled.node_index[dest])
+
+        self._graph_ref = weakref.ref(G)
+        self._node_index = compiled.node_index
+        self._dest = dest
+        self._values = values.tolist()
+        return values
+
+
+ch_heuristic = CHHeuristic()
+
+
+def ch_battery_route(
+    G,
+    orig: int,
+    dest: int,
+    max_capacity: float = 100.0,
+    initial_charge: float = 100.0,
+    gamma_min: float = 1.0,
+    charger_nodes: Optional[List[int]] = None,
+    recharge_amount: float = 80.0,
+    heuristic_func=None,
+    return_battery_info: bool = False,
+    stats: Optional[Dict] = None,
+    battery_step: float = BATTERY_STEP,
+) -> Optional[Tuple[List, float, int, int, float]]:
+    """
+    Ruteo con batería apoyado en la jerarquía de contracción.
+
+    Si el camino de energía mínima (consulta CH) se puede recorrer sin
+    cargar con el mismo redondeo a unidades de batería que astar_battery,
+    ese camino es el óptimo y se devuelve sin búsqueda sobre estados de
+    batería. Si no (aunque la energía continua no supere initial_charge),
+    corre astar_battery con la cota de CH como heurística (por defecto
+    ch_heuristic, con gamma_min=1.0 porque ya está en kWh).
+
+    Mismos parámetros y valor de retorno que astar_battery. En el camino
+    rápido, nodos_expandidos son los nodos asentados por la consulta CH.
+    """
+    if heuristic_func is None:
+        heuristic_func = ch_heuristic
+
+    start_time = time.perf_counter()
+
+    compiled = get_compiled_graph(G)
+    ch = get_contraction_hierarchy(G)
+    o = compiled.node_index[orig]
+    d = compiled.node_index[dest]
+
+    energy, num_settled, path = ch.query(o, d, return_path=True)
+    replay = None
+    if energy <= initial_charge:
+        replay = replay_without_recharge(
+            compiled.adjacency(), path, battery_to_units(initial_charge, battery_step), battery_step
+        )
+    if replay is not None:
+        path_energy, units = replay
+        node_ids = compiled.node_ids_list
+        if return_battery_info:
+            path_out = [(node_ids[i], u * battery_step, False) for i, u in zip(path, units)]
+        else:
+            path_out = [node_ids[i] for i in path]
+
+        if stats is not None:
+            stats.update(nodes_expanded=num_settled, heap_pushes=None)
+        return (path_out, path_energy, num_settled, 0, time.perf_counter() - start_time)
+
+    if energy == INF:
+        if stats is not None:
+            stats.update(nodes_expanded=num_settled, heap_pushes=None)
+        return None
+
+    return astar_battery(
+        G,
+        orig,
+        dest,
+        max_capacity=max_capacity,
+        initial_charge=initial_charge,
+        gamma_min=gamma_min,
+        charger_nodes=charger_nodes,
+        recharge_amount=recharge_amount,
+        heuristic_func=heuristic_func,
+        return_battery_info=return_battery_info,
+        stats=stats,
+        battery_step=battery_step,
+    )
+
+
+def replay_without_recharge(
+    adjacency, path: Optional[List[int]], initial_units: int, battery_step: float
+) -> Optional[Tuple[float, List[int]]]:
+    """
+    Recorre path sin cargar con el mismo redondeo por arista que
+    astar_battery (con la arista paralela más barata, que es la que usa CH).
+
+    Returns:
+        (energía, unidades de batería en cada nodo de path), o None si la
+        batería no alcanza o no hay camino
+    """
+    if path is None:
+        return None
+
+    units = [initial_units]
+    total = 0.0
+    for u, v in zip(path, path[1:]):
+        cost = min(w for neighbor, w in adjacency[u] if neighbor == v)
+        cost_units = cost / battery_step
+        if units[-1] < cost_units:
+            return None
+        units.append(int(units[-1] - cost_units + 0.5))
+        total += cost
+    return total, units
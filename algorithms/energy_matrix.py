@@ -0,0 +1,176 @@
+"""
+Matriz de energías entre muchos orígenes y muchos destinos con batería.
+
+Para despachar una flota no hacen falta los caminos sino la energía mínima
+(y las recargas) entre cada depósito y cada cliente. Con astar_battery eso
+son N x M búsquedas; energy_matrix lo resuelve en tres pasos:
+
+1. Matriz sin restricción de batería con buckets sobre la jerarquía de
+   contracción (ContractionHierarchy.many_to_many): una búsqueda hacia
+   arriba por destino y otra por origen. Es una cota inferior exacta y marca
+   los pares sin camino, que una búsqueda con batería tendría que agotar.
+2. Si esa energía no supera initial_charge y el camino de CH es viable
+   con el modelo de batería en unidades enteras, es el óptimo (sin recargas).
+3. Los pares que quedan se resuelven con una búsqueda uno-a-muchos
+   (route_many) por origen; los orígenes se reparten entre procesos.
+
+Las energías coinciden con las de astar_battery par a par.
+"""
+
+import multiprocessing
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from algorithms.contraction_hierarchy import get_contraction_hierarchy, replay_without_recharge
+from algorithms.one_to_many_battery import route_many
+from graph.compiled_graph import get_compiled_graph
+from utils.helpers import BATTERY_STEP, battery_to_units
+
+# Estado que heredan los procesos hijos por fork (ver _search_sources)
+_MATRIX_STATE: Dict = {}
+
+
+def energy_matrix(
+    G,
+    sources: List[int],
+    targets: List[int],
+    max_capacity: float = 100.0,
+    initial_charge: float = 100.0,
+    gamma_min: float = 0.15,
+    charger_nodes: Optional[List[int]] = None,
+    recharge_amount: float = 80.0,
+    battery_step: float = BATTERY_STEP,
+    workers: int = 1,
+    stats: Optional[Dict] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Energía mínima y recargas para cada par (origen, destino).
+
+    Mismo modelo de batería y recarga que astar_battery. G puede ser un grafo
+    de NetworkX (se compila una vez y se reutiliza) o un CompiledGraph.
+
+    Args:
+        sources: Nodos origen (filas)
+        targets: Nodos destino (columnas)
+        gamma_min: Consumo por km para las aristas sin energy_cost (kWh/km)
+        workers: Procesos para las búsquedas con batería (1 = serie,
+            0 = todos los núcleos)
+        stats: Diccionario opcional donde se dejan los contadores: ch_pairs
+            (resueltos solo con CH), searched_pairs, unreachable_pairs,
+            searched_sources, nodes_expanded y los tiempos de cada paso
+
+    Returns:
+        Tupla (energia, recargas): arreglos len(sources) x len(targets);
+        energia es inf y recargas -1 donde no hay camino viable
+    """
+    compiled = get_compiled_graph(G)
+    ch = get_contraction_hierarchy(compiled)
+
+    source_idx = np.array([compiled.node_index[s] for s in sources], dtype=np.int64)
+    target_idx = np.array([compiled.node_index[t] for t in targets], dtype=np.int64)
+
+    # 1. Cota inferior sin batería (buckets de CH)
+    start = time.perf_counter()
+    lower, _ = ch.many_to_many(source_idx, target_idx)
+    ch_time = time.perf_counter() - start
+
+    energy = np.full(lower.shape, np.inf)
+    recharges = np.full(lower.shape, -1, dtype=np.int64)
+
+    # 2. Pares que se hacen sin cargar por el camino de CH
+    start = time.perf_counter()
+    adjacency = compiled.adjacency()
+    initial_units = battery_to_units(initial_charge, battery_step)
+    pending: List[Tuple[int, List[int]]] = []
+    ch_pairs = 0
+    for i, j in zip(*np.nonzero(lower <= initial_charge)):
+        _, _, path = ch.query(int(source_idx[i]), int(target_idx[j]), return_path=True)
+        replay = replay_without_recharge(adjacency, path, initial_units, battery_step)
+        if replay is not None:
+            energy[i, j] = replay[0]
+            recharges[i, j] = 0
+            ch_pairs += 1
+
+    # 3. El resto (alcanzable sin restricción de batería): un route_many por origen
+    for i in range(len(sources)):
+        columns = [
+            j for j in range(len(targets))
+            if recharges[i, j] < 0 and lower[i, j] < np.inf
+        ]
+        if columns:
+            pending.append((i, columns))
+    direct_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    search_kwargs = dict(
+        max_capacity=max_capacity,
+        initial_charge=initial_charge,
+        gamma_min=gamma_min,
+        charger_nodes=charger_nodes,
+        recharge_amount=recharge_amount,
+        battery_step=battery_step,
+    )
+    tasks = [(sources[i], [targets[j] for j in columns]) for i, columns in pending]
+    nodes_expanded = 0
+    for (i, columns), (row_energy, row_recharges, expanded) in zip(
+        pending, _search_sources(compiled, tasks, search_kwargs, workers)
+    ):
+        energy[i, columns] = row_energy
+        recharges[i, columns] = row_recharges
+        nodes_expanded += expanded
+    search_time = time.perf_counter() - start
+
+    if stats is not None:
+        stats.update(
+            ch_pairs=ch_pairs,
+            searched_pairs=sum(len(columns) for _, columns in pending),
+            unreachable_pairs=int(np.count_nonzero(lower == np.inf)),
+            searched_sources=len(pending),
+            nodes_expanded=nodes_expanded,
+            ch_time_seconds=ch_time,
+            direct_time_seconds=direct_time,
+            search_time_seconds=search_time,
+        )
+
+    return energy, recharges
+
+
+def _search_row(task) -> Tuple[List[float], List[int], int]:
+    """Una fila de la matriz: route_many desde un origen a sus destinos pendientes."""
+    source, dests = task
+    results, nodes_expanded, _ = route_many(
+        _MATRIX_STATE["G"], source, dests, **_MATRIX_STATE["kwargs"]
+    )
+    row_energy = []
+    row_recharges = []
+    for dest in dests:
+        result = results[dest]
+        if result is None:
+            row_energy.append(np.inf)
+            row_recharges.append(-1)
+        else:
+            _, dest_energy, num_recharges = result
+            row_energy.append(dest_energy)
+            row_recharges.append(num_recharges)
+    return row_energy, row_recharges, nodes_expanded
+
+
+def _search_sources(compiled, tasks, search_kwargs: Dict, workers: int):
+    """
+    Corre _search_row para cada tarea, en serie o repartida entre procesos.
+
+    El grafo se pasa a los hijos por fork (copy-on-write), como en
+    benchmark.py; si fork no está disponible se corre en serie.
+    """
+    _MATRIX_STATE.update(G=compiled, kwargs=search_kwargs)
+    if workers == 0:
+        workers = multiprocessing.cpu_count()
+    workers = min(workers, len(tasks))
+
+    if workers <= 1 or "fork" not in multiprocessing.get_all_start_methods():
+        return [_search_row(task) for task in tasks]
+
+    with multiprocessing.get_context("fork").Pool(processes=workers) as pool:
+        return pool.map(_search_row, tasks, chunksize=1)
@@ -3,14 +3,21 @@ Implementación de Greedy con gestión de batería para vehículos eléctricos.
 Versión optimizada SIN visualización para benchmarking y comparaciones.
 """
 
-import heapq
 import time
+from time import perf_counter_ns
 from typing import Dict, List, Optional, Set, Tuple
 
+from algorithms.heuristic_table import NodeHeuristic
+from algorithms.priority_queues import make_priority_queue, queue_counters
+from algorithms.search_profile import ProfiledQueue
+from algorithms.state_store import get_state_store
+from graph.compiled_graph import CompiledGraph, min_energy_edge
 from utils.helpers import (
+    BATTERY_STEP,
+    battery_to_units,
     count_recharges,
-    discretize_battery,
     euclidean_distance,
+    reconstruct_packed_path,
     reconstruct_path,
     reconstruct_path_with_battery,
 )
@@ -26,6 +33,10 @@ def greedy_battery(
     charger_nodes: Optional[List[int]] = None,
     recharge_amount: float = 80.0,
     return_battery_info: bool = False,
+    battery_step: float = BATTERY_STEP,
+    queue="heapq",
+    stats: Optional[Dict] = None,
+    profile: bool = False,
 ) -> Optional[Tuple[List[int], float, int, int, float]]:
     """
     Algoritmo Greedy con gestión de batería para vehículos eléctricos.
@@ -35,7 +46,8 @@ def greedy_battery(
     pero puede no encontrar el camino óptimo.
 
     El estado se representa como (nodo, batería_restante), permitiendo múltiples
-    visitas al mismo nodo con diferentes niveles de batería.
+    visitas al mismo nodo con diferentes niveles de batería. La batería se
+    guarda como un entero de unidades de battery_step kWh.
 
     Args:
         G: Grafo de NetworkX con atributo 'energy_cost' en las aristas
@@ -46,6 +58,16 @@ def greedy_battery(
         gamma_min: Consumo mínimo de energía por km para heurística (kWh/km)
         charger_nodes: Lista de nodos donde hay cargadores
         recharge_amount: Cantidad de energía recargada en cada estación (kWh)
+        battery_step: Tamaño de la unidad de batería (kWh)
+        queue: Cola de prioridad de la lista abierta (ver astar_battery);
+            "bucket" no sirve porque las claves h no son monótonas
+        stats: Diccionario opcional donde se dejan los contadores de la
+            búsqueda (nodes_expanded, heap_pushes, heap_pops, heap_peak,
+            heuristic_evaluations)
+        profile: Instrumentar la búsqueda (ver astar_battery)
+
+    G también puede ser un CompiledGraph (ver graph.compiled_graph); en ese caso
+    la búsqueda recorre los arreglos CSR y devuelve exactamente el mismo camino.
 
     Returns:
         Si return_battery_info=False:
@@ -61,7 +83,28 @@ def greedy_battery(
         - num_recargas: Cantidad de recargas realizadas en el camino
         - tiempo_ejecucion: Tiempo de cómputo en segundos
     """
-    start_time = time.time()
+    if queue == "bucket":
+        raise ValueError("greedy_battery ordena por h, que no es monótona: no puede usar queue='bucket'")
+
+    if isinstance(G, CompiledGraph):
+        return _greedy_battery_compiled(
+            G,
+            orig,
+            dest,
+            max_capacity,
+            initial_charge,
+            gamma_min,
+            charger_nodes,
+            recharge_amount,
+            return_battery_info,
+            battery_step,
+            queue,
+            stats,
+            profile,
+        )
+
+    start_time = time.perf_counter()
+    profile = profile and stats is not None
 
     if charger_nodes is None:
         charger_nodes = []
@@ -69,30 +112,31 @@ def greedy_battery(
     # Utiliza un set para búsquedas de O(1)
     charger_set = set(charger_nodes)
 
-    # Estado: (nodo, batería_discretizada)
-    initial_state = (orig, discretize_battery(initial_charge))
+    # Capacidad y recarga expresadas en unidades de batería
+    capacity_units = max_capacity / battery_step
+    recharge_units = recharge_amount / battery_step
 
-    # g_score: energía acumulada (para tracking, no para selección)
-    g_score: Dict[Tuple[int, float], float] = {initial_state: 0.0}
+    # Estado: (nodo, unidades_de_batería)
+    initial_state = (orig, battery_to_units(initial_charge, battery_step))
 
-    # Greedy usa solo h(n) para selección
-    h_score: Dict[Tuple[int, float], float] = {
-        initial_state: euclidean_distance(G, orig, dest) * gamma_min
-    }
+    # g_score: energía acumulada (para tracking, no para selección)
+    g_score: Dict[Tuple[int, int], float] = {initial_state: 0.0}
 
     # Para reconstruir el camino
-    came_from: Dict[Tuple[int, float], Tuple[int, float]] = {}
+    came_from: Dict[Tuple[int, int], Tuple[int, int]] = {}
 
-    # Mejor batería alcanzada por nodo (para optimización)
-    best_battery_at_node: Dict[int, float] = {orig: initial_charge}
+    # Cola de prioridad por h_score (los empates salen por orden de llegada)
+    # Greedy usa solo h(n) para selección
+    # h de cada nodo ya calculada: un nodo aparece con muchos niveles de batería
+    h_cache: Dict[int, float] = {orig: euclidean_distance(G, orig, dest) * gamma_min}
 
-    # Cola de prioridad: (h_score, contador, estado)
-    counter = 0 # El contador hace diferenciar estados iguales con mismo h_score
-    pq = [(h_score[initial_state], counter, initial_state)]
-    counter += 1
+    pq = make_priority_queue(queue)
+    if profile:
+        pq = ProfiledQueue(pq, tuple)
+    pq.push(initial_state, h_cache[orig])
 
     # Estados visitados (completamente explorados)
-    visited: Set[Tuple[int, float]] = set()
+    visited: Set[Tuple[int, int]] = set()
 
     nodes_expanded = 0
 
@@ -102,7 +146,7 @@ def greedy_battery(
 
     while pq and iterations < max_iterations:
         iterations += 1
-        current_h, _, current_state = heapq.heappop(pq)
+        current_h, current_state = pq.pop()
         current_node, current_battery = current_state
 
         # Si ya fue visitado, continuar
@@ -114,24 +158,39 @@ def greedy_battery(
 
         # Si llegamos al destino
         if current_node == dest:
-            # Reconstruir camino
+            if profile:
+                found_ns = perf_counter_ns()
+
+            # Reconstruir camino (la batería se devuelve en kWh)
             if return_battery_info:
-                path = reconstruct_path_with_battery(came_from, current_state, charger_set)
+                path = [
+                    (node, units * battery_step, recharged)
+                    for node, units, recharged in reconstruct_path_with_battery(
+                        came_from, current_state, charger_set
+                    )
+                ]
             else:
                 path = reconstruct_path(came_from, current_state)
             
             energy_total = g_score[current_state]
             num_recharges = count_recharges(came_from, current_state, charger_set)
-            execution_time = time.time() - start_time
+            execution_time = time.perf_counter() - start_time
+
+            if stats is not None:
+                stats.update(
+                    nodes_expanded=nodes_expanded,
+                    heuristic_evaluations=len(h_cache),
+                    **queue_counters(pq),
+                )
+                if profile:
+                    stats.update(pq.counters(nodes_expanded, found_ns))
 
             return (path, energy_total, nodes_expanded, num_recharges, execution_time)
 
         # Expandir vecinos
         for neighbor in G.neighbors(current_node):
-            # Obtener costo energético de la arista
-            edge_data = G.get_edge_data(
-                current_node, neighbor, 0
-            )  # Key 0 para MultiDiGraph
+            # Obtener costo energético de la arista (la paralela de menor energía)
+            _, edge_data = min_energy_edge(G.adj[current_node][neighbor])
             # Usar energy_cost si está disponible, sino calcular con distancia
             if edge_data and "energy_cost" in edge_data:
                 energy_cost = edge_data["energy_cost"]
@@ -140,12 +199,13 @@ def greedy_battery(
                 distance = euclidean_distance(G, current_node, neighbor)
                 energy_cost = distance * gamma_min
 
+            cost_units = energy_cost / battery_step
+
             # Verificar si hay suficiente batería para llegar al vecino
-            if current_battery >= energy_cost:
-                new_battery = current_battery - energy_cost
-                new_battery_disc = discretize_battery(new_battery)
+            if current_battery >= cost_units:
+                new_battery = int(current_battery - cost_units + 0.5)
 
-                neighbor_state = (neighbor, new_battery_disc)
+                neighbor_state = (neighbor, new_battery)
                 tentative_g = g_score[current_state] + energy_cost
 
                 # Greedy puede visitar estados incluso si no mejoran g_score
@@ -162,29 +222,21 @@ def greedy_battery(
                         came_from[neighbor_state] = current_state
                         g_score[neighbor_state] = tentative_g
 
-                        # Actualizar mejor batería en este nodo
-                        if (
-                            neighbor not in best_battery_at_node
-                            or new_battery > best_battery_at_node[neighbor]
-                        ):
-                            best_battery_at_node[neighbor] = new_battery
-
                 if should_add:
                     # Heurística: distancia euclidiana * consumo mínimo
-                    h = euclidean_distance(G, neighbor, dest) * gamma_min
-                    h_score[neighbor_state] = h
+                    h = h_cache.get(neighbor)
+                    if h is None:
+                        h = h_cache[neighbor] = euclidean_distance(G, neighbor, dest) * gamma_min
 
                     # GREEDY: solo usa h(n) para ordenar la cola
-                    heapq.heappush(pq, (h, counter, neighbor_state))
-                    counter += 1
+                    pq.push(neighbor_state, h)
 
         # Si el nodo actual es un cargador, generar estado con batería recargada
-        if current_node in charger_set and current_battery < max_capacity:
+        if current_node in charger_set and current_battery < capacity_units:
             # Recargar batería
-            recharged_battery = min(max_capacity, current_battery + recharge_amount)
-            recharged_battery_disc = discretize_battery(recharged_battery)
+            recharged_battery = int(min(capacity_units, current_battery + recharge_units) + 0.5)
 
-            recharged_state = (current_node, recharged_battery_disc)
+            recharged_state = (current_node, recharged_battery)
 
             # El costo de recargar es 0 en términos de energía consumida del vehículo
             tentative_g = g_score[current_state]
@@ -198,12 +250,179 @@ def greedy_battery(
                     came_from[recharged_state] = current_state
                     g_score[recharged_state] = tentative_g
 
-                    h = euclidean_distance(G, current_node, dest) * gamma_min
-                    h_score[recharged_state] = h
+                    # El nodo ya se encoló antes: su h está en h_cache
+                    h = h_cache[current_node]
 
-                    heapq.heappush(pq, (h, counter, recharged_state))
-                    counter += 1
+                    pq.push(recharged_state, h)
 
     # No se encontró camino
-    execution_time = time.time() - start_time
+    execution_time = time.perf_counter() - start_time
+    if stats is not None:
+        stats.update(
+            nodes_expanded=nodes_expanded,
+            heuristic_evaluations=len(h_cache),
+            **queue_counters(pq),
+        )
+        if profile:
+            stats.update(pq.counters(nodes_expanded))
+    return None
+
+
+def _greedy_battery_compiled(
+    G: CompiledGraph,
+    orig: int,
+    dest: int,
+    max_capacity: float,
+    initial_charge: float,
+    gamma_min: float,
+    charger_nodes: Optional[List[int]],
+    recharge_amount: float,
+    return_battery_info: bool,
+    battery_step: float,
+    queue,
+    stats: Optional[Dict],
+    profile: bool,
+) -> Optional[Tuple[List, float, int, int, float]]:
+    """
+    Misma búsqueda que greedy_battery pero sobre un CompiledGraph.
+
+    Los estados son enteros índice_nodo * levels + unidades guardados en el
+    StateStore compartido (algorithms/state_store.py); el orden de expansión y el desempate son idénticos a la
+    versión sobre NetworkX.
+    """
+    start_time = time.perf_counter()
+    profile = profile and stats is not None
+
+    adjacency = G.adjacency()
+    node_ids = G.node_ids_list
+
+    if charger_nodes is None:
+        charger_nodes = []
+
+    charger_set = {G.node_index[n] for n in charger_nodes if n in G.node_index}
+
+    orig_i = G.node_index[orig]
+    dest_i = G.node_index[dest]
+
+    capacity_units = max_capacity / battery_step
+    recharge_units = recharge_amount / battery_step
+
+    initial_units = battery_to_units(initial_charge, battery_step)
+    levels = max(initial_units, battery_to_units(max_capacity, battery_step)) + 1
+    num_states = G.num_nodes * levels
+
+    initial_state = orig_i * levels + initial_units
+
+    store = get_state_store()
+    generation = store.reset(num_states)
+    g_score = store.g
+    came_from = store.parent
+    seen = store.seen
+    closed = store.closed
+
+    g_score[initial_state] = 0.0
+    came_from[initial_state] = -1
+    seen[initial_state] = generation
+
+    node_heuristic = NodeHeuristic(euclidean_distance, G, dest, gamma_min)
+    heuristic = node_heuristic.lookup
+
+    pq = make_priority_queue(queue)
+    if profile:
+        pq = ProfiledQueue(pq, lambda state: divmod(state, levels))
+    pq.push(initial_state, heuristic(orig_i))
+
+    nodes_expanded = 0
+
+    max_iterations = 100000
+    iterations = 0
+
+    while pq and iterations < max_iterations:
+        iterations += 1
+        current_h, current_state = pq.pop()
+
+        if closed[current_state] == generation:
+            continue
+
+        closed[current_state] = generation
+        nodes_expanded += 1
+
+        current_node, current_battery = divmod(current_state, levels)
+
+        if current_node == dest_i:
+            if profile:
+                found_ns = perf_counter_ns()
+
+            steps = reconstruct_packed_path(came_from, current_state, levels, charger_set)
+            if return_battery_info:
+                path = [
+                    (node_ids[node], units * battery_step, recharged)
+                    for node, units, recharged in steps
+                ]
+            else:
+                path = []
+                for node, _, _ in steps:
+                    if not path or path[-1] != node_ids[node]:
+                        path.append(node_ids[node])
+
+            energy_total = g_score[current_state]
+            num_recharges = sum(1 for _, _, recharged in steps if recharged)
+            execution_time = time.perf_counter() - start_time
+
+            if stats is not None:
+                stats.update(
+                    nodes_expanded=nodes_expanded,
+                    heuristic_evaluations=node_heuristic.evaluations(),
+                    **queue_counters(pq),
+                )
+                if profile:
+                    stats.update(pq.counters(nodes_expanded, found_ns))
+
+            return (path, energy_total, nodes_expanded, num_recharges, execution_time)
+
+        current_g = g_score[current_state]
+
+        for neighbor, energy_cost in adjacency[current_node]:
+            # NaN = la arista no tenía energy_cost: mismo fallback que en NetworkX
+            if energy_cost != energy_cost:
+                distance = euclidean_distance(G, node_ids[current_node], node_ids[neighbor])
+                energy_cost = distance * gamma_min
+
+            cost_units = energy_cost / battery_step
+
+            if current_battery >= cost_units:
+                neighbor_state = neighbor * levels + int(current_battery - cost_units + 0.5)
+                tentative_g = current_g + energy_cost
+
+                if closed[neighbor_state] != generation and (
+                    seen[neighbor_state] != generation or tentative_g < g_score[neighbor_state]
+                ):
+                    seen[neighbor_state] = generation
+                    came_from[neighbor_state] = current_state
+                    g_score[neighbor_state] = tentative_g
+
+                    # GREEDY: solo usa h(n) para ordenar la cola
+                    pq.push(neighbor_state, heuristic(neighbor))
+
+        if current_node in charger_set and current_battery < capacity_units:
+            recharged_battery = int(min(capacity_units, current_battery + recharge_units) + 0.5)
+            recharged_state = current_node * levels + recharged_battery
+
+            if closed[recharged_state] != generation and (
+                seen[recharged_state] != generation or current_g < g_score[recharged_state]
+            ):
+                seen[recharged_state] = generation
+                came_from[recharged_state] = current_state
+                g_score[recharged_state] = current_g
+
+                pq.push(recharged_state, heuristic(current_node))
+
+    if stats is not None:
+        stats.update(
+            nodes_expanded=nodes_expanded,
+            heuristic_evaluations=node_heuristic.evaluations(),
+            **queue_counters(pq),
+        )
+        if profile:
+            stats.update(pq.counters(nodes_expanded))
     return None
@@ -0,0 +1,65 @@
+"""
+Heurística memorizada por nodo para una consulta.
+
+Un mismo nodo aparece en la búsqueda con muchos niveles de batería, y cada
+vez que mejora uno de esos estados se vuelve a pedir h(nodo, destino). Con
+NodeHeuristic cada nodo se evalúa una sola vez por consulta:
+
+- si heuristic_func tiene precompute (ALT, CH, *_km), la tabla de todos los
+  nodos se calcula de una vez con NumPy;
+- si no (euclidean_distance, por ejemplo), se llena a medida que la
+  búsqueda visita nodos (NaN = todavía no calculada).
+
+Los valores son los mismos que devuelve heuristic_func(G, nodo, dest) *
+gamma_min, así que el camino de la búsqueda no cambia.
+"""
+
+from array import array
+
+import numpy as np
+
+from graph.compiled_graph import get_compiled_graph
+
+
+class NodeHeuristic:
+    """
+    h(índice_nodo) en kWh para un destino, calculada una vez por nodo.
+
+    Args:
+        heuristic_func: Heurística heuristic_func(G, nodo, destino)
+        G: Grafo de NetworkX o CompiledGraph
+        dest: Nodo destino (ID original)
+        gamma_min: Factor por el que se multiplica la heurística
+
+    Atributos:
+        lookup: lookup(índice_nodo) -> h ya multiplicada por gamma_min
+    """
+
+    def __init__(self, heuristic_func, G, dest: int, gamma_min: float):
+        compiled = get_compiled_graph(G)
+        self._precomputed = hasattr(heuristic_func, "precompute")
+
+        if self._precomputed:
+            values = np.asarray(heuristic_func.precompute(G, dest), dtype=np.float64)
+            table = (values * gamma_min).tolist()
+            self._table = table
+            self.lookup = table.__getitem__
+            return
+
+        table = array("d", [float("nan")]) * compiled.num_nodes
+        node_ids = compiled.node_ids_list
+        self._table = table
+
+        def lookup(node: int) -> float:
+            h = table[node]
+            if h != h:
+                h = table[node] = heuristic_func(G, node_ids[node], dest) * gamma_min
+            return h
+
+        self.lookup = lookup
+
+    def evaluations(self) -> int:
+        """Nodos cuya heurística se calculó (todos si hubo precompute)."""
+        if self._precomputed:
+            return len(self._table)
+        return int(np.count_nonzero(~np.isnan(np.frombuffer(self._table))))
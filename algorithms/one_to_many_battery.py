@@ -0,0 +1,195 @@
+"""
+Consultas uno-a-muchos con gestión de batería.
+
+Para ir de un mismo origen a N destinos, astar_battery repite N veces las
+primeras expansiones alrededor del origen. route_many hace una sola búsqueda
+sobre los mismos estados (nodo, batería) y la detiene cuando salió de la
+cola algún estado de cada destino pedido.
+
+Sin heurística la búsqueda es un Dijkstra sobre los estados. Con heurística
+se usa h(v) = min_d heuristic_func(v, d) * gamma_min sobre todos los
+destinos: si cada h(., d) es consistente, el mínimo también lo es, y todo
+estado sale de la cola con su energía mínima, sea cual sea el destino. La
+energía de cada destino es entonces la misma que devuelve astar_battery.
+"""
+
+import time
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+from algorithms.priority_queues import make_priority_queue, queue_counters
+from algorithms.state_store import get_state_store
+from graph.compiled_graph import get_compiled_graph
+from utils.helpers import (
+    BATTERY_STEP,
+    battery_to_units,
+    euclidean_distance,
+    reconstruct_packed_path,
+)
+
+
+def route_many(
+    G,
+    orig: int,
+    dests: List[int],
+    max_capacity: float = 100.0,
+    initial_charge: float = 100.0,
+    gamma_min: float = 0.15,
+    charger_nodes: Optional[List[int]] = None,
+    recharge_amount: float = 80.0,
+    heuristic_func=None,
+    return_battery_info: bool = False,
+    stats: Optional[Dict] = None,
+    battery_step: float = BATTERY_STEP,
+    queue="heapq",
+) -> Tuple[Dict[int, Optional[Tuple[List, float, int]]], int, float]:
+    """
+    Rutas de energía mínima desde orig a cada destino en una sola búsqueda.
+
+    Mismo modelo de batería y recarga que astar_battery. G puede ser un grafo
+    de NetworkX (se compila una vez y se reutiliza) o un CompiledGraph.
+
+    Args:
+        dests: Nodos destino (los repetidos se resuelven una vez)
+        heuristic_func: Heurística consistente heuristic_func(G, nodo, destino);
+            None = sin heurística (Dijkstra)
+        stats: Diccionario opcional donde se dejan los contadores de la
+            búsqueda (nodes_expanded, heap_pushes, heap_pops, heap_peak,
+            destinations_settled)
+        queue: Cola de prioridad de la lista abierta (ver astar_battery)
+
+    Returns:
+        Tupla (resultados, nodos_expandidos, tiempo_ejecucion) donde
+        resultados[destino] es (camino, energia_total, num_recargas), con
+        camino_con_bateria si return_battery_info=True, o None si el destino
+        no es alcanzable con la batería disponible.
+    """
+    start_time = time.perf_counter()
+
+    compiled = get_compiled_graph(G)
+    adjacency = compiled.adjacency()
+    node_ids = compiled.node_ids_list
+
+    if charger_nodes is None:
+        charger_nodes = []
+
+    charger_set = {compiled.node_index[n] for n in charger_nodes if n in compiled.node_index}
+
+    orig_i = compiled.node_index[orig]
+    # índice del nodo -> ID del destino (pendientes de resolver)
+    pending = {compiled.node_index[d]: d for d in dests}
+    results: Dict[int, Optional[Tuple[List, float, int]]] = {d: None for d in dests}
+
+    capacity_units = max_capacity / battery_step
+    recharge_units = recharge_amount / battery_step
+
+    initial_units = battery_to_units(initial_charge, battery_step)
+    levels = max(initial_units, battery_to_units(max_capacity, battery_step)) + 1
+    num_states = compiled.num_nodes * levels
+
+    # h por nodo (se calcula una vez por nodo; NaN = todavía no calculada)
+    targets = list(pending.values())
+    h_cache = None
+    if heuristic_func is not None:
+        h_cache = array("d", [float("nan")]) * compiled.num_nodes
+
+    def heuristic(node: int) -> float:
+        if h_cache is None:
+            return 0.0
+        h = h_cache[node]
+        if h != h:
+            node_id = node_ids[node]
+            h = min(heuristic_func(compiled, node_id, d) for d in targets) * gamma_min
+            h_cache[node] = h
+        return h
+
+    initial_state = orig_i * levels + initial_units
+
+    store = get_state_store()
+    generation = store.reset(num_states)
+    g_score = store.g
+    came_from = store.parent
+    seen = store.seen
+    closed = store.closed
+
+    g_score[initial_state] = 0.0
+    came_from[initial_state] = -1
+    seen[initial_state] = generation
+
+    pq = make_priority_queue(queue)
+    pq.push(initial_state, heuristic(orig_i))
+
+    nodes_expanded = 0
+
+    while pq and pending:
+        _, current_state = pq.pop()
+
+        if closed[current_state] == generation:
+            continue
+
+        closed[current_state] = generation
+        nodes_expanded += 1
+
+        current_node, current_battery = divmod(current_state, levels)
+
+        dest = pending.pop(current_node, None)
+        if dest is not None:
+            steps = reconstruct_packed_path(came_from, current_state, levels, charger_set)
+            if return_battery_info:
+                path = [
+                    (node_ids[node], units * battery_step, recharged)
+                    for node, units, recharged in steps
+                ]
+            else:
+                path = []
+                for node, _, _ in steps:
+                    if not path or path[-1] != node_ids[node]:
+                        path.append(node_ids[node])
+
+            num_recharges = sum(1 for _, _, recharged in steps if recharged)
+            results[dest] = (path, g_score[current_state], num_recharges)
+            if not pending:
+                break
+
+        current_g = g_score[current_state]
+
+        for neighbor, energy_cost in adjacency[current_node]:
+            # NaN = la arista no tenía energy_cost: mismo fallback que astar_battery
+            if energy_cost != energy_cost:
+                distance = euclidean_distance(
+                    compiled, node_ids[current_node], node_ids[neighbor]
+                )
+                energy_cost = distance * gamma_min
+
+            cost_units = energy_cost / battery_step
+
+            if current_battery >= cost_units:
+                neighbor_state = neighbor * levels + int(current_battery - cost_units + 0.5)
+                tentative_g = current_g + energy_cost
+
+                if seen[neighbor_state] != generation or tentative_g < g_score[neighbor_state]:
+                    seen[neighbor_state] = generation
+                    came_from[neighbor_state] = current_state
+                    g_score[neighbor_state] = tentative_g
+                    pq.push(neighbor_state, tentative_g + heuristic(neighbor))
+
+        if current_node in charger_set:
+            recharged_battery = int(min(capacity_units, current_battery + recharge_units) + 0.5)
+
+            if recharged_battery > current_battery:
+                recharged_state = current_node * levels + recharged_battery
+
+                if seen[recharged_state] != generation or current_g < g_score[recharged_state]:
+                    seen[recharged_state] = generation
+                    came_from[recharged_state] = current_state
+                    g_score[recharged_state] = current_g
+                    pq.push(recharged_state, current_g + heuristic(current_node))
+
+    if stats is not None:
+        stats.update(
+            nodes_expanded=nodes_expanded,
+            destinations_settled=sum(1 for r in results.values() if r is not None),
+            **queue_counters(pq),
+        )
+
+    return results, nodes_expanded, time.perf_counter() - start_time
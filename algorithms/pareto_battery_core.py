@@ -0,0 +1,228 @@
+"""
+Búsqueda A* con gestión de batería y poda por dominancia de Pareto.
+
+astar_battery guarda un estado por cada par (nodo, batería) y encola todos
+los que mejoran su propio g, aunque otro estado del mismo nodo ya haya
+llegado gastando menos energía y con más batería. Ese estado no puede llevar
+a una ruta mejor, pero se encola, se expande y genera a su vez más estados.
+
+Acá cada nodo mantiene un frente de Pareto de etiquetas (batería, energía
+acumulada). Una etiqueta nueva se descarta antes de encolarla si alguna del
+frente tiene batería >= y energía <=; si la nueva domina a etiquetas del
+frente, éstas se eliminan y se ignoran al salir de la cola.
+
+La poda es segura con el mismo modelo de astar_battery (batería en unidades
+enteras tras cada arista, recarga opcional en cargadores): con más batería se puede
+recorrer cualquier arista o recarga que se podía con menos, así que con la
+misma heurística la energía devuelta es la misma.
+"""
+
+import heapq
+import time
+from typing import Dict, List, Optional, Tuple
+
+from algorithms.state_store import get_state_store
+from graph.compiled_graph import get_compiled_graph
+from utils.helpers import (
+    BATTERY_STEP,
+    battery_to_units,
+    euclidean_distance,
+    reconstruct_packed_path,
+)
+
+
+def pareto_battery(
+    G,
+    orig: int,
+    dest: int,
+    max_capacity: float = 100.0,
+    initial_charge: float = 100.0,
+    gamma_min: float = 0.15,
+    charger_nodes: Optional[List[int]] = None,
+    recharge_amount: float = 80.0,
+    heuristic_func=None,
+    return_battery_info: bool = False,
+    stats: Optional[Dict] = None,
+    battery_step: float = BATTERY_STEP,
+) -> Optional[Tuple[List, float, int, int, float]]:
+    """
+    A* con gestión de batería y frentes de Pareto por nodo.
+
+    Mismos parámetros y valor de retorno que astar_battery. G puede ser un
+    grafo de NetworkX (se compila una vez y se reutiliza) o un CompiledGraph.
+
+    Args:
+        stats: Diccionario opcional donde se dejan los contadores de la
+            búsqueda: nodes_expanded, heap_pushes, labels_dominated
+            (descartadas antes de encolar), labels_superseded (eliminadas del
+            frente por una etiqueta mejor) y stale_pops
+        battery_step: Tamaño de la unidad de batería (kWh)
+
+    Returns:
+        Tupla (camino, energia_total, nodos_expandidos, num_recargas, tiempo_ejecucion),
+        con camino_con_bateria si return_battery_info=True, o None si no hay
+        camino viable.
+    """
+    if heuristic_func is None:
+        heuristic_func = euclidean_distance
+
+    start_time = time.perf_counter()
+
+    compiled = get_compiled_graph(G)
+    adjacency = compiled.adjacency()
+    node_ids = compiled.node_ids_list
+
+    if charger_nodes is None:
+        charger_nodes = []
+
+    charger_set = {compiled.node_index[n] for n in charger_nodes if n in compiled.node_index}
+
+    orig_i = compiled.node_index[orig]
+    dest_i = compiled.node_index[dest]
+
+    capacity_units = max_capacity / battery_step
+    recharge_units = recharge_amount / battery_step
+
+    # Estados empaquetados: índice_nodo * levels + unidades de batería
+    initial_units = battery_to_units(initial_charge, battery_step)
+    levels = max(initial_units, battery_to_units(max_capacity, battery_step)) + 1
+    num_states = compiled.num_nodes * levels
+
+    initial_state = orig_i * levels + initial_units
+
+    # g, predecesor y marcas en el StateStore compartido (sin limpiar entre
+    # consultas: solo vale lo sellado con la generación actual). Solo se
+    # escriben estados que entran al frente, así que g no necesita sello
+    store = get_state_store()
+    generation = store.reset(num_states)
+    g_score = store.g
+    came_from = store.parent
+    closed = store.closed
+
+    # Estados sacados del frente después de encolados (se saltean al salir)
+    superseded = store.dropped
+
+    g_score[initial_state] = 0.0
+    came_from[initial_state] = -1
+
+    # Frente de Pareto por nodo: lista de (unidades, energía acumulada) no dominadas
+    fronts: Dict[int, List[Tuple[int, float]]] = {orig_i: [(initial_units, 0.0)]}
+
+    counter = 0
+    pq = [(heuristic_func(G, orig, dest) * gamma_min, counter, initial_state)]
+    counter += 1
+
+    nodes_expanded = 0
+    labels_dominated = 0
+    labels_superseded = 0
+    stale_pops = 0
+
+    def add_label(node: int, battery: int, g: float) -> bool:
+        """Agrega la etiqueta al frente del nodo; False si está dominada."""
+        nonlocal labels_dominated, labels_superseded
+
+        front = fronts.get(node)
+        if front is None:
+            fronts[node] = [(battery, g)]
+            return True
+
+        for front_battery, front_g in front:
+            if front_battery >= battery and front_g <= g:
+                labels_dominated += 1
+                return False
+
+        kept = []
+        for front_battery, front_g in front:
+            if front_battery <= battery and front_g >= g:
+                superseded[node * levels + front_battery] = generation
+                labels_superseded += 1
+            else:
+                kept.append((front_battery, front_g))
+        kept.append((battery, g))
+        fronts[node] = kept
+        superseded[node * levels + battery] = 0
+        return True
+
+    def fill_stats() -> None:
+        if stats is not None:
+            stats.update(
+                nodes_expanded=nodes_expanded,
+                heap_pushes=counter,
+                labels_dominated=labels_dominated,
+                labels_superseded=labels_superseded,
+                stale_pops=stale_pops,
+            )
+
+    while pq:
+        _, _, current_state = heapq.heappop(pq)
+
+        if closed[current_state] == generation or superseded[current_state] == generation:
+            stale_pops += 1
+            continue
+
+        closed[current_state] = generation
+        nodes_expanded += 1
+
+        current_node, current_battery = divmod(current_state, levels)
+
+        if current_node == dest_i:
+            steps = reconstruct_packed_path(came_from, current_state, levels, charger_set)
+            if return_battery_info:
+                path = [
+                    (node_ids[node], units * battery_step, recharged)
+                    for node, units, recharged in steps
+                ]
+            else:
+                path = []
+                for node, _, _ in steps:
+                    if not path or path[-1] != node_ids[node]:
+                        path.append(node_ids[node])
+
+            energy_total = g_score[current_state]
+            num_recharges = sum(1 for _, _, recharged in steps if recharged)
+            execution_time = time.perf_counter() - start_time
+
+            fill_stats()
+            return (path, energy_total, nodes_expanded, num_recharges, execution_time)
+
+        current_g = g_score[current_state]
+
+        for neighbor, energy_cost in adjacency[current_node]:
+            # NaN = la arista no tenía energy_cost: mismo fallback que astar_battery
+            if energy_cost != energy_cost:
+                distance = euclidean_distance(G, node_ids[current_node], node_ids[neighbor])
+                energy_cost = distance * gamma_min
+
+            cost_units = energy_cost / battery_step
+
+            if current_battery >= cost_units:
+                new_battery = int(current_battery - cost_units + 0.5)
+                tentative_g = current_g + energy_cost
+
+                if add_label(neighbor, new_battery, tentative_g):
+                    neighbor_state = neighbor * levels + new_battery
+                    came_from[neighbor_state] = current_state
+                    g_score[neighbor_state] = tentative_g
+
+                    h = heuristic_func(G, node_ids[neighbor], dest) * gamma_min
+
+                    heapq.heappush(pq, (tentative_g + h, counter, neighbor_state))
+                    counter += 1
+
+        if current_node in charger_set:
+            recharged_battery = int(min(capacity_units, current_battery + recharge_units) + 0.5)
+
+            if recharged_battery > current_battery and add_label(
+                current_node, recharged_battery, current_g
+            ):
+                recharged_state = current_node * levels + recharged_battery
+                came_from[recharged_state] = current_state
+                g_score[recharged_state] = current_g
+
+                h = heuristic_func(G, node_ids[current_node], dest) * gamma_min
+
+                heapq.heappush(pq, (current_g + h, counter, recharged_state))
+                counter += 1
+
+    fill_stats()
+    return None
@@ -0,0 +1,278 @@
+"""
+Colas de prioridad intercambiables para la lista abierta de los núcleos.
+
+Todas comparten la misma interfaz:
+    push(estado, clave)  agrega el estado o, si ya estaba, baja su clave
+    pop() -> (clave, estado)  saca el estado de menor clave
+    len(cola)  cantidad de estados pendientes
+y los contadores pushes, pops y peak_size (tamaño máximo de la estructura).
+
+Los empates se resuelven por orden de llegada, como el contador de las
+tuplas (f, contador, estado) de heapq, así que las tres colas expanden los
+estados en el mismo orden y devuelven el mismo camino:
+
+- "heapq": heapq con borrado perezoso (la de siempre). Cada mejora agrega
+  una tupla nueva y las viejas se descartan al salir, por lo que el heap
+  puede crecer varias veces el número de estados vivos.
+- "indexed" / "binary": heap indexado 4-ario / binario con decrease-key;
+  cada estado ocupa un único lugar.
+- "bucket": cubetas de ancho fijo sobre la clave (las energías son no
+  negativas y acotadas) recorridas con un cursor que solo avanza, con un
+  heap chico por cubeta. Necesita claves monótonas: sirve para A* con una
+  heurística consistente, no para Greedy (que ordena solo por h). Las
+  claves infinitas (heurísticas como ALT o CH devuelven inf en nodos que no
+  llegan al destino) van a una cubeta de desborde que sale última.
+"""
+
+from heapq import heappop, heappush
+from typing import Dict, Hashable, List, Tuple
+
+# Ancho de cubeta por defecto (kWh): del orden de una décima de arista urbana
+BUCKET_WIDTH = 0.01
+
+INF = float("inf")
+
+
+class HeapqQueue:
+    """heapq con borrado perezoso: los duplicados quedan en el heap."""
+
+    def __init__(self):
+        self._heap: List[Tuple[float, int, Hashable]] = []
+        self.pushes = 0
+        self.pops = 0
+        self.peak_size = 0
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def push(self, state: Hashable, key: float) -> None:
+        heappush(self._heap, (key, self.pushes, state))
+        self.pushes += 1
+        if len(self._heap) > self.peak_size:
+            self.peak_size = len(self._heap)
+
+    def pop(self) -> Tuple[float, Hashable]:
+        key, _, state = heappop(self._heap)
+        self.pops += 1
+        return key, state
+
+
+class IndexedHeap:
+    """
+    Heap d-ario indexado con decrease-key.
+
+    Cada estado aparece una sola vez; _pos guarda su posición en el heap.
+    Las claves son tuplas (clave, orden_de_llegada) para desempatar igual
+    que heapq: si push no mejora la clave, la entrada existente se conserva
+    porque ya saldría antes que una nueva.
+    """
+
+    def __init__(self, arity: int = 4):
+        self.arity = arity
+        self._keys: List[Tuple[float, int]] = []
+        self._states: List[Hashable] = []
+        self._pos: Dict[Hashable, int] = {}
+        self.pushes = 0
+        self.pops = 0
+        self.peak_size = 0
+        self.decrease_keys = 0
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def push(self, state: Hashable, key: float) -> None:
+        order = self.pushes
+        self.pushes += 1
+
+        i = self._pos.get(state)
+        if i is None:
+            i = len(self._states)
+            self._keys.append((key, order))
+            self._states.append(state)
+            if i + 1 > self.peak_size:
+                self.peak_size = i + 1
+            self._sift_up(i)
+        elif key < self._keys[i][0]:
+            self._keys[i] = (key, order)
+            self.decrease_keys += 1
+            self._sift_up(i)
+
+    def pop(self) -> Tuple[float, Hashable]:
+        keys = self._keys
+        states = self._states
+
+        key = keys[0][0]
+        state = states[0]
+        del self._pos[state]
+        self.pops += 1
+
+        last_key = keys.pop()
+        last_state = states.pop()
+        if states:
+            keys[0] = last_key
+            states[0] = last_state
+            self._sift_down(0)
+        return key, state
+
+    def _sift_up(self, i: int) -> None:
+        keys = self._keys
+        states = self._states
+        pos = self._pos
+        arity = self.arity
+
+        item_key = keys[i]
+        item_state = states[i]
+        while i > 0:
+            parent = (i - 1) // arity
+            parent_key = keys[parent]
+            if not item_key < parent_key:
+                break
+            keys[i] = parent_key
+            moved = states[parent]
+            states[i] = moved
+            pos[moved] = i
+            i = parent
+        keys[i] = item_key
+        states[i] = item_state
+        pos[item_state] = i
+
+    def _sift_down(self, i: int) -> None:
+        keys = self._keys
+        states = self._states
+        pos = self._pos
+        arity = self.arity
+        n = len(keys)
+
+        item_key = keys[i]
+        item_state = states[i]
+        while True:
+            first = arity * i + 1
+            if first >= n:
+                break
+            best = first
+            best_key = keys[first]
+            for child in range(first + 1, min(first + arity, n)):
+                if keys[child] < best_key:
+                    best = child
+                    best_key = keys[child]
+            if not best_key < item_key:
+                break
+            keys[i] = best_key
+            moved = states[best]
+            states[i] = moved
+            pos[moved] = i
+            i = best
+        keys[i] = item_key
+        states[i] = item_state
+        pos[item_state] = i
+
+
+class BucketQueue:
+    """
+    Cola de cubetas monótona (Dial) con claves reales.
+
+    La cubeta de una clave es floor(clave / width); las cubetas son una
+    lista indexada por ese número y pop avanza el cursor hacia adelante
+    hasta la primera no vacía. Dentro de cada cubeta un heap chico ordena
+    por (clave, orden_de_llegada), así que el orden es exacto aunque la
+    cubeta mezcle claves distintas. Una mejora agrega una entrada nueva y la
+    vieja se descarta al salir; _live guarda la vigente de cada estado.
+
+    Las claves tienen que ser monótonas (f de A* con heurística
+    consistente): una clave en una cubeta anterior al cursor es un error.
+    Las claves infinitas van a una cubeta de desborde que sale última.
+    """
+
+    def __init__(self, width: float = BUCKET_WIDTH):
+        self.width = width
+        self._buckets: List[List[Tuple[float, int, Hashable]]] = []
+        self._overflow: List[Tuple[float, int, Hashable]] = []
+        self._live: Dict[Hashable, Tuple[float, int]] = {}
+        self._cursor = 0
+        self._entries = 0
+        self.pushes = 0
+        self.pops = 0
+        self.peak_size = 0
+
+    def __len__(self) -> int:
+        return len(self._live)
+
+    def push(self, state: Hashable, key: float) -> None:
+        order = self.pushes
+        self.pushes += 1
+
+        old = self._live.get(state)
+        if old is not None and not key < old[0]:
+            return
+
+        if key < INF:
+            index = int(key // self.width)
+            if index < self._cursor:
+                if self._live:
+                    raise ValueError(
+                        f"BucketQueue necesita claves monótonas: {key} es menor que la "
+                        f"cubeta actual ({self._cursor * self.width})"
+                    )
+                # Cola vacía: se puede empezar de nuevo desde cualquier clave
+                self._cursor = index
+            buckets = self._buckets
+            if index >= len(buckets):
+                buckets.extend([] for _ in range(index + 1 - len(buckets)))
+            heappush(buckets[index], (key, order, state))
+        else:
+            heappush(self._overflow, (key, order, state))
+
+        self._live[state] = (key, order)
+        self._entries += 1
+        if self._entries > self.peak_size:
+            self.peak_size = self._entries
+
+    def pop(self) -> Tuple[float, Hashable]:
+        buckets = self._buckets
+        live = self._live
+        while True:
+            while self._cursor < len(buckets) and not buckets[self._cursor]:
+                self._cursor += 1
+            bucket = buckets[self._cursor] if self._cursor < len(buckets) else self._overflow
+            key, order, state = heappop(bucket)
+            self._entries -= 1
+            if live.get(state) == (key, order):
+                break
+
+        del live[state]
+        self.pops += 1
+        return key, state
+
+
+QUEUE_TYPES = {
+    "heapq": HeapqQueue,
+    "indexed": IndexedHeap,
+    "binary": lambda: IndexedHeap(arity=2),
+    "bucket": BucketQueue,
+}
+
+
+def make_priority_queue(queue="heapq"):
+    """
+    Crea la cola de prioridad de una búsqueda.
+
+    Args:
+        queue: Nombre en QUEUE_TYPES, o una función sin argumentos que
+            devuelva una cola con la misma interfaz
+
+    Returns:
+        La cola vacía
+    """
+    if callable(queue):
+        return queue()
+    try:
+        return QUEUE_TYPES[queue]()
+    except KeyError:
+        raise ValueError(
+            f"Cola de prioridad desconocida: {queue!r} (opciones: {', '.join(QUEUE_TYPES)})"
+        ) from None
+
+
+def queue_counters(pq) -> Dict[str, int]:
+    """Contadores de la cola con los nombres que usan las estadísticas de búsqueda."""
+    return {"heap_pushes": pq.pushes, "heap_pops": pq.pops, "heap_peak": pq.peak_size}
@@ -0,0 +1,335 @@
+"""
+Caché de resultados de ruteo (LRU en memoria + copia opcional en disco).
+
+Las mismas consultas barrio a barrio se repiten con el mismo vehículo y los
+mismos cargadores. RouteCache.route se pone delante de astar_battery,
+greedy_battery o cualquier motor con la misma firma y devuelve el resultado
+guardado si la consulta ya se resolvió.
+
+La clave incluye todo lo que cambia el resultado:
+- el motor y la huella del grafo (CompiledGraph.fingerprint)
+- origen y destino
+- la carga inicial en unidades de batería (las búsquedas ya la redondean así)
+- capacidad, recarga, gamma_min, heurística y el resto de los parámetros
+- un hash del conjunto de cargadores
+
+La heurística (y una cola pasada como fábrica) entra a la clave por su
+módulo y nombre calificado y, si es una instancia como ALTHeuristic, por
+sus atributos públicos. Las lambdas, las funciones locales y los objetos
+con estado que no se puede representar no tienen un nombre estable: esas
+consultas se resuelven sin caché.
+
+Si load_graph devuelve otro grafo o cambian los cargadores, la clave cambia:
+las entradas viejas ya no se encuentran y el LRU las descarta.
+
+Cada entrada guarda también los contadores que la búsqueda agregó a stats
+(nodes_expanded, heap_pushes, heuristic_evaluations, ...). En un acierto se
+vuelven a copiar en stats junto con cache_hit=True, así que las tablas del
+benchmark no quedan con huecos en las consultas que salieron de la caché.
+"""
+
+import functools
+import hashlib
+import inspect
+import json
+import os
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from graph.compiled_graph import get_compiled_graph
+from utils.helpers import BATTERY_STEP, battery_to_units
+
+ROUTE_CACHE_DIR = os.path.join("cache", "routes")
+
+# Parámetros que no cambian el resultado y no forman parte de la clave
+_IGNORED_PARAMS = ("G", "stats")
+
+
+class RouteCache:
+    """
+    Caché LRU de resultados con límite de entradas y de memoria.
+
+    Args:
+        max_entries: Cantidad máxima de resultados en memoria
+        max_bytes: Memoria máxima aproximada (tamaño del resultado en JSON)
+        disk_dir: Carpeta para la copia en disco (None = solo memoria)
+
+    Atributos:
+        hits, misses, disk_hits, evictions: Contadores desde la creación
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 4096,
+        max_bytes: int = 64 * 2**20,
+        disk_dir: Optional[str] = None,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.disk_dir = Path(disk_dir) if disk_dir is not None else None
+
+        # clave -> (resultado, contadores de la búsqueda, tamaño)
+        self._entries: "OrderedDict[Tuple, Tuple[Any, Dict, int]]" = OrderedDict()
+        self.nbytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def route(self, search_func, G, orig: int, dest: int, **kwargs):
+        """
+        Resultado de search_func(G, orig, dest, **kwargs), desde la caché si
+        la consulta ya se resolvió.
+
+        En un acierto el tiempo de ejecución del resultado es el de la
+        búsqueda en la caché; el resto (camino, energía, nodos expandidos,
+        recargas) es el de la búsqueda original. Si se pasa stats, se le
+        agrega cache_hit y, en un acierto, los contadores de la búsqueda
+        original.
+        """
+        start_time = time.perf_counter()
+        key = self.make_key(search_func, G, orig, dest, kwargs)
+        return self.resolve(
+            key, lambda: search_func(G, orig, dest, **kwargs), kwargs.get("stats"), start_time
+        )
+
+    def resolve(self, key: Optional[Tuple], search, stats: Optional[Dict] = None, start_time=None):
+        """
+        Resultado guardado bajo key o, si no está, el de search() (que se
+        guarda). Es la parte de route que no depende de la firma del motor:
+        RoutingEngine la usa con la clave de astar_battery.
+
+        Args:
+            key: Clave de make_key (None = no se cachea)
+            search: Función sin argumentos que resuelve la consulta
+            stats: El mismo diccionario que recibe search (o None)
+            start_time: Inicio de la consulta para el tiempo de un acierto
+        """
+        if start_time is None:
+            start_time = time.perf_counter()
+        if key is None:
+            if stats is not None:
+                stats["cache_hit"] = False
+            return search()
+
+        found, result, search_stats = self.get(key)
+        if found:
+            if stats is not None:
+                stats.update(search_stats)
+                stats["cache_hit"] = True
+            if result is None:
+                return None
+            # Copia del camino: quien lo modifique no toca la entrada guardada
+            return (list(result[0]),) + result[1:-1] + (time.perf_counter() - start_time,)
+
+        before = dict(stats) if stats is not None else None
+        result = search()
+        search_stats = {}
+        if stats is not None:
+            search_stats = _added_stats(before, stats)
+            stats["cache_hit"] = False
+        self.put(key, result, search_stats)
+        return result
+
+    def make_key(self, search_func, G, orig: int, dest: int, kwargs: Dict) -> Optional[Tuple]:
+        """
+        Clave de una consulta (ver el docstring del módulo), o None si la
+        heurística o la cola no tienen un nombre estable.
+        """
+        bound = inspect.signature(search_func).bind(G, orig, dest, **kwargs)
+        bound.apply_defaults()
+        params = dict(bound.arguments)
+
+        battery_step = params.get("battery_step", BATTERY_STEP)
+        if "initial_charge" in params:
+            params["initial_charge"] = battery_to_units(params["initial_charge"], battery_step)
+        if "charger_nodes" in params:
+            params["charger_nodes"] = charger_set_hash(params["charger_nodes"] or [])
+        for name in ("heuristic_func", "queue"):
+            if callable(params.get(name)):
+                params[name] = callable_key(params[name])
+                if params[name] is None:
+                    return None
+
+        return (
+            f"{search_func.__module__}.{search_func.__name__}",
+            get_compiled_graph(G).fingerprint(),
+        ) + tuple(
+            (name, value) for name, value in params.items() if name not in _IGNORED_PARAMS
+        )
+
+    def get(self, key: Tuple) -> Tuple[bool, Any]:
+        """
+        Busca una clave en memoria y, si no está, en disco.
+
+        Returns:
+            Tupla (encontrado, resultado, contadores); el resultado puede ser
+            None (la consulta no tenía camino viable) y los contadores son
+            los que la búsqueda original agregó a stats
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, entry[0], dict(entry[1])
+
+        if self.disk_dir is not None:
+            found, result, search_stats = self._load(key)
+            if found:
+                self.hits += 1
+                self.disk_hits += 1
+                self._store(key, result, search_stats)
+                return True, result, dict(search_stats)
+
+        self.misses += 1
+        return False, None, {}
+
+    def put(self, key: Tuple, result, search_stats: Optional[Dict] = None) -> None:
+        """
+        Guarda un resultado y los contadores de su búsqueda en memoria (y en
+        disco si hay disk_dir).
+        """
+        search_stats = _json_stats(search_stats or {})
+        self._store(key, result, search_stats)
+        if self.disk_dir is not None:
+            self._save(key, result, search_stats)
+
+    def clear(self) -> None:
+        """Vacía la memoria (la copia en disco se conserva)."""
+        self._entries.clear()
+        self.nbytes = 0
+
+    def counters(self) -> Dict[str, int]:
+        """Contadores y ocupación actual de la caché."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "disk_hits": self.disk_hits,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "nbytes": self.nbytes,
+        }
+
+    def _store(self, key: Tuple, result, search_stats: Dict) -> None:
+        if result is not None:
+            result = (list(result[0]),) + tuple(result[1:])
+        size = len(_encode(result)) + len(_encode(search_stats))
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.nbytes -= old[2]
+        self._entries[key] = (result, search_stats, size)
+        self.nbytes += size
+
+        # Se descartan las menos usadas recientemente (nunca la recién agregada)
+        while len(self._entries) > 1 and (
+            len(self._entries) > self.max_entries or self.nbytes > self.max_bytes
+        ):
+            _, (_, _, evicted_size) = self._entries.popitem(last=False)
+            self.nbytes -= evicted_size
+            self.evictions += 1
+
+    def _disk_path(self, key: Tuple) -> Path:
+        digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()[:24]
+        return self.disk_dir / f"route_{digest}.json"
+
+    def _load(self, key: Tuple) -> Tuple[bool, Any, Dict]:
+        path = self._disk_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            return False, None, {}
+        # Dos claves con el mismo hash corto: no es esta consulta
+        if record.get("key") != repr(key):
+            return False, None, {}
+        # Los archivos anteriores a los contadores no tienen "stats"
+        return True, _decode(record["result"]), record.get("stats", {})
+
+    def _save(self, key: Tuple, result, search_stats: Dict) -> None:
+        path = self._disk_path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"key": repr(key), "result": result, "stats": search_stats}, f)
+            os.replace(tmp_path, path)
+        except OSError:
+            # La copia en disco es solo una optimización
+            pass
+
+
+def charger_set_hash(charger_nodes) -> str:
+    """Hash del conjunto de cargadores (no depende del orden ni de repetidos)."""
+    return hashlib.sha1(
+        ",".join(str(n) for n in sorted(set(charger_nodes))).encode("utf-8")
+    ).hexdigest()[:12]
+
+
+def callable_key(func) -> Optional[str]:
+    """
+    Nombre estable de una heurística o fábrica: módulo.nombre_calificado,
+    más los atributos públicos si es una instancia (ALTHeuristic(8) y
+    ALTHeuristic(16) son claves distintas).
+
+    Returns:
+        El nombre, o None si no hay uno que identifique al callable (lambdas,
+        funciones locales, atributos que no son valores simples)
+    """
+    if inspect.isfunction(func) or inspect.isbuiltin(func) or inspect.isclass(func):
+        qualname = getattr(func, "__qualname__", "")
+        if "<lambda>" in qualname or "<locals>" in qualname:
+            return None
+        return f"{func.__module__}.{qualname}"
+
+    if inspect.ismethod(func) or isinstance(func, functools.partial):
+        return None
+    cls = type(func)
+    if "<locals>" in cls.__qualname__:
+        return None
+    state = []
+    for name, value in sorted(vars(func).items()):
+        if name.startswith("_"):
+            continue
+        if not isinstance(value, (str, int, float, bool, type(None))):
+            return None
+        state.append(f"{name}={value!r}")
+    return f"{cls.__module__}.{cls.__qualname__}({', '.join(state)})"
+
+
+def _added_stats(before: Dict, stats: Dict) -> Dict:
+    """Entradas de stats que la búsqueda agregó o cambió (sin cache_hit)."""
+    return {
+        name: value
+        for name, value in stats.items()
+        if name != "cache_hit" and (name not in before or before[name] != value)
+    }
+
+
+def _json_stats(search_stats: Dict) -> Dict:
+    """Contadores que se pueden guardar en JSON (los demás no se replican)."""
+    kept = {}
+    for name, value in search_stats.items():
+        try:
+            json.dumps(value)
+        except (TypeError, ValueError):
+            continue
+        kept[name] = value
+    return kept
+
+
+def _encode(result) -> str:
+    return json.dumps(result)
+
+
+def _decode(result):
+    """Resultado leído de JSON: vuelve a armar las tuplas."""
+    if result is None:
+        return None
+    path = [tuple(step) if isinstance(step, list) else step for step in result[0]]
+    return (path,) + tuple(result[1:])
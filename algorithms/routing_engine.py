@@ -0,0 +1,230 @@
+"""
+Motor de ruteo reutilizable para muchas consultas sobre el mismo grafo.
+
+astar_battery prepara todo en cada llamada: el conjunto de cargadores, las
+vistas del grafo compilado y, para cada nodo que encola, vuelve a evaluar la
+heurística. RoutingEngine hace ese trabajo una sola vez por grafo y conjunto
+de cargadores:
+
+- un SearchContext con el mapa de bits de cargadores y el StateStore
+- una tabla de heurística por destino (las últimas max_destinations): con
+  heurísticas que tienen precompute (ALT, CH, *_km) se calcula entera con
+  NumPy; con las demás se llena a medida que la búsqueda visita nodos
+
+route(orig, dest, vehicle) devuelve exactamente lo mismo que astar_battery
+con los mismos parámetros. Con cache=RouteCache(...) las consultas pasan por
+esa caché con la clave de astar_battery: un acierto no corre la búsqueda y
+comparte entradas con RouteCache.route(astar_battery, ...).
+"""
+
+import time
+from array import array
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from algorithms.astar_battery_core import astar_battery, astar_search
+from algorithms.search_context import SearchContext
+from utils.helpers import BATTERY_STEP, battery_to_units, euclidean_distance
+
+
+class Vehicle:
+    """
+    Parámetros del vehículo para una consulta.
+
+    Args:
+        max_capacity: Capacidad máxima de batería (kWh)
+        initial_charge: Carga inicial (kWh); None = batería llena
+        recharge_amount: Energía recargada en cada estación (kWh)
+        gamma_min: Consumo mínimo por km para la heurística (kWh/km)
+        battery_step: Tamaño de la unidad de batería (kWh)
+    """
+
+    def __init__(
+        self,
+        max_capacity: float = 100.0,
+        initial_charge: Optional[float] = None,
+        recharge_amount: float = 80.0,
+        gamma_min: float = 0.15,
+        battery_step: float = BATTERY_STEP,
+    ):
+        self.max_capacity = max_capacity
+        self.initial_charge = max_capacity if initial_charge is None else initial_charge
+        self.recharge_amount = recharge_amount
+        self.gamma_min = gamma_min
+        self.battery_step = battery_step
+
+    def battery_levels(self) -> int:
+        """Cantidad de niveles de batería de los estados de búsqueda."""
+        return max(
+            battery_to_units(self.initial_charge, self.battery_step),
+            battery_to_units(self.max_capacity, self.battery_step),
+        ) + 1
+
+
+class RoutingEngine:
+    """
+    Consultas A* con batería sobre un grafo y un conjunto de cargadores fijos.
+
+    Args:
+        G: Grafo de NetworkX (se compila una vez) o CompiledGraph
+        charger_nodes: Nodos con cargador
+        heuristic_func: Heurística heuristic_func(G, nodo, destino); por
+            defecto la distancia euclidiana
+        max_destinations: Destinos cuya tabla de heurística se conserva
+        queue: Cola de prioridad de la lista abierta (ver astar_battery)
+        cache: RouteCache para los resultados (None = sin caché)
+    """
+
+    def __init__(
+        self,
+        G,
+        charger_nodes: Optional[List[int]] = None,
+        heuristic_func=None,
+        max_destinations: int = 16,
+        queue="heapq",
+        cache=None,
+    ):
+        self.context = SearchContext(G, charger_nodes)
+        self.charger_nodes = list(charger_nodes or [])
+        self.heuristic_func = heuristic_func or euclidean_distance
+        self.max_destinations = max_destinations
+        self.queue = queue
+        self.cache = cache
+
+        if hasattr(self.heuristic_func, "prepare"):
+            self.heuristic_func.prepare(self.context.graph)
+
+        # índice del destino -> h de cada nodo (NaN = todavía no calculada)
+        self._tables: "OrderedDict[int, object]" = OrderedDict()
+
+    def reserve(self, vehicle: Vehicle) -> int:
+        """
+        Reserva el StateStore para los estados de este vehículo.
+
+        Returns:
+            Memoria reservada (bytes)
+        """
+        store = self.context.store
+        store.reserve(self.context.graph.num_nodes * vehicle.battery_levels())
+        return store.nbytes
+
+    def route(
+        self,
+        orig: int,
+        dest: int,
+        vehicle: Vehicle,
+        return_battery_info: bool = False,
+        stats: Optional[Dict] = None,
+    ) -> Optional[Tuple[List, float, int, int, float]]:
+        """
+        Camino de energía mínima de orig a dest (IDs originales).
+
+        Si se pasa stats, heuristic_evaluations cuenta los nodos cuya
+        heurística se calculó en esta consulta (0 si la tabla del destino ya
+        estaba completa). Si la consulta sale de la caché, stats recibe los
+        contadores de la búsqueda original y cache_hit=True.
+
+        Returns:
+            Lo mismo que astar_battery con los parámetros de vehicle
+        """
+        if self.cache is None:
+            return self._search(orig, dest, vehicle, return_battery_info, stats)
+
+        start_time = time.perf_counter()
+        key = self.cache.make_key(
+            astar_battery,
+            self.context.graph,
+            orig,
+            dest,
+            {
+                "max_capacity": vehicle.max_capacity,
+                "initial_charge": vehicle.initial_charge,
+                "gamma_min": vehicle.gamma_min,
+                "charger_nodes": self.charger_nodes,
+                "recharge_amount": vehicle.recharge_amount,
+                "heuristic_func": self.heuristic_func,
+                "return_battery_info": return_battery_info,
+                "battery_step": vehicle.battery_step,
+                "queue": self.queue,
+            },
+        )
+        return self.cache.resolve(
+            key,
+            lambda: self._search(orig, dest, vehicle, return_battery_info, stats),
+            stats,
+            start_time,
+        )
+
+    def _search(self, orig, dest, vehicle, return_battery_info, stats):
+        """Búsqueda A* de route, sin caché."""
+        start_time = time.perf_counter()
+
+        context = self.context
+        dest_i = context.node_index[dest]
+        cached = dest_i in self._tables
+        table = self._heuristic_table(dest, dest_i)
+        gamma_min = vehicle.gamma_min
+
+        if isinstance(table, list):
+            def heuristic(node: int) -> float:
+                return table[node] * gamma_min
+        else:
+            heuristic_func = self.heuristic_func
+            graph = context.graph
+            node_ids = context.node_ids
+
+            def heuristic(node: int) -> float:
+                h = table[node]
+                if h != h:
+                    h = table[node] = heuristic_func(graph, node_ids[node], dest)
+                return h * gamma_min
+
+        if stats is not None and not isinstance(table, list):
+            missing = _count_missing(table)
+
+        result = astar_search(
+            context,
+            context.node_index[orig],
+            dest_i,
+            vehicle.max_capacity,
+            vehicle.initial_charge,
+            gamma_min,
+            vehicle.recharge_amount,
+            heuristic,
+            return_battery_info,
+            stats,
+            vehicle.battery_step,
+            self.queue,
+            start_time,
+        )
+
+        if stats is not None:
+            if isinstance(table, list):
+                stats["heuristic_evaluations"] = 0 if cached else len(table)
+            else:
+                stats["heuristic_evaluations"] = missing - _count_missing(table)
+        return result
+
+    def _heuristic_table(self, dest: int, dest_i: int):
+        """Tabla de heurística del destino (sin multiplicar por gamma_min)."""
+        table = self._tables.get(dest_i)
+        if table is not None:
+            self._tables.move_to_end(dest_i)
+            return table
+
+        if hasattr(self.heuristic_func, "precompute"):
+            table = self.heuristic_func.precompute(self.context.graph, dest).tolist()
+        else:
+            table = array("d", [float("nan")]) * self.context.graph.num_nodes
+
+        self._tables[dest_i] = table
+        if len(self._tables) > self.max_destinations:
+            self._tables.popitem(last=False)
+        return table
+
+
+def _count_missing(table) -> int:
+    """Nodos de una tabla perezosa cuya heurística todavía no se calculó."""
+    return int(np.count_nonzero(np.isnan(np.frombuffer(table))))
@@ -0,0 +1,44 @@
+"""
+Contexto de búsqueda: lo que depende solo del grafo y de los cargadores.
+
+Cada consulta sobre un CompiledGraph necesita las listas de adyacencia, los
+IDs de los nodos, saber qué nodos tienen cargador y los arreglos del
+StateStore. SearchContext los reúne en un objeto: astar_battery arma uno por
+llamada, y RoutingEngine (algorithms/routing_engine.py) arma uno solo y lo
+reutiliza en todas sus consultas.
+"""
+
+from typing import List, Optional
+
+from algorithms.state_store import get_state_store
+from graph.compiled_graph import get_compiled_graph
+
+
+class SearchContext:
+    """
+    Datos compartidos por las búsquedas sobre un grafo y un conjunto de cargadores.
+
+    Atributos:
+        graph: CompiledGraph
+        adjacency: Listas de adyacencia (vecino, energy_cost) por índice
+        node_ids: ID original de cada índice
+        charger_set: Índices de los nodos con cargador
+        is_charger: Mapa de bits (un byte por nodo, 1 = cargador)
+        store: StateStore donde viven g, predecesores y marcas
+    """
+
+    def __init__(self, G, charger_nodes: Optional[List[int]] = None, store_name: str = "search"):
+        compiled = get_compiled_graph(G)
+        self.graph = compiled
+        self.adjacency = compiled.adjacency()
+        self.node_ids = compiled.node_ids_list
+        self.node_index = compiled.node_index
+
+        self.charger_set = {
+            compiled.node_index[n] for n in (charger_nodes or []) if n in compiled.node_index
+        }
+        self.is_charger = bytearray(compiled.num_nodes)
+        for i in self.charger_set:
+            self.is_charger[i] = 1
+
+        self.store = get_state_store(store_name)
@@ -0,0 +1,96 @@
+"""
+Instrumentación opcional de los núcleos de búsqueda (profile=True).
+
+Sin profile los núcleos solo llevan los contadores que ya tenían
+(nodes_expanded y los de la cola). Con profile=True la lista abierta se
+envuelve en un ProfiledQueue, que cuenta el resto desde afuera del bucle de
+expansión, y se toman marcas de perf_counter_ns al empezar, al encontrar el
+destino y al terminar de reconstruir el camino. Así la búsqueda sin
+instrumentar sigue siendo exactamente el mismo código.
+
+Contadores que se agregan a stats (PROFILE_KEYS):
+    stale_pops: estados sacados de la cola que ya estaban expandidos
+    recharge_states: estados de recarga encolados
+    states_stored: estados distintos con g guardado (tamaño pico del
+        almacén de estados: no se borran durante la consulta)
+    expansion_ns: tiempo hasta sacar el destino de la cola (o hasta
+        agotar la búsqueda)
+    reconstruction_ns: tiempo de reconstruir el camino
+
+Las evaluaciones de la heurística ya las informan los núcleos siempre, en
+stats["heuristic_evaluations"].
+"""
+
+from time import perf_counter_ns
+from typing import Callable, Dict, Hashable, Optional, Set, Tuple
+
+PROFILE_KEYS = (
+    "stale_pops",
+    "recharge_states",
+    "states_stored",
+    "expansion_ns",
+    "reconstruction_ns",
+)
+
+
+class ProfiledQueue:
+    """
+    Envuelve una cola de algorithms/priority_queues.py y la instrumenta.
+
+    Un push es de recarga si el estado encolado es el mismo nodo que el
+    último estado sacado (el que se está expandiendo) con más batería: las
+    aristas nunca suben la batería.
+
+    Args:
+        pq: Cola a envolver
+        decode: decode(estado) -> (nodo, unidades_de_batería)
+    """
+
+    def __init__(self, pq, decode: Callable[[Hashable], Tuple[int, int]]):
+        self._pq = pq
+        self._decode = decode
+        self._states: Set[Hashable] = set()
+        self._expanding: Optional[Tuple[int, int]] = None
+        self.recharge_pushes = 0
+        self.start_ns = perf_counter_ns()
+
+    def __len__(self) -> int:
+        return len(self._pq)
+
+    def __getattr__(self, name):
+        # pushes, pops, peak_size, decrease_keys... de la cola envuelta
+        return getattr(self._pq, name)
+
+    def push(self, state: Hashable, key: float) -> None:
+        expanding = self._expanding
+        if expanding is not None:
+            node, battery = self._decode(state)
+            if node == expanding[0] and battery > expanding[1]:
+                self.recharge_pushes += 1
+        self._states.add(state)
+        self._pq.push(state, key)
+
+    def pop(self) -> Tuple[float, Hashable]:
+        key, state = self._pq.pop()
+        self._expanding = self._decode(state)
+        return key, state
+
+    def counters(self, nodes_expanded: int, found_ns: Optional[int] = None) -> Dict[str, int]:
+        """
+        Contadores de la consulta, con los nombres de PROFILE_KEYS.
+
+        Args:
+            nodes_expanded: Estados expandidos por el núcleo
+            found_ns: perf_counter_ns() al sacar el destino de la cola, o
+                None si no se encontró camino
+        """
+        end_ns = perf_counter_ns()
+        if found_ns is None:
+            found_ns = end_ns
+        return {
+            "stale_pops": self._pq.pops - nodes_expanded,
+            "recharge_states": self.recharge_pushes,
+            "states_stored": len(self._states),
+            "expansion_ns": found_ns - self.start_ns,
+            "reconstruction_ns": end_ns - found_ns,
+        }
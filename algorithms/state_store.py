@@ -0,0 +1,179 @@
+"""
+Almacén de estados reutilizable para los núcleos de búsqueda.
+
+Los núcleos sobre CompiledGraph identifican cada estado con un entero
+(índice_nodo * levels + unidades de batería). En lugar de crear diccionarios
+o arreglos nuevos en cada consulta, guardan g, el predecesor y las marcas de
+visitado en arreglos tipados que se reservan una vez y crecen si hace falta.
+
+Para no limpiar los arreglos entre consultas, cada consulta usa un número de
+generación: un valor solo cuenta si su sello coincide con la generación
+actual. Empezar una consulta nueva es incrementar ese número.
+
+Los arreglos densos ocupan num_states * BYTES_PER_STATE: con los valores por
+defecto de astar_battery (100 kWh en pasos de 0.1, 1001 niveles) son unos
+36 KB por nodo. Si una consulta necesitaría más de MAX_DENSE_BYTES, el
+almacén pasa a diccionarios con los mismos nombres (g, parent, seen...), que
+solo guardan los estados que la consulta toca; los núcleos no cambian.
+
+Los almacenes se comparten por proceso (get_state_store); no son seguros
+para usar desde varios hilos a la vez. release_state_stores devuelve la
+memoria.
+"""
+
+from array import array
+from typing import Dict
+
+# Los sellos son uint32: al llegar al máximo se limpian y se vuelve a empezar
+_MAX_GENERATION = 2**32 - 1
+
+# Tamaño máximo de los arreglos densos de un almacén (bytes); por encima se
+# usan diccionarios
+MAX_DENSE_BYTES = 512 * 2**20
+
+# Estados que se agregan por vez al crecer (acota el arreglo temporal)
+_GROW_CHUNK = 2**20
+
+_STORES: Dict[str, "StateStore"] = {}
+
+
+class SparseColumn(dict):
+    """Diccionario que devuelve default para los estados que no guarda."""
+
+    def __init__(self, default):
+        super().__init__()
+        self.default = default
+
+    def __missing__(self, state):
+        return self.default
+
+
+class StateStore:
+    """
+    Arreglos por estado indexados por el id empaquetado.
+
+    Atributos:
+        g: Costo acumulado (double); válido si seen[s] == generation
+        parent: Estado anterior (int64, -1 en el origen); válido si seen[s] == generation
+        aux: Valor adicional por estado (double), p. ej. el costo de la
+            transición en búsquedas hacia atrás; válido si seen[s] == generation
+        seen: Sello de los estados alcanzados en la consulta
+        closed: Sello de los estados ya expandidos
+        dropped: Sello de los estados descartados (dominados tras encolarse)
+        generation: Generación de la consulta actual
+        sparse: True si la consulta actual usa diccionarios (ver MAX_DENSE_BYTES)
+    """
+
+    # g + parent + aux (8 bytes c/u) + tres sellos de 4 bytes
+    BYTES_PER_STATE = 3 * 8 + 3 * 4
+
+    def __init__(self):
+        self.g = array("d")
+        self.parent = array("q")
+        self.aux = array("d")
+        self.seen = array("I")
+        self.closed = array("I")
+        self.dropped = array("I")
+        self.generation = 0
+        self.num_states = 0
+        self.sparse = False
+        self._dense = (self.g, self.parent, self.aux, self.seen, self.closed, self.dropped)
+
+    @property
+    def capacity(self) -> int:
+        """Cantidad de estados reservados en los arreglos densos."""
+        return len(self._dense[0])
+
+    @property
+    def nbytes(self) -> int:
+        """Memoria reservada por los arreglos densos (bytes)."""
+        return self.capacity * self.BYTES_PER_STATE
+
+    @classmethod
+    def fits_dense(cls, num_states: int) -> bool:
+        """True si num_states estados entran en arreglos densos (MAX_DENSE_BYTES)."""
+        return num_states * cls.BYTES_PER_STATE <= MAX_DENSE_BYTES
+
+    def reserve(self, num_states: int) -> None:
+        """
+        Asegura lugar para num_states estados (los nuevos quedan sin sello).
+
+        No reserva nada si no entran en MAX_DENSE_BYTES: esas consultas
+        usan diccionarios.
+        """
+        if not self.fits_dense(num_states):
+            return
+        defaults = (0.0, -1, 0.0, 0, 0, 0)
+        while self.capacity < num_states:
+            extra = min(num_states - self.capacity, _GROW_CHUNK)
+            for column, default in zip(self._dense, defaults):
+                column.extend(array(column.typecode, [default]) * extra)
+
+    def release(self) -> None:
+        """Libera los arreglos y diccionarios (la próxima consulta los vuelve a crear)."""
+        self.__init__()
+
+    def reset(self, num_states: int) -> int:
+        """
+        Empieza una consulta con num_states estados posibles.
+
+        Returns:
+            La generación de la consulta (el sello a comparar)
+        """
+        if self.fits_dense(num_states):
+            self.reserve(num_states)
+            self.g, self.parent, self.aux, self.seen, self.closed, self.dropped = self._dense
+            self.sparse = False
+        else:
+            self.g = SparseColumn(0.0)
+            self.parent = SparseColumn(-1)
+            self.aux = SparseColumn(0.0)
+            self.seen = SparseColumn(0)
+            self.closed = SparseColumn(0)
+            self.dropped = SparseColumn(0)
+            self.sparse = True
+        self.num_states = num_states
+        self.generation += 1
+        if self.generation > _MAX_GENERATION:
+            for stamps in self._dense[3:]:
+                stamps[:] = array("I", [0]) * len(stamps)
+            self.generation = 1
+        return self.generation
+
+
+def get_state_store(name: str = "search") -> StateStore:
+    """
+    Devuelve el almacén compartido con ese nombre (se crea la primera vez).
+
+    Los núcleos hacia adelante usan "search"; una búsqueda que necesita dos
+    almacenes a la vez (la bidireccional) usa además otro nombre.
+    """
+    store = _STORES.get(name)
+    if store is None:
+        store = _STORES[name] = StateStore()
+    return store
+
+
+def reserve_state_stores(num_states: int) -> int:
+    """
+    Reserva de antemano los almacenes que usan los núcleos de búsqueda.
+
+    Conviene llamarla antes de crear procesos hijos (fork), para que la
+    memoria ya esté reservada y no crezca durante las consultas.
+
+    Returns:
+        Memoria total reservada (bytes); 0 si num_states no entra en
+        MAX_DENSE_BYTES (las consultas usan diccionarios)
+    """
+    total = 0
+    for name in ("search", "backward"):
+        store = get_state_store(name)
+        store.reserve(num_states)
+        total += store.nbytes
+    return total
+
+
+def release_state_stores() -> None:
+    """Libera la memoria de todos los almacenes del proceso."""
+    for store in _STORES.values():
+        store.release()
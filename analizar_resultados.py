@@ -1,40 +1,96 @@
 import json
 import os
 import argparse
+import random
 from statistics import mean, median, stdev
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator
 
 import matplotlib.pyplot as plt
 
+from algorithms.search_profile import PROFILE_KEYS
+from utils.jsonl import iter_jsonl_records
+
 
 def load_resultados(path: str) -> Dict[str, Any]:
+    if path.endswith(".jsonl"):
+        config: Dict[str, Any] = {}
+        tests: List[Dict[str, Any]] = []
+        for record in iter_jsonl_records(path):
+            if record.get("type") == "config":
+                config = record["config"]
+            elif record.get("type") == "test":
+                tests.append(record["test"])
+        return {"config": config, "tests": sorted(tests, key=lambda t: t["test_id"])}
+
     with open(path, "r", encoding="utf-8") as f:
         return json.load(f)
 
 
+def iter_tests(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Recorre los tests de un resultados.json o de un checkpoint resultados.jsonl.
+
+    El JSONL se lee línea por línea, así que sirve para analizar corridas
+    largas (o todavía en curso) sin cargar el archivo entero.
+    """
+    if path.endswith(".jsonl"):
+        for record in iter_jsonl_records(path):
+            if record.get("type") == "test":
+                yield record["test"]
+    else:
+        yield from load_resultados(path).get("tests", [])
+
+
+def flatten_test(test: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Convierte un test en filas (test, algoritmo)."""
+    rows: List[Dict[str, Any]] = []
+    test_id = test["test_id"]
+    origen = test["origen_name"]
+    destino = test["destino_name"]
+    for alg in test.get("algorithms", []):
+        row = {
+            "test_id": test_id,
+            "origen": origen,
+            "destino": destino,
+            "algoritmo": alg["algoritmo"],
+            "tipo": alg["tipo"],
+            "gamma_min": alg["gamma_min"],
+            "energy_kwh": alg["energy_kwh"],
+            "nodes_expanded": alg["nodes_expanded"],
+            "heap_pushes": alg.get("heap_pushes"),
+            "heuristic_evaluations": alg.get("heuristic_evaluations"),
+            "peak_memory_kb": alg.get("peak_memory_kb"),
+            "nodes_expanded_forward": alg.get("nodes_expanded_forward"),
+            "nodes_expanded_backward": alg.get("nodes_expanded_backward"),
+            "num_recharges": alg["num_recharges"],
+            "time_seconds": alg["time_seconds"],
+            "time_p95_seconds": alg.get("time_p95_seconds"),
+            "time_iqr_seconds": alg.get("time_iqr_seconds"),
+            "time_repetitions": alg.get("time_repetitions", 1),
+            "path_length": alg["path_length"],
+            "reached_destination": alg["reached_destination"],
+        }
+        # Contadores de benchmark.py --profile (None si la corrida no los tiene)
+        for key in PROFILE_KEYS:
+            row[key] = alg.get(key)
+        rows.append(row)
+    return rows
+
+
 def flatten_runs(data: Dict[str, Any]) -> List[Dict[str, Any]]:
     """Convierte el JSON en una lista de filas (test, algoritmo)."""
     rows: List[Dict[str, Any]] = []
     for test in data.get("tests", []):
-        test_id = test["test_id"]
-        origen = test["origen_name"]
-        destino = test["destino_name"]
-        for alg in test.get("algorithms", []):
-            row = {
-                "test_id": test_id,
-                "origen": origen,
-                "destino": destino,
-                "algoritmo": alg["algoritmo"],
-                "tipo": alg["tipo"],
-                "gamma_min": alg["gamma_min"],
-                "energy_kwh": alg["energy_kwh"],
-                "nodes_expanded": alg["nodes_expanded"],
-                "num_recharges": alg["num_recharges"],
-                "time_seconds": alg["time_seconds"],
-                "path_length": alg["path_length"],
-                "reached_destination": alg["reached_destination"],
-            }
-            rows.append(row)
+        rows.extend(flatten_test(test))
+    return rows
+
+
+def load_rows(path: str) -> List[Dict[str, Any]]:
+    """Filas (test, algoritmo) de un resultados.json o resultados.jsonl, en streaming."""
+    rows: List[Dict[str, Any]] = []
+    for test in iter_tests(path):
+        rows.extend(flatten_test(test))
+    rows.sort(key=lambda r: r["test_id"])
     return rows
 
 
@@ -101,6 +157,40 @@ def add_speedups_vs_baseline(
         )
 
 
+# Intervalos de confianza por bootstrap (remuestreo de consultas)
+BOOTSTRAP_SAMPLES = 2000
+BOOTSTRAP_SEED = 12345
+CONFIDENCE = 0.95
+
+
+def bootstrap_ci(values: List[Any], statistic=median) -> Any:
+    """
+    Intervalo de confianza (CONFIDENCE) de statistic(values) por bootstrap
+    percentil. Con semilla fija, para que el mismo archivo dé el mismo intervalo.
+
+    Returns:
+        Tupla (inferior, superior), o None si hay menos de dos valores
+    """
+    if len(values) < 2:
+        return None
+    rng = random.Random(BOOTSTRAP_SEED)
+    n = len(values)
+    estimates = sorted(
+        statistic([values[rng.randrange(n)] for _ in range(n)])
+        for _ in range(BOOTSTRAP_SAMPLES)
+    )
+    alpha = (1 - CONFIDENCE) / 2
+    return (
+        estimates[int(alpha * (BOOTSTRAP_SAMPLES - 1))],
+        estimates[int((1 - alpha) * (BOOTSTRAP_SAMPLES - 1))],
+    )
+
+
+def time_ratio(pairs: List[Any]) -> float:
+    """Cociente de medianas actual / base de pares (tiempo_base, tiempo_actual)."""
+    return median(t for _, t in pairs) / median(b for b, _ in pairs)
+
+
 def format_float(x: Any, decimals: int = 3) -> str:
     if x is None:
         return "-"
@@ -440,6 +530,416 @@ def make_table_10_astar_vs_greedy(summary: Dict[str, Dict[str, Any]]) -> str:
     return "\n".join(lines)
 
 
+def paired_runs(
+    rows: List[Dict[str, Any]], baseline: str, other: str
+) -> List[tuple]:
+    """Pares (fila baseline, fila other) del mismo test donde ambos llegaron."""
+    by_test = {
+        (r["test_id"], r["algoritmo"]): r for r in rows if r["reached_destination"]
+    }
+    return [
+        (by_test[(test_id, baseline)], r)
+        for (test_id, name), r in sorted(by_test.items())
+        if name == other and (test_id, baseline) in by_test
+    ]
+
+
+def reduction_pct(before: Any, after: Any) -> str:
+    """Reducción porcentual de before a after ("-" si no se puede calcular)."""
+    if not before or after is None:
+        return "-"
+    return f"{(1 - after / before) * 100:.1f}%"
+
+
+def make_table_11_pareto_pruning(rows: List[Dict[str, Any]]) -> str:
+    """Tabla 11: Poda de Pareto vs A* con la misma heurística (mismos tests)."""
+    lines: List[str] = ["\n# Tabla 11: Poda de Pareto vs A* (misma heurística)\n"]
+
+    pareto_algs = sorted({r["algoritmo"] for r in rows if r["tipo"] == "pareto"})
+
+    if not pareto_algs:
+        lines.append("Sin resultados de Pareto en esta corrida.\n")
+        return "\n".join(lines)
+
+    headers = [
+        "Algoritmo", "Comparado con", "Tests", "Misma energía",
+        "Expansiones A*", "Expansiones Pareto", "Reducción expansiones",
+        "Pushes A*", "Pushes Pareto", "Reducción pushes",
+    ]
+    lines.append("| " + " | ".join(headers) + " |")
+    lines.append("| " + " | ".join("---" for _ in headers) + " |")
+
+    for alg in pareto_algs:
+        baseline = "astar_" + alg[len("pareto_"):]
+        pairs = paired_runs(rows, baseline, alg)
+        if not pairs:
+            continue
+
+        same_energy = sum(
+            1 for a, p in pairs if abs(a["energy_kwh"] - p["energy_kwh"]) < 1e-6
+        )
+        astar_nodes = mean(a["nodes_expanded"] for a, _ in pairs)
+        pareto_nodes = mean(p["nodes_expanded"] for _, p in pairs)
+        with_pushes = [(a, p) for a, p in pairs if a["heap_pushes"] and p["heap_pushes"]]
+        astar_pushes = mean(a["heap_pushes"] for a, _ in with_pushes) if with_pushes else None
+        pareto_pushes = mean(p["heap_pushes"] for _, p in with_pushes) if with_pushes else None
+
+        row = [
+            alg,
+            baseline,
+            str(len(pairs)),
+            f"{same_energy}/{len(pairs)}",
+            format_float(astar_nodes, 0),
+            format_float(pareto_nodes, 0),
+            reduction_pct(astar_nodes, pareto_nodes),
+            format_float(astar_pushes, 0),
+            format_float(pareto_pushes, 0),
+            reduction_pct(astar_pushes, pareto_pushes),
+        ]
+        lines.append("| " + " | ".join(row) + " |")
+
+    return "\n".join(lines)
+
+
+def make_table_12_heuristic_units(rows: List[Dict[str, Any]]) -> str:
+    """Tabla 12: Heurísticas en grados vs en kilómetros (mismos tests)."""
+    lines: List[str] = ["\n# Tabla 12: Heurísticas en Grados vs Kilómetros\n"]
+
+    headers = [
+        "Heurística", "Tests", "Misma energía",
+        "Expansiones (grados)", "Expansiones (km)", "Reducción expansiones",
+        "Tiempo grados (s)", "Tiempo km (s)",
+    ]
+    lines.append("| " + " | ".join(headers) + " |")
+    lines.append("| " + " | ".join("---" for _ in headers) + " |")
+
+    for heuristic in ["euclidean", "manhattan", "octile"]:
+        pairs = paired_runs(rows, f"astar_{heuristic}", f"astar_{heuristic}_km")
+        if not pairs:
+            continue
+
+        same_energy = sum(
+            1 for a, b in pairs if abs(a["energy_kwh"] - b["energy_kwh"]) < 1e-6
+        )
+        deg_nodes = mean(a["nodes_expanded"] for a, _ in pairs)
+        km_nodes = mean(b["nodes_expanded"] for _, b in pairs)
+
+        row = [
+            heuristic,
+            str(len(pairs)),
+            f"{same_energy}/{len(pairs)}",
+            format_float(deg_nodes, 0),
+            format_float(km_nodes, 0),
+            reduction_pct(deg_nodes, km_nodes),
+            format_float(mean(a["time_seconds"] for a, _ in pairs), 4),
+            format_float(mean(b["time_seconds"] for _, b in pairs), 4),
+        ]
+        lines.append("| " + " | ".join(row) + " |")
+
+    if len(lines) == 3:
+        lines.append("\nSin variantes *_km en esta corrida.")
+
+    return "\n".join(lines)
+
+
+def make_table_13_bidirectional(rows: List[Dict[str, Any]]) -> str:
+    """Tabla 13: A* bidireccional vs A* con la misma heurística (mismos tests)."""
+    lines: List[str] = ["\n# Tabla 13: A* Bidireccional vs A* (misma heurística)\n"]
+
+    bidir_algs = sorted({r["algoritmo"] for r in rows if r["tipo"] == "bidirectional"})
+
+    if not bidir_algs:
+        lines.append("Sin resultados bidireccionales en esta corrida.\n")
+        return "\n".join(lines)
+
+    headers = [
+        "Algoritmo", "Comparado con", "Tests", "Misma energía",
+        "Expansiones A*", "Adelante", "Atrás", "Reducción expansiones",
+        "Tiempo A* (s)", "Tiempo bidir (s)", "Speedup",
+    ]
+    lines.append("| " + " | ".join(headers) + " |")
+    lines.append("| " + " | ".join("---" for _ in headers) + " |")
+
+    for alg in bidir_algs:
+        baseline = "astar_" + alg[len("bidir_"):]
+        pairs = paired_runs(rows, baseline, alg)
+        if not pairs:
+            continue
+
+        same_energy = sum(
+            1 for a, b in pairs if abs(a["energy_kwh"] - b["energy_kwh"]) < 1e-6
+        )
+        astar_nodes = mean(a["nodes_expanded"] for a, _ in pairs)
+        bidir_nodes = mean(b["nodes_expanded"] for _, b in pairs)
+        astar_time = mean(a["time_seconds"] for a, _ in pairs)
+        bidir_time = mean(b["time_seconds"] for _, b in pairs)
+
+        row = [
+            alg,
+            baseline,
+            str(len(pairs)),
+            f"{same_energy}/{len(pairs)}",
+            format_float(astar_nodes, 0),
+            format_float(mean(b["nodes_expanded_forward"] or 0 for _, b in pairs), 0),
+            format_float(mean(b["nodes_expanded_backward"] or 0 for _, b in pairs), 0),
+            reduction_pct(astar_nodes, bidir_nodes),
+            format_float(astar_time, 4),
+            format_float(bidir_time, 4),
+            format_float(astar_time / bidir_time, 2) if bidir_time else "-",
+        ]
+        lines.append("| " + " | ".join(row) + " |")
+
+    return "\n".join(lines)
+
+
+def make_table_14_peak_memory(rows: List[Dict[str, Any]]) -> str:
+    """Tabla 14: Pico de memoria por consulta (corridas con --memory)."""
+    lines: List[str] = ["\n# Tabla 14: Pico de Memoria por Consulta\n"]
+
+    measured = [r for r in rows if r.get("peak_memory_kb") is not None]
+    if not measured:
+        lines.append("Sin mediciones de memoria en esta corrida (usar benchmark.py --memory).\n")
+        return "\n".join(lines)
+
+    headers = ["Algoritmo", "Consultas", "Media (KB)", "Mediana (KB)", "Máximo (KB)"]
+    lines.append("| " + " | ".join(headers) + " |")
+    lines.append("| " + " | ".join("---" for _ in headers) + " |")
+
+    for alg, runs in sorted(group_by_alg(measured).items()):
+        peaks = [r["peak_memory_kb"] for r in runs]
+        row = [
+            alg,
+            str(len(peaks)),
+            format_float(mean(peaks), 1),
+            format_float(median(peaks), 1),
+            format_float(max(peaks), 1),
+        ]
+        lines.append("| " + " | ".join(row) + " |")
+
+    return "\n".join(lines)
+
+
+def make_table_15_batch(batch: Any) -> str:
+    """Tabla 15: route_many (una búsqueda para todos los destinos) vs consultas separadas."""
+    lines: List[str] = ["\n# Tabla 15: Uno-a-Muchos vs Consultas Separadas\n"]
+
+    if not batch:
+        lines.append("Sin comparación uno-a-muchos (solo está en resultados.json del modo origen fijo).\n")
+        return "\n".join(lines)
+
+    headers = [
+        "Algoritmo", "Comparado con", "Destinos", "Alcanzados", "Misma energía",
+        "Expansiones batch", "Expansiones separadas", "Tiempo batch (s)",
+        "Tiempo separadas (s)", "Speedup",
+    ]
+    lines.append("| " + " | ".join(headers) + " |")
+    lines.append("| " + " | ".join("---" for _ in headers) + " |")
+
+    n = batch["num_destinations"]
+    row = [
+        batch["algoritmo"],
+        batch["separate_algoritmo"],
+        str(n),
+        f"{batch['reached']}/{n}",
+        f"{batch['same_energy']}/{n}",
+        format_float(batch["nodes_expanded"], 0),
+        format_float(batch["separate_nodes_expanded"], 0),
+        format_float(batch["time_seconds"], 3),
+        format_float(batch["separate_time_seconds"], 3),
+        format_float(batch["speedup"], 2),
+    ]
+    lines.append("| " + " | ".join(row) + " |")
+
+    return "\n".join(lines)
+
+
+def make_table_16_heuristic_evaluations(rows: List[Dict[str, Any]]) -> str:
+    """Tabla 16: Evaluaciones de la heurística vs consultas (una por inserción en el heap)."""
+    lines: List[str] = ["\n# Tabla 16: Evaluaciones de la Heurística por Consulta\n"]
+
+    measured = [
+        r for r in rows
+        if r.get("heuristic_evaluations") is not None and r.get("heap_pushes")
+    ]
+    if not measured:
+        lines.append("Sin conteo de evaluaciones de la heurística en esta corrida.\n")
+        return "\n".join(lines)
+
+    lines.append(
+        "Cada inserción en el heap necesita h(nodo); las heurísticas con precompute "
+        "(ALT, CH, *_km) calculan la de todos los nodos de una vez con NumPy.\n"
+    )
+    headers = [
+        "Algoritmo", "Consultas", "Evaluaciones (media)", "Inserciones (media)",
+        "Inserciones por evaluación",
+    ]
+    lines.append("| " + " | ".join(headers) + " |")
+    lines.append("| " + " | ".join("---" for _ in headers) + " |")
+
+    for alg, runs in sorted(group_by_alg(measured).items()):
+        evaluations = mean(r["heuristic_evaluations"] for r in runs)
+        pushes = mean(r["heap_pushes"] for r in runs)
+        row = [
+            alg,
+            str(len(runs)),
+            format_float(evaluations, 0),
+            format_float(pushes, 0),
+            format_float(pushes / evaluations, 2) if evaluations else "-",
+        ]
+        lines.append("| " + " | ".join(row) + " |")
+
+    return "\n".join(lines)
+
+
+def make_table_17_search_profile(rows: List[Dict[str, Any]]) -> str:
+    """Tabla 17: Instrumentación de la búsqueda (corridas con --profile)."""
+    lines: List[str] = ["\n# Tabla 17: Instrumentación de la Búsqueda\n"]
+
+    measured = [r for r in rows if r.get("expansion_ns") is not None]
+    if not measured:
+        lines.append("Sin instrumentación en esta corrida (usar benchmark.py --profile).\n")
+        return "\n".join(lines)
+
+    lines.append(
+        "Medias por consulta. Pops obsoletos: estados que salen de la cola ya "
+        "expandidos; estados guardados: tamaño pico del almacén de estados.\n"
+    )
+    headers = [
+        "Algoritmo", "Consultas", "Pops obsoletos", "% de pops", "Estados de recarga",
+        "Estados guardados", "Evaluaciones de h", "Expansión (ms)", "Reconstrucción (ms)",
+    ]
+    lines.append("| " + " | ".join(headers) + " |")
+    lines.append("| " + " | ".join("---" for _ in headers) + " |")
+
+    for alg, runs in sorted(group_by_alg(measured).items()):
+        stale = mean(r["stale_pops"] for r in runs)
+        pops = stale + mean(r["nodes_expanded"] or 0 for r in runs)
+        row = [
+            alg,
+            str(len(runs)),
+            format_float(stale, 0),
+            format_float(100 * stale / pops, 1) if pops else "-",
+            format_float(mean(r["recharge_states"] for r in runs), 0),
+            format_float(mean(r["states_stored"] for r in runs), 0),
+            format_float(mean(r["heuristic_evaluations"] or 0 for r in runs), 0),
+            format_float(mean(r["expansion_ns"] for r in runs) / 1e6, 2),
+            format_float(mean(r["reconstruction_ns"] for r in runs) / 1e6, 3),
+        ]
+        lines.append("| " + " | ".join(row) + " |")
+
+    return "\n".join(lines)
+
+
+def make_table_18_time_confidence(rows: List[Dict[str, Any]]) -> str:
+    """Tabla 18: Tiempo por algoritmo con intervalo de confianza y ruido por consulta."""
+    lines: List[str] = ["\n# Tabla 18: Tiempo con Intervalo de Confianza\n"]
+
+    valid = [r for r in rows if r["reached_destination"] and r["time_seconds"] is not None]
+    if not valid:
+        lines.append("Sin tiempos en esta corrida.\n")
+        return "\n".join(lines)
+
+    lines.append(
+        f"Mediana del tiempo entre consultas con IC {CONFIDENCE:.0%} por bootstrap. "
+        "p95 e IQR son por consulta, sobre sus repeticiones (benchmark.py --repeat), "
+        "promediados entre consultas: miden el ruido de la medición.\n"
+    )
+    headers = [
+        "Algoritmo", "Consultas", "Repeticiones", "Mediana (ms)", "IC inferior (ms)",
+        "IC superior (ms)", "p95 medio (ms)", "IQR medio (ms)",
+    ]
+    lines.append("| " + " | ".join(headers) + " |")
+    lines.append("| " + " | ".join("---" for _ in headers) + " |")
+
+    for alg, runs in sorted(group_by_alg(valid).items()):
+        times = [r["time_seconds"] for r in runs]
+        ci = bootstrap_ci(times)
+        p95s = [r["time_p95_seconds"] for r in runs if r["time_p95_seconds"] is not None]
+        iqrs = [r["time_iqr_seconds"] for r in runs if r["time_iqr_seconds"] is not None]
+        row = [
+            alg,
+            str(len(runs)),
+            str(min(r["time_repetitions"] for r in runs)),
+            format_float(median(times) * 1e3, 2),
+            format_float(ci[0] * 1e3, 2) if ci else "-",
+            format_float(ci[1] * 1e3, 2) if ci else "-",
+            format_float(mean(p95s) * 1e3, 2) if p95s else "-",
+            format_float(mean(iqrs) * 1e3, 3) if iqrs else "-",
+        ]
+        lines.append("| " + " | ".join(row) + " |")
+
+    return "\n".join(lines)
+
+
+def compare_time_by_algorithm(
+    baseline_rows: List[Dict[str, Any]], rows: List[Dict[str, Any]]
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Compara el tiempo de cada algoritmo contra una corrida base, pareando
+    consultas por (origen, destino).
+
+    Un algoritmo es "regresion" si todo el IC del cociente actual / base queda
+    por encima de 1, "mejora" si queda por debajo, y "sin cambio" si no.
+    """
+    def times(source: List[Dict[str, Any]]) -> Dict[Any, float]:
+        return {
+            (r["origen"], r["destino"], r["algoritmo"]): r["time_seconds"]
+            for r in source
+            if r["reached_destination"] and r["time_seconds"]
+        }
+
+    base_times = times(baseline_rows)
+    pairs_by_alg: Dict[str, List[Any]] = {}
+    for key, current in times(rows).items():
+        if key in base_times:
+            pairs_by_alg.setdefault(key[2], []).append((base_times[key], current))
+
+    comparison: Dict[str, Dict[str, Any]] = {}
+    for alg, pairs in pairs_by_alg.items():
+        # Se remuestrean pares: cada consulta se compara consigo misma
+        ratio, ci = time_ratio(pairs), bootstrap_ci(pairs, time_ratio)
+        if ci is not None and ci[0] > 1:
+            verdict = "regresion"
+        elif ci is not None and ci[1] < 1:
+            verdict = "mejora"
+        else:
+            verdict = "sin cambio"
+        comparison[alg] = {"pairs": len(pairs), "ratio": ratio, "ci": ci, "verdict": verdict}
+    return comparison
+
+
+def make_table_19_baseline_comparison(comparison: Dict[str, Dict[str, Any]]) -> str:
+    """Tabla 19: Tiempo contra una corrida base (analizar_resultados.py --baseline)."""
+    lines: List[str] = ["\n# Tabla 19: Comparación de Tiempo contra la Corrida Base\n"]
+
+    if not comparison:
+        lines.append("Sin consultas en común con la corrida base.\n")
+        return "\n".join(lines)
+
+    lines.append(
+        f"Cociente de medianas actual / base sobre consultas pareadas, IC {CONFIDENCE:.0%} "
+        "por bootstrap. Regresión o mejora solo si el IC no incluye 1.\n"
+    )
+    headers = ["Algoritmo", "Consultas", "Actual / base", "IC inferior", "IC superior", "Veredicto"]
+    lines.append("| " + " | ".join(headers) + " |")
+    lines.append("| " + " | ".join("---" for _ in headers) + " |")
+
+    for alg, c in sorted(comparison.items()):
+        ci = c["ci"]
+        verdict = {"regresion": "**REGRESIÓN**", "mejora": "mejora"}.get(c["verdict"], "sin cambio")
+        row = [
+            alg,
+            str(c["pairs"]),
+            format_float(c["ratio"], 3),
+            format_float(ci[0], 3) if ci else "-",
+            format_float(ci[1], 3) if ci else "-",
+            verdict,
+        ]
+        lines.append("| " + " | ".join(row) + " |")
+
+    return "\n".join(lines)
+
+
 def save_markdown(path: str, content: str) -> None:
     with open(path, "w", encoding="utf-8") as f:
         f.write(content)
@@ -562,7 +1062,9 @@ def plot_time_vs_energy(rows: List[Dict[str, Any]], save_path: str) -> None:
     plt.figure(figsize=(10, 6))
     
     colors = {"astar_euclidean": "#1f77b4", "astar_manhattan": "#ff7f0e", 
-              "astar_octile": "#2ca02c", "greedy": "#d62728"}
+              "astar_octile": "#2ca02c", "greedy": "#d62728",
+              "charger_overlay": "#9467bd", "pareto_euclidean": "#8c564b",
+              "bidir_euclidean": "#e377c2"}
     
     for alg, runs in grouped.items():
         times = [r["time_seconds"] for r in runs]
@@ -689,7 +1191,13 @@ def main():
         "resultados_path",
         nargs="?",
         default="resultados.json",
-        help="Ruta al archivo resultados.json (por defecto: resultados.json)",
+        help="Ruta a resultados.json o al checkpoint resultados.jsonl (por defecto: resultados.json)",
+    )
+    parser.add_argument(
+        "--baseline",
+        metavar="RESULTADOS",
+        default=None,
+        help="resultados.json de una corrida anterior: compara tiempos y marca regresiones",
     )
     args = parser.parse_args()
 
@@ -699,8 +1207,7 @@ def main():
 
     base_dir = os.path.dirname(os.path.abspath(resultados_path))
 
-    data = load_resultados(resultados_path)
-    rows = flatten_runs(data)
+    rows = load_rows(resultados_path)
     grouped = group_by_alg(rows)
     summary = compute_summary_per_algorithm(grouped)
     add_speedups_vs_baseline(summary, baseline_alg="astar_euclidean")
@@ -717,6 +1224,26 @@ def main():
     all_tables.append(make_table_8_nodes_per_second(rows))
     all_tables.append(make_table_9_astar_heuristic_comparison(summary))
     all_tables.append(make_table_10_astar_vs_greedy(summary))
+    all_tables.append(make_table_11_pareto_pruning(rows))
+    all_tables.append(make_table_12_heuristic_units(rows))
+    all_tables.append(make_table_13_bidirectional(rows))
+    all_tables.append(make_table_14_peak_memory(rows))
+
+    # La comparación uno-a-muchos solo está en resultados.json (no en el checkpoint)
+    batch = None
+    if not resultados_path.endswith(".jsonl"):
+        batch = load_resultados(resultados_path).get("batch")
+    all_tables.append(make_table_15_batch(batch))
+    all_tables.append(make_table_16_heuristic_evaluations(rows))
+    all_tables.append(make_table_17_search_profile(rows))
+    all_tables.append(make_table_18_time_confidence(rows))
+
+    if args.baseline:
+        comparison = compare_time_by_algorithm(load_rows(args.baseline), rows)
+        all_tables.append(make_table_19_baseline_comparison(comparison))
+        regressions = sorted(alg for alg, c in comparison.items() if c["verdict"] == "regresion")
+        if regressions:
+            print(f"Regresiones de tiempo contra {args.baseline}: {', '.join(regressions)}")
 
     # Guardar resumen en JSON y Markdown
     md_path = os.path.join(base_dir, "resumen_algoritmos.md")
@@ -4,51 +4,157 @@ con gestión de batería.
 
 - Origen fijo: Ciudad Vieja
 - Destinos: todos los barrios de MONTEVIDEO_BARRIOS (excepto Ciudad Vieja)
+- Con --all-pairs: todos los pares (origen, destino) de MONTEVIDEO_BARRIOS
 - Algoritmos:
     * astar_euclidean → A* con distancia Euclidiana
     * astar_manhattan → A* con distancia Manhattan
     * astar_octile    → A* con distancia Octile
+    * astar_*_km      → Las mismas heurísticas en kilómetros (utils/metric_heuristics.py)
+    * astar_alt       → A* con landmarks (utils/alt_heuristic.py)
+    * pareto_euclidean → A* con frentes de Pareto por nodo (misma energía, menos expansiones)
+    * bidir_euclidean → A* bidireccional (adelante desde el origen, atrás desde el destino)
+    * ch_battery      → Contraction Hierarchies: consulta directa si no hace falta cargar,
+                        si no A* con la cota exacta de CH
     * greedy          → Greedy original
+    * charger_overlay → Ruteo sobre la tabla de cargadores (con --charger-overlay)
+
+En modo origen fijo, además se resuelven todos los destinos con una sola
+búsqueda uno-a-muchos (route_many) y se compara su tiempo total contra una
+llamada a astar_battery por destino; queda en "batch" dentro de resultados.json.
 
 Los resultados NO se imprimen, se guardan en un JSON.
 Las imágenes muestran el path simple (sin colores de batería).
+
+Con --workers N los tests se reparten entre N procesos. El grafo se comparte
+por fork (copy-on-write), sin serializarlo por tarea, y resultados.json es el
+mismo que en modo serial salvo los campos de tiempo.
+
+Cada test terminado se agrega a resultados.jsonl (checkpoint append-only).
+Si la corrida se interrumpe, --resume <directorio> la continúa desde ahí.
+
+Con --profile A* y Greedy corren instrumentados (algorithms/search_profile.py)
+y cada test guarda además stale_pops, recharge_states, states_stored,
+expansion_ns y reconstruction_ns.
+
+Cada consulta se mide desde afuera con perf_counter: --warmup N corridas sin
+medir, --repeat N corridas medidas (time_seconds es la mediana; también se
+guardan p95, IQR y las muestras), --no-gc apaga el recolector durante cada
+corrida medida y --pin-cpu fija los procesos a esos núcleos.
+
+Con --memory se registra el pico de memoria de cada consulta (peak_memory_kb).
+Los almacenes de estados de los motores se reservan una vez al inicio y su
+tamaño queda en "memory" dentro de resultados.json.
 """
 
+import argparse
 import copy
+import gc
 import json
+import multiprocessing
 import os
+import time
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple
 
+import statistics
 import sys
+import tracemalloc
 from halo import Halo
 
 from algorithms.astar_battery_core import astar_battery
+from algorithms.bidirectional_battery_core import bidirectional_astar_battery
+from algorithms.charger_overlay import (
+    charger_overlay_route,
+    charger_table_path,
+    load_or_build_charger_table,
+)
+from algorithms.contraction_hierarchy import (
+    ch_battery_route,
+    ch_heuristic,
+    get_contraction_hierarchy,
+)
 from algorithms.greedy_battery_core import greedy_battery
+from algorithms.one_to_many_battery import route_many
+from algorithms.pareto_battery_core import pareto_battery
+from algorithms.search_profile import PROFILE_KEYS
+from algorithms.state_store import reserve_state_stores
 from graph.chargers_loader import get_charger_nodes
+from graph.compiled_graph import get_compiled_graph
 from graph.graph_setup import load_graph
 from graph.montevideo_barrios import MONTEVIDEO_BARRIOS, get_nearest_node
-from utils.helpers import euclidean_distance, manhattan_distance, octile_distance
+from utils.alt_heuristic import alt_heuristic
+from utils.helpers import (
+    battery_to_units,
+    euclidean_distance,
+    manhattan_distance,
+    octile_distance,
+)
+from utils.jsonl import append_jsonl_record, iter_jsonl_records, repair_jsonl
+from utils.metric_heuristics import euclidean_km, manhattan_km, octile_km
 from visualization.plotting import plot_graph
 from visualization.styles import style_path_edge, style_unvisited_edge
 
 
+PLACE_NAME = "Montevideo, Uruguay"
+
 GAMMA = 1.2
 MAX_CAPACITY = 5.0
 INITIAL_CHARGE = 5.0  # kWh - Comenzar con batería llena
 RECHARGE_AMOUNT = 4.5  # kWh - Recarga al 90% de capacidad
+BATTERY_STEP = 0.1  # kWh por unidad de batería en los estados de búsqueda
 
-# A* como 3 algoritmos distintos (por heurística/gamma_min)
+# A* como algoritmos distintos (por heurística/gamma_min). Las heurísticas
+# de helpers miden en grados; las *_km, en kilómetros (misma unidad que gamma_min)
 ASTAR_VARIANTS = [
     ("astar_euclidean", euclidean_distance, GAMMA),
     ("astar_manhattan", manhattan_distance, GAMMA),
     ("astar_octile", octile_distance, GAMMA),
+    ("astar_euclidean_km", euclidean_km, GAMMA),
+    ("astar_manhattan_km", manhattan_km, GAMMA),
+    ("astar_octile_km", octile_km, GAMMA),
+    # ALT ya devuelve kWh (distancias reales de energía): gamma_min = 1
+    ("astar_alt", alt_heuristic, 1.0),
+]
+
+# Otros motores con la firma de astar_battery: (nombre, función, heurística,
+# gamma_min, tipo). pareto y bidir se comparan contra la variante A* de la
+# misma heurística; ch_battery usa la cota de CH, que ya está en kWh
+ENGINE_VARIANTS = [
+    ("pareto_euclidean", pareto_battery, euclidean_distance, GAMMA, "pareto"),
+    ("bidir_euclidean", bidirectional_astar_battery, euclidean_distance, GAMMA, "bidirectional"),
+    ("ch_battery", ch_battery_route, ch_heuristic, 1.0, "ch"),
 ]
 
 GREEDY_NAME = "greedy"
 
+CHARGER_OVERLAY_NAME = "charger_overlay"
+
+# Búsqueda uno-a-muchos del modo origen fijo (sin heurística) y la variante
+# de A* contra la que se compara
+BATCH_NAME = "route_many"
+BATCH_BASELINE = ("astar_euclidean", euclidean_distance, GAMMA)
+
+ORIGEN_FIJO = "Ciudad Vieja"
+
+CHECKPOINT_NAME = "resultados.jsonl"
+
 GENERATE_IMAGES = False
 
+# Con --memory cada consulta se repite bajo tracemalloc para medir su pico de
+# memoria (la repetición no cuenta para time_seconds)
+MEASURE_MEMORY = False
+
+# Con --profile los motores que lo admiten guardan los contadores de
+# PROFILE_KEYS (la instrumentación cuesta algo de tiempo, por eso es opcional)
+PROFILE_SEARCH = False
+PROFILED_ENGINES = (astar_battery, greedy_battery)
+
+# Repeticiones por consulta: corridas de calentamiento (no se miden), corridas
+# medidas y si el GC se apaga mientras se mide (--warmup, --repeat, --no-gc)
+WARMUP_RUNS = 0
+REPETITIONS = 1
+DISABLE_GC = False
+
 DOTS_SPINNER = {
     "interval": 80,
     "frames": ["⠋", "⠙", "⠹", "⠸", "⠼", "⠴", "⠦", "⠧", "⠇", "⠏"],
@@ -70,6 +176,8 @@ def save_path_visualization(
     - sin colores de batería.
     """
     G = copy.deepcopy(G_original)
+    # Aristas paralelas: se marca la que usó la búsqueda (la de menor energía)
+    compiled = get_compiled_graph(G_original)
 
     # Inicializar propiedades de nodos
     for node in G.nodes:
@@ -101,7 +209,7 @@ def save_path_visualization(
         u = path[i]
         v = path[i + 1]
         G.nodes[u]["on_path"] = True
-        style_path_edge(G, (u, v, 0))
+        style_path_edge(G, (u, v, compiled.multigraph_key(u, v)))
         if G.nodes[u].get("is_charger"):
             G.nodes[u]["charger_visited"] = True
             G.nodes[u]["size"] = 80
@@ -113,6 +221,111 @@ def save_path_visualization(
 
 
 # Ejecuta una variante de A* llamando a la función astar_battery
+def measure_peak_memory(func, *args, **kwargs) -> int:
+    """
+    Ejecuta func bajo tracemalloc y devuelve el pico de memoria (bytes)
+    asignada durante la llamada. Lo ya reservado antes (grafo, almacenes de
+    estados) no cuenta.
+    """
+    tracemalloc.start()
+    try:
+        func(*args, **kwargs)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def timed_runs(func, *args, **kwargs) -> Tuple[object, List[float]]:
+    """
+    Ejecuta func WARMUP_RUNS veces sin medir y REPETITIONS veces midiendo cada
+    corrida con perf_counter.
+
+    Con DISABLE_GC se hace una recolección antes de cada corrida medida y el
+    GC queda apagado mientras corre, para que sus pausas no caigan al azar en
+    algunas consultas.
+
+    Returns:
+        Tupla (resultado de la primera corrida medida, tiempos en segundos)
+    """
+    for _ in range(WARMUP_RUNS):
+        func(*args, **kwargs)
+
+    result = None
+    samples: List[float] = []
+    for i in range(REPETITIONS):
+        if DISABLE_GC:
+            gc.collect()
+            gc.disable()
+        try:
+            start = time.perf_counter()
+            run_result = func(*args, **kwargs)
+            samples.append(time.perf_counter() - start)
+        finally:
+            if DISABLE_GC:
+                gc.enable()
+        if i == 0:
+            result = run_result
+    return result, samples
+
+
+def timing_summary(samples: List[float]) -> Dict:
+    """
+    Resumen de las repeticiones de una consulta: time_seconds (mediana),
+    time_p95_seconds, time_iqr_seconds, time_repetitions y time_samples.
+    """
+    if len(samples) > 1:
+        p95 = statistics.quantiles(samples, n=20, method="inclusive")[-1]
+        q1, _, q3 = statistics.quantiles(samples, n=4, method="inclusive")
+    else:
+        p95, q1, q3 = samples[0], samples[0], samples[0]
+    return {
+        "time_seconds": statistics.median(samples),
+        "time_p95_seconds": p95,
+        "time_iqr_seconds": q3 - q1,
+        "time_repetitions": len(samples),
+        "time_samples": samples,
+    }
+
+
+def parse_cpu_list(text: str) -> List[int]:
+    """Convierte "0,2-3" en [0, 2, 3]."""
+    cpus: List[int] = []
+    for part in text.split(","):
+        first, _, last = part.partition("-")
+        cpus.extend(range(int(first), int(last or first) + 1))
+    return cpus
+
+
+def pin_to_cpus(cpus: List[int]) -> bool:
+    """Fija el proceso actual a cpus; devuelve False si la plataforma no lo permite."""
+    if not hasattr(os, "sched_setaffinity"):
+        return False
+    os.sched_setaffinity(0, cpus)
+    return True
+
+
+def _pin_worker(cpus: List[int]) -> None:
+    """Inicializador del pool: cada worker queda fijo a un núcleo de la lista."""
+    # _identity es (1,), (2,), ... según el orden de creación de los workers
+    worker_num = multiprocessing.current_process()._identity[0] - 1
+    pin_to_cpus([cpus[worker_num % len(cpus)]])
+
+
+def profile_kwargs_for(search_func) -> Dict:
+    """Argumentos extra para instrumentar search_func si corresponde (--profile)."""
+    if PROFILE_SEARCH and search_func in PROFILED_ENGINES:
+        return {"profile": True}
+    return {}
+
+
+def copy_profile_counters(stats: Dict, metrics: Dict) -> None:
+    """Copia a metrics los contadores de instrumentación que haya en stats."""
+    for key in PROFILE_KEYS:
+        if key in stats:
+            metrics[key] = stats[key]
+
+
 def run_astar_variant(
     variant_name: str,
     heuristic_func,
@@ -121,44 +334,66 @@ def run_astar_variant(
     charger_nodes: List[int],
     origen: int,
     destino: int,
+    search_func=astar_battery,
+    tipo: str = "astar",
 ) -> Tuple[Dict, Optional[List[int]]]:
-    """Ejecuta una variante de A* y devuelve (metrics, path)."""
-    result = astar_battery(
-        G,
-        origen,
-        destino,
+    """
+    Ejecuta una variante de A* y devuelve (metrics, path).
+
+    search_func permite correr otro motor con la misma firma (ver ENGINE_VARIANTS).
+    """
+    search_kwargs = dict(
         heuristic_func=heuristic_func,  # <-- NUEVO
         max_capacity=MAX_CAPACITY,
         initial_charge=INITIAL_CHARGE,
         gamma_min=gamma_min,
         charger_nodes=charger_nodes,
         recharge_amount=RECHARGE_AMOUNT,
+        battery_step=BATTERY_STEP,
+    )
+    stats: Dict = {}
+    profile_kwargs = profile_kwargs_for(search_func)
+    result, samples = timed_runs(
+        search_func, G, origen, destino, stats=stats, **search_kwargs, **profile_kwargs
     )
 
     metrics: Dict = {
         "algoritmo": variant_name,
-        "tipo": "astar",
+        "tipo": tipo,
         "gamma_min": gamma_min,
         "energy_kwh": None,
         "nodes_expanded": None,
+        "heap_pushes": stats.get("heap_pushes"),
+        "heuristic_evaluations": stats.get("heuristic_evaluations"),
+        "peak_memory_kb": None,
         "num_recharges": None,
         "time_seconds": None,
         "path_length": None,
         "reached_destination": False,
     }
 
+    # Los motores bidireccionales informan las expansiones de cada lado
+    for key in ("nodes_expanded_forward", "nodes_expanded_backward"):
+        if key in stats:
+            metrics[key] = stats[key]
+    copy_profile_counters(stats, metrics)
+
+    if MEASURE_MEMORY:
+        peak = measure_peak_memory(search_func, G, origen, destino, **search_kwargs)
+        metrics["peak_memory_kb"] = peak / 1024
+
     if result is None:
         return metrics, None
 
-    path, energy, nodes_expanded, num_recharges, time_s = result
+    path, energy, nodes_expanded, num_recharges, _ = result
     metrics.update(
         {
             "energy_kwh": energy,
             "nodes_expanded": nodes_expanded,
             "num_recharges": num_recharges,
-            "time_seconds": time_s,
             "path_length": len(path),
             "reached_destination": True,
+            **timing_summary(samples),
         }
     )
     return metrics, path
@@ -171,15 +406,18 @@ def run_greedy(
     destino: int,
 ) -> Tuple[Dict, Optional[List[int]]]:
     """Ejecuta Greedy y devuelve (metrics, path)."""
-    result = greedy_battery(
-        G,
-        origen,
-        destino,
+    greedy_kwargs = dict(
         max_capacity=MAX_CAPACITY,
         initial_charge=INITIAL_CHARGE,
         gamma_min=GAMMA,
         charger_nodes=charger_nodes,
         recharge_amount=RECHARGE_AMOUNT,
+        battery_step=BATTERY_STEP,
+    )
+    stats: Dict = {}
+    profile_kwargs = profile_kwargs_for(greedy_battery)
+    result, samples = timed_runs(
+        greedy_battery, G, origen, destino, stats=stats, **greedy_kwargs, **profile_kwargs
     )
 
     metrics: Dict = {
@@ -188,29 +426,179 @@ def run_greedy(
         "gamma_min": None,
         "energy_kwh": None,
         "nodes_expanded": None,
+        "heap_pushes": stats.get("heap_pushes"),
+        "heuristic_evaluations": stats.get("heuristic_evaluations"),
+        "peak_memory_kb": None,
         "num_recharges": None,
         "time_seconds": None,
         "path_length": None,
         "reached_destination": False,
     }
+    copy_profile_counters(stats, metrics)
+
+    if MEASURE_MEMORY:
+        peak = measure_peak_memory(greedy_battery, G, origen, destino, **greedy_kwargs)
+        metrics["peak_memory_kb"] = peak / 1024
 
     if result is None:
         return metrics, None
 
-    path, energy, nodes_expanded, num_recharges, time_s = result
+    path, energy, nodes_expanded, num_recharges, _ = result
     metrics.update(
         {
             "energy_kwh": energy,
             "nodes_expanded": nodes_expanded,
             "num_recharges": num_recharges,
-            "time_seconds": time_s,
             "path_length": len(path),
             "reached_destination": True,
+            **timing_summary(samples),
         }
     )
     return metrics, path
 
 
+# Corre charger_overlay_route sobre el grafo compilado y la tabla de cargadores
+def run_charger_overlay(
+    overlay,
+    origen: int,
+    destino: int,
+) -> Tuple[Dict, Optional[List[int]]]:
+    """Ejecuta el ruteo sobre el overlay de cargadores y devuelve (metrics, path)."""
+    compiled, table, ch = overlay
+    overlay_kwargs = dict(
+        max_capacity=MAX_CAPACITY,
+        initial_charge=INITIAL_CHARGE,
+        recharge_amount=RECHARGE_AMOUNT,
+        ch=ch,
+    )
+    result, samples = timed_runs(
+        charger_overlay_route, compiled, table, origen, destino, **overlay_kwargs
+    )
+
+    metrics: Dict = {
+        "algoritmo": CHARGER_OVERLAY_NAME,
+        "tipo": "overlay",
+        "gamma_min": None,
+        "energy_kwh": None,
+        "nodes_expanded": None,
+        "heap_pushes": None,
+        "peak_memory_kb": None,
+        "num_recharges": None,
+        "time_seconds": None,
+        "path_length": None,
+        "reached_destination": False,
+    }
+
+    if MEASURE_MEMORY:
+        peak = measure_peak_memory(
+            charger_overlay_route, compiled, table, origen, destino, **overlay_kwargs
+        )
+        metrics["peak_memory_kb"] = peak / 1024
+
+    if result is None:
+        return metrics, None
+
+    path, energy, nodes_expanded, num_recharges, _ = result
+    metrics.update(
+        {
+            "energy_kwh": energy,
+            "nodes_expanded": nodes_expanded,
+            "num_recharges": num_recharges,
+            "path_length": len(path),
+            "reached_destination": True,
+            **timing_summary(samples),
+        }
+    )
+    return metrics, path
+
+
+def run_batch(
+    G,
+    charger_nodes: List[int],
+    origen_name: str,
+    destino_names: List[str],
+) -> Dict:
+    """
+    Resuelve todos los destinos con una sola llamada a route_many y la compara
+    contra una llamada a astar_battery (BATCH_BASELINE) por destino.
+
+    Returns:
+        Diccionario con tiempos, expansiones y energías de ambas formas
+    """
+    origen = get_nearest_node(G, origen_name)
+    destinos = [get_nearest_node(G, destino_name) for destino_name in destino_names]
+
+    search_kwargs = dict(
+        max_capacity=MAX_CAPACITY,
+        initial_charge=INITIAL_CHARGE,
+        charger_nodes=charger_nodes,
+        recharge_amount=RECHARGE_AMOUNT,
+        battery_step=BATTERY_STEP,
+    )
+
+    stats: Dict = {}
+    start = time.perf_counter()
+    results, nodes_expanded, _ = route_many(
+        G, origen, destinos, gamma_min=GAMMA, stats=stats, **search_kwargs
+    )
+    batch_time = time.perf_counter() - start
+
+    baseline_name, baseline_heuristic, baseline_gamma = BATCH_BASELINE
+    separate_time = 0.0
+    separate_nodes = 0
+    same_energy = 0
+    per_destination: List[Dict] = []
+
+    for destino_name, destino in zip(destino_names, destinos):
+        start = time.perf_counter()
+        single = astar_battery(
+            G,
+            origen,
+            destino,
+            heuristic_func=baseline_heuristic,
+            gamma_min=baseline_gamma,
+            **search_kwargs,
+        )
+        separate_time += time.perf_counter() - start
+
+        batch_result = results[destino]
+        entry: Dict = {
+            "destino_name": destino_name,
+            "energy_kwh": None,
+            "num_recharges": None,
+            "path_length": None,
+            "separate_energy_kwh": None,
+        }
+        if batch_result is not None:
+            path, energy, num_recharges = batch_result
+            entry.update(energy_kwh=energy, num_recharges=num_recharges, path_length=len(path))
+        if single is not None:
+            separate_nodes += single[2]
+            entry["separate_energy_kwh"] = single[1]
+
+        if (batch_result is None) == (single is None) and (
+            single is None or abs(single[1] - batch_result[1]) < 1e-6
+        ):
+            same_energy += 1
+        per_destination.append(entry)
+
+    return {
+        "algoritmo": BATCH_NAME,
+        "origen_name": origen_name,
+        "num_destinations": len(destinos),
+        "reached": stats["destinations_settled"],
+        "nodes_expanded": nodes_expanded,
+        "heap_pushes": stats["heap_pushes"],
+        "time_seconds": batch_time,
+        "separate_algoritmo": baseline_name,
+        "separate_nodes_expanded": separate_nodes,
+        "separate_time_seconds": separate_time,
+        "speedup": separate_time / batch_time if batch_time > 0 else None,
+        "same_energy": same_energy,
+        "per_destination": per_destination,
+    }
+
+
 # Esta función ejecuta todos los algoritmos para origen/destino
 def run_test(
     G,
@@ -219,16 +607,28 @@ def run_test(
     destino_name: str,
     test_num: int,
     output_dir: str,
+    overlay=None,
 ):
-    """Ejecuta todas las variantes para un origen/destino y devuelve dict con resultados."""
+    """
+    Ejecuta todas las variantes para un origen/destino y devuelve dict con resultados.
+
+    overlay es la terna (grafo compilado, tabla de cargadores, jerarquía CH);
+    si se pasa, se agrega charger_overlay a los algoritmos evaluados.
+
+    Los motores corren sobre el grafo compilado (estados empaquetados en el
+    StateStore compartido); las imágenes se dibujan sobre G.
+    """
     origen = get_nearest_node(G, origen_name)
     destino = get_nearest_node(G, destino_name)
 
+    search_G = get_compiled_graph(G)
+
     test_dir = os.path.join(
         output_dir,
         f"test_{test_num}_{origen_name.replace(' ', '_')}_to_{destino_name.replace(' ', '_')}",
     )
-    os.makedirs(test_dir, exist_ok=True)
+    if GENERATE_IMAGES:
+        os.makedirs(test_dir, exist_ok=True)
 
     test_result: Dict = {
         "test_id": test_num,
@@ -239,10 +639,10 @@ def run_test(
         "algorithms": [],
     }
 
-    # ---- A* (3 heurísticas) ----
+    # ---- A* (una corrida por heurística) ----
     for variant_name, heuristic_func, gamma_min in ASTAR_VARIANTS:
         metrics, path = run_astar_variant(
-            variant_name, heuristic_func, gamma_min, G, charger_nodes, origen, destino
+            variant_name, heuristic_func, gamma_min, search_G, charger_nodes, origen, destino
         )
         test_result["algorithms"].append(metrics)
 
@@ -250,85 +650,443 @@ def run_test(
             img_path = os.path.join(test_dir, f"{variant_name}_path.png")
             save_path_visualization(G, path, charger_nodes, origen, destino, img_path)
 
+    # ---- Otros motores (Pareto, bidireccional, CH) ----
+    for variant_name, search_func, heuristic_func, gamma_min, tipo in ENGINE_VARIANTS:
+        metrics, path = run_astar_variant(
+            variant_name,
+            heuristic_func,
+            gamma_min,
+            search_G,
+            charger_nodes,
+            origen,
+            destino,
+            search_func=search_func,
+            tipo=tipo,
+        )
+        test_result["algorithms"].append(metrics)
+
+        if path is not None and GENERATE_IMAGES:
+            img_path = os.path.join(test_dir, f"{variant_name}_path.png")
+            save_path_visualization(G, path, charger_nodes, origen, destino, img_path)
+
     # ---- Greedy ----
-    metrics_g, path_g = run_greedy(G, charger_nodes, origen, destino)
+    metrics_g, path_g = run_greedy(search_G, charger_nodes, origen, destino)
     test_result["algorithms"].append(metrics_g)
 
     if path_g is not None and GENERATE_IMAGES:  # <-- AGREGAR "and GENERATE_IMAGES"
         img_path_g = os.path.join(test_dir, f"{GREEDY_NAME}_path.png")
         save_path_visualization(G, path_g, charger_nodes, origen, destino, img_path_g)
 
+    # ---- Overlay de cargadores ----
+    if overlay is not None:
+        metrics_o, path_o = run_charger_overlay(overlay, origen, destino)
+        test_result["algorithms"].append(metrics_o)
+
+        if path_o is not None and GENERATE_IMAGES:
+            img_path_o = os.path.join(test_dir, f"{CHARGER_OVERLAY_NAME}_path.png")
+            save_path_visualization(G, path_o, charger_nodes, origen, destino, img_path_o)
+
     return test_result
 
 
-def main():
+# Estado compartido con los workers. Se completa en el proceso padre antes de
+# crear el pool, así los hijos lo heredan por fork en lugar de recibirlo
+# serializado con cada tarea.
+_WORKER_STATE: Dict = {}
+
+
+def _run_test_task(task: Tuple[int, str, str]) -> Tuple[Dict, int, float]:
+    """Ejecuta un test (en el proceso actual) y devuelve (resultado, pid, segundos)."""
+    test_num, origen_name, destino_name = task
+    start = time.perf_counter()
+    test_result = run_test(
+        _WORKER_STATE["G"],
+        _WORKER_STATE["charger_nodes"],
+        origen_name,
+        destino_name,
+        test_num,
+        _WORKER_STATE["output_dir"],
+        _WORKER_STATE["overlay"],
+    )
+    return test_result, os.getpid(), time.perf_counter() - start
+
+
+def create_worker_pool(
+    G,
+    charger_nodes: List[int],
+    output_dir: str,
+    workers: int,
+    overlay=None,
+    pin_cpus: Optional[List[int]] = None,
+):
+    """
+    Prepara el estado compartido y, si workers > 1, crea un pool de procesos.
+
+    El pool usa el método "fork" para que el grafo se comparta copy-on-write.
+    Si la plataforma no lo soporta (Windows), se devuelve None y los tests
+    corren en serie.
+
+    Con pin_cpus cada worker queda fijo a uno de esos núcleos.
+
+    Debe llamarse antes de iniciar hilos (por ejemplo el spinner de Halo):
+    hacer fork con hilos activos puede dejar locks tomados en los hijos.
+    """
+    _WORKER_STATE.update(
+        G=G, charger_nodes=charger_nodes, output_dir=output_dir, overlay=overlay
+    )
+
+    if workers <= 1:
+        return None
+    if "fork" not in multiprocessing.get_all_start_methods():
+        print("Aviso: fork no disponible en esta plataforma, se ejecuta en serie.")
+        return None
+
+    # Mover los objetos existentes a la generación permanente del GC evita que
+    # los recorridos del recolector en los hijos toquen (y copien) sus páginas
+    gc.freeze()
+    if pin_cpus:
+        return multiprocessing.get_context("fork").Pool(
+            processes=workers, initializer=_pin_worker, initargs=(pin_cpus,)
+        )
+    return multiprocessing.get_context("fork").Pool(processes=workers)
+
+
+def build_tests(mode: str) -> List[Tuple[str, str]]:
+    """
+    Lista de pares (origen, destino) a evaluar.
+
+    - "fixed_origin": desde ORIGEN_FIJO a todos los demás barrios
+    - "all_pairs": todos los pares ordenados de barrios distintos
+    """
+    if mode == "all_pairs":
+        return [
+            (origen, destino)
+            for origen in MONTEVIDEO_BARRIOS.keys()
+            for destino in MONTEVIDEO_BARRIOS.keys()
+            if origen != destino
+        ]
+
+    if ORIGEN_FIJO not in MONTEVIDEO_BARRIOS:
+        raise ValueError(
+            f"El barrio de origen fijo '{ORIGEN_FIJO}' no existe en MONTEVIDEO_BARRIOS."
+        )
+    return [
+        (ORIGEN_FIJO, barrio)
+        for barrio in MONTEVIDEO_BARRIOS.keys()
+        if barrio != ORIGEN_FIJO
+    ]
+
+
+def load_checkpoint(checkpoint_path: str) -> Tuple[Optional[Dict], List[Dict]]:
+    """
+    Lee un checkpoint JSONL existente.
+
+    Returns:
+        Tupla (config, tests_completados); config es None si el archivo no
+        tiene todavía el registro de configuración.
+    """
+    config = None
+    tests: List[Dict] = []
+    for record in iter_jsonl_records(checkpoint_path):
+        if record.get("type") == "config":
+            config = record["config"]
+        elif record.get("type") == "test":
+            tests.append(record["test"])
+    return config, tests
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Benchmark de A* (varias heurísticas) vs Greedy con gestión de batería."
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Procesos en paralelo (1 = serie, 0 = todos los núcleos)",
+    )
+    parser.add_argument(
+        "--all-pairs",
+        action="store_true",
+        help="Evaluar todos los pares de barrios en lugar de origen fijo",
+    )
+    parser.add_argument(
+        "--resume",
+        metavar="DIR",
+        default=None,
+        help="Continuar una corrida interrumpida usando el checkpoint de DIR",
+    )
+    parser.add_argument(
+        "--charger-overlay",
+        action="store_true",
+        help="Agregar el ruteo sobre la tabla precalculada de cargadores",
+    )
+    parser.add_argument(
+        "--memory",
+        action="store_true",
+        help="Medir el pico de memoria de cada consulta (la repite bajo tracemalloc)",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Instrumentar A* y Greedy (stale pops, recargas, estados, tiempo por fase)",
+    )
+    parser.add_argument(
+        "--warmup",
+        type=int,
+        default=0,
+        help="Corridas de calentamiento por consulta (no se miden)",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=1,
+        help="Corridas medidas por consulta (time_seconds es la mediana)",
+    )
+    parser.add_argument(
+        "--no-gc",
+        action="store_true",
+        help="Apagar el recolector de basura durante cada corrida medida",
+    )
+    parser.add_argument(
+        "--pin-cpu",
+        metavar="CPUS",
+        default=None,
+        help='Fijar el proceso (o cada worker) a estos núcleos, p. ej. "2" o "0,2-3"',
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    workers = args.workers if args.workers > 0 else (os.cpu_count() or 1)
+
     print("=" * 80)
-    print("BENCHMARK: A* (3 heurísticas) vs Greedy con Gestión de Batería")
+    print("BENCHMARK: A* (varias heurísticas) vs Greedy con Gestión de Batería")
     print("=" * 80)
 
-    # Directorio de salida
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    output_dir = os.path.join("output", "benchmark_heuristicas", timestamp)
-    os.makedirs(output_dir, exist_ok=True)
+    config: Dict = {
+        "GAMMA": GAMMA,
+        "MAX_CAPACITY": MAX_CAPACITY,
+        "INITIAL_CHARGE": INITIAL_CHARGE,
+        "RECHARGE_AMOUNT": RECHARGE_AMOUNT,
+        "BATTERY_STEP": BATTERY_STEP,
+        "astar_variants": [
+            {"name": name, "heuristic": heur.__name__, "gamma_min": gm}
+            for name, heur, gm in ASTAR_VARIANTS
+        ],
+        "engine_variants": [
+            {"name": name, "engine": search.__name__, "heuristic": heur.__name__, "gamma_min": gm}
+            for name, search, heur, gm, _ in ENGINE_VARIANTS
+        ],
+        "greedy_name": GREEDY_NAME,
+        "charger_overlay": args.charger_overlay,
+        "measure_memory": args.memory,
+        "profile": args.profile,
+        "warmup": args.warmup,
+        "repetitions": max(1, args.repeat),
+        "disable_gc": args.no_gc,
+        "mode": "all_pairs" if args.all_pairs else "fixed_origin",
+    }
+
+    # Directorio de salida (nuevo, o el de la corrida a continuar)
+    completed: List[Dict] = []
+    if args.resume:
+        output_dir = args.resume
+        checkpoint_path = os.path.join(output_dir, CHECKPOINT_NAME)
+        if not os.path.isfile(checkpoint_path):
+            raise FileNotFoundError(f"No se encontró el checkpoint {checkpoint_path}")
+
+        repair_jsonl(checkpoint_path)
+        saved_config, completed = load_checkpoint(checkpoint_path)
+        if saved_config is not None:
+            # El modo y el overlay los define la corrida original; el resto debe coincidir
+            config["mode"] = saved_config.get("mode", "fixed_origin")
+            config["charger_overlay"] = saved_config.get("charger_overlay", False)
+            config["measure_memory"] = saved_config.get("measure_memory", False)
+            config["profile"] = saved_config.get("profile", False)
+            config["warmup"] = saved_config.get("warmup", 0)
+            config["repetitions"] = saved_config.get("repetitions", 1)
+            config["disable_gc"] = saved_config.get("disable_gc", False)
+            if saved_config != config:
+                raise ValueError(
+                    "La configuración actual no coincide con la del checkpoint; "
+                    "no se puede continuar esa corrida."
+                )
+        print(f"Continuando corrida en {output_dir}: {len(completed)} tests ya completados")
+    else:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        output_dir = os.path.join("output", "benchmark_heuristicas", timestamp)
+        os.makedirs(output_dir, exist_ok=True)
+        checkpoint_path = os.path.join(output_dir, CHECKPOINT_NAME)
+        saved_config = None
+
+    # Los workers heredan el valor por fork
+    global MEASURE_MEMORY, PROFILE_SEARCH, WARMUP_RUNS, REPETITIONS, DISABLE_GC
+    MEASURE_MEMORY = config["measure_memory"]
+    PROFILE_SEARCH = config["profile"]
+    WARMUP_RUNS = config["warmup"]
+    REPETITIONS = config["repetitions"]
+    DISABLE_GC = config["disable_gc"]
+
+    # En serie se fija este proceso; en paralelo, cada worker (create_worker_pool)
+    pin_cpus = parse_cpu_list(args.pin_cpu) if args.pin_cpu else None
+    if pin_cpus and workers <= 1 and not pin_to_cpus(pin_cpus):
+        print("Aviso: esta plataforma no permite fijar núcleos (--pin-cpu se ignora).")
+        pin_cpus = None
 
     # Cargar grafo
     with Halo(text="Cargando grafo de Montevideo...", spinner=DOTS_SPINNER):
-        G = load_graph("Montevideo, Uruguay", gamma=GAMMA)
+        G = load_graph(PLACE_NAME, gamma=GAMMA)
     print(f"Grafo cargado: {len(G.nodes)} nodos")
 
     # Cargar cargadores
     charger_nodes, _ = get_charger_nodes(G)
     print(f"Cargadores del JSON: {len(charger_nodes)}")
 
-    origen_fijo = "Ciudad Vieja"
-    if origen_fijo not in MONTEVIDEO_BARRIOS:
-        raise ValueError(
-            f"El barrio de origen fijo '{origen_fijo}' no existe en MONTEVIDEO_BARRIOS."
-        )
+    # Los motores corren sobre el grafo compilado; se compila (y se reservan
+    # los almacenes de estados) antes del fork para que los workers lo hereden
+    compiled = get_compiled_graph(G)
+    levels = max(
+        battery_to_units(INITIAL_CHARGE, BATTERY_STEP),
+        battery_to_units(MAX_CAPACITY, BATTERY_STEP),
+    ) + 1
+    state_store_bytes = reserve_state_stores(compiled.num_nodes * levels)
+    print(f"Almacenes de estados: {state_store_bytes / 2**20:.1f} MB")
 
-    tests = [
-        (origen_fijo, barrio)
-        for barrio in MONTEVIDEO_BARRIOS.keys()
-        if barrio != origen_fijo
-    ]
+    # Heurísticas con tablas precalculadas (ALT, CH): se preparan en el proceso
+    # padre para que los workers las hereden por fork
+    heuristics = [heur for _, heur, _ in ASTAR_VARIANTS]
+    heuristics += [heur for _, _, heur, _, _ in ENGINE_VARIANTS]
+    for heuristic_func in heuristics:
+        if hasattr(heuristic_func, "prepare"):
+            with Halo(text=f"Preparando heurística {heuristic_func.__name__}...", spinner=DOTS_SPINNER):
+                heuristic_func.prepare(compiled)
+
+    overlay = None
+    if config["charger_overlay"]:
+        with Halo(text="Preparando tabla de cargadores...", spinner=DOTS_SPINNER):
+            table = load_or_build_charger_table(
+                compiled,
+                charger_nodes,
+                charger_table_path(PLACE_NAME, GAMMA, charger_nodes),
+            )
+            # Los tramos origen/destino <-> cargadores se resuelven con CH
+            overlay = (compiled, table, get_contraction_hierarchy(compiled))
+        print(f"Tabla de cargadores: {table.num_chargers} x {table.num_chargers}")
+
+    tests = build_tests(config["mode"])
 
     all_results: Dict = {
-        "config": {
-            "GAMMA": GAMMA,
-            "MAX_CAPACITY": MAX_CAPACITY,
-            "INITIAL_CHARGE": INITIAL_CHARGE,
-            "RECHARGE_AMOUNT": RECHARGE_AMOUNT,
-            "astar_variants": [
-                {"name": name, "heuristic": heur.__name__, "gamma_min": gm}
-                for name, heur, gm in ASTAR_VARIANTS
-            ],
-            "greedy_name": GREEDY_NAME,
-        },
-        "tests": [],
+        "config": config,
+        "tests": list(completed),
     }
 
-    print(f"\nEjecutando {len(tests)} tests desde {origen_fijo} a todos los barrios...")
+    done_ids = {t["test_id"] for t in completed}
+    tasks = [
+        (i, origen_name, destino_name)
+        for i, (origen_name, destino_name) in enumerate(tests, 1)
+        if i not in done_ids
+    ]
+
+    if config["mode"] == "all_pairs":
+        print(f"\nEjecutando {len(tasks)} de {len(tests)} tests (todos los pares de barrios)...")
+    else:
+        print(f"\nEjecutando {len(tasks)} de {len(tests)} tests desde {ORIGEN_FIJO} a todos los barrios...")
+
+    # El pool se crea antes de arrancar el spinner (que corre en un hilo)
+    pool = create_worker_pool(G, charger_nodes, output_dir, workers, overlay, pin_cpus)
+    if pool is not None:
+        print(f"Modo paralelo: {workers} procesos")
 
     spinner = Halo(text="Iniciando tests...", spinner=DOTS_SPINNER)
     spinner.start()
 
-    for i, (origen_name, destino_name) in enumerate(tests, 1):
-        spinner.text = (
-            f"Ejecutando test {i}/{len(tests)}: {origen_name} -> {destino_name}"
-        )
-        test_result = run_test(
-            G, charger_nodes, origen_name, destino_name, i, output_dir
+    per_worker: Dict[int, Dict] = {}
+    wall_start = time.perf_counter()
+
+    try:
+        with open(checkpoint_path, "a", encoding="utf-8") as checkpoint:
+            if saved_config is None:
+                append_jsonl_record(checkpoint, {"type": "config", "config": config})
+
+            if pool is None:
+                results_iter = map(_run_test_task, tasks)
+            else:
+                # Sin orden: cada test se guarda apenas termina, aunque uno
+                # anterior más lento siga corriendo (se ordena al final)
+                results_iter = pool.imap_unordered(_run_test_task, tasks, chunksize=1)
+
+            for done, (test_result, pid, elapsed) in enumerate(results_iter, 1):
+                spinner.text = (
+                    f"Test {len(done_ids) + done}/{len(tests)} completado: "
+                    f"{test_result['origen_name']} -> {test_result['destino_name']}"
+                )
+                append_jsonl_record(checkpoint, {"type": "test", "test": test_result})
+                all_results["tests"].append(test_result)
+
+                worker_stats = per_worker.setdefault(
+                    pid, {"worker_pid": pid, "num_tests": 0, "busy_seconds": 0.0}
+                )
+                worker_stats["num_tests"] += 1
+                worker_stats["busy_seconds"] += elapsed
+    except BaseException:
+        if pool is not None:
+            pool.terminate()
+        spinner.fail(
+            f"Corrida interrumpida. Para continuarla: python benchmark.py --resume {output_dir}"
         )
-        all_results["tests"].append(test_result)
+        raise
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+            gc.unfreeze()
 
+    wall_time = time.perf_counter() - wall_start
     spinner.succeed("Todos los tests completados.")
 
+    all_results["tests"].sort(key=lambda t: t["test_id"])
+
+    # Uno-a-muchos: una búsqueda para todos los destinos del origen fijo
+    if config["mode"] == "fixed_origin":
+        with Halo(text="Comparando route_many contra consultas separadas...", spinner=DOTS_SPINNER):
+            all_results["batch"] = run_batch(
+                compiled,
+                charger_nodes,
+                ORIGEN_FIJO,
+                [destino_name for _, destino_name in tests],
+            )
+        batch = all_results["batch"]
+        print(
+            f"route_many: {batch['num_destinations']} destinos en {batch['time_seconds']:.2f}s "
+            f"vs {batch['separate_time_seconds']:.2f}s en consultas separadas"
+        )
+
+    busy_total = sum(w["busy_seconds"] for w in per_worker.values())
+    all_results["memory"] = {
+        "state_store_bytes": state_store_bytes,
+        "peak_per_query": config["measure_memory"],
+    }
+
+    all_results["timing"] = {
+        "workers": workers if pool is not None else 1,
+        "resumed_tests": len(completed),
+        "wall_time_seconds": wall_time,
+        "busy_time_seconds": busy_total,
+        # Procesos ocupados en promedio (cercano a "workers" si escala bien)
+        "effective_parallelism": busy_total / wall_time if wall_time > 0 else None,
+        "pin_cpus": pin_cpus,
+        "per_worker": sorted(per_worker.values(), key=lambda w: w["worker_pid"]),
+    }
+
     # Guardar JSON con todos los resultados
     json_path = os.path.join(output_dir, "resultados.json")
     with open(json_path, "w", encoding="utf-8") as f:
         json.dump(all_results, f, ensure_ascii=False, indent=2)
 
     print("\nBenchmark completado.")
+    print(f"Tiempo total: {wall_time:.2f}s ({all_results['timing']['workers']} procesos)")
     print(f"Resultados guardados en: {json_path}")
 
 
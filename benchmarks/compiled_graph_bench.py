@@ -0,0 +1,104 @@
+"""
+Benchmark: NetworkX vs CompiledGraph (CSR) en astar_battery y greedy_battery.
+
+Corre los mismos tests que benchmark.py (Ciudad Vieja -> cada barrio) sobre
+el grafo de NetworkX y sobre su versión compilada, verifica que ambos
+backends devuelvan exactamente el mismo camino y reporta el speedup.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.compiled_graph_bench [--place "Montevideo, Uruguay"] [--limit N]
+"""
+
+import argparse
+import time
+from typing import Dict, List
+
+from algorithms.astar_battery_core import astar_battery
+from algorithms.greedy_battery_core import greedy_battery
+from graph.chargers_loader import get_charger_nodes
+from graph.compiled_graph import compile_graph
+from graph.graph_setup import load_graph
+from graph.montevideo_barrios import MONTEVIDEO_BARRIOS, get_nearest_node
+
+GAMMA = 1.2
+MAX_CAPACITY = 5.0
+INITIAL_CHARGE = 5.0
+RECHARGE_AMOUNT = 4.5
+
+ORIGEN_FIJO = "Ciudad Vieja"
+
+
+def run_backend(func, graph, charger_nodes: List[int], orig: int, dest: int):
+    return func(
+        graph,
+        orig,
+        dest,
+        max_capacity=MAX_CAPACITY,
+        initial_charge=INITIAL_CHARGE,
+        gamma_min=GAMMA,
+        charger_nodes=charger_nodes,
+        recharge_amount=RECHARGE_AMOUNT,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compara el backend NetworkX contra CompiledGraph (CSR)."
+    )
+    parser.add_argument("--place", default="Montevideo, Uruguay")
+    parser.add_argument(
+        "--limit", type=int, default=None, help="Cantidad máxima de destinos"
+    )
+    args = parser.parse_args()
+
+    print(f"Cargando grafo de {args.place}...")
+    G = load_graph(args.place, gamma=GAMMA)
+
+    t0 = time.perf_counter()
+    cg = compile_graph(G)
+    cg.adjacency()  # incluir la creación de las vistas en el costo de compilar
+    compile_time = time.perf_counter() - t0
+    print(
+        f"Grafo compilado: {cg.num_nodes} nodos, {cg.num_edges} aristas "
+        f"en {compile_time:.3f}s"
+    )
+
+    charger_nodes, _ = get_charger_nodes(G)
+
+    destinos = [b for b in MONTEVIDEO_BARRIOS if b != ORIGEN_FIJO]
+    if args.limit:
+        destinos = destinos[: args.limit]
+
+    orig = get_nearest_node(G, ORIGEN_FIJO)
+
+    totals: Dict[str, Dict[str, float]] = {}
+    for name, func in (("astar_battery", astar_battery), ("greedy_battery", greedy_battery)):
+        totals[name] = {"networkx": 0.0, "compiled": 0.0}
+        for destino in destinos:
+            dest = get_nearest_node(G, destino)
+
+            t0 = time.perf_counter()
+            res_nx = run_backend(func, G, charger_nodes, orig, dest)
+            totals[name]["networkx"] += time.perf_counter() - t0
+
+            t0 = time.perf_counter()
+            res_cg = run_backend(func, cg, charger_nodes, orig, dest)
+            totals[name]["compiled"] += time.perf_counter() - t0
+
+            if (res_nx is None) != (res_cg is None) or (
+                res_nx is not None and res_nx[:4] != res_cg[:4]
+            ):
+                raise AssertionError(
+                    f"{name}: resultados distintos entre backends para {ORIGEN_FIJO} -> {destino}"
+                )
+
+    print(f"\nTests: {len(destinos)} destinos desde {ORIGEN_FIJO} (caminos idénticos)\n")
+    print("| Algoritmo | NetworkX (s) | CompiledGraph (s) | Speedup |")
+    print("| --- | --- | --- | --- |")
+    for name, t in totals.items():
+        speedup = t["networkx"] / t["compiled"] if t["compiled"] > 0 else float("nan")
+        print(f"| {name} | {t['networkx']:.3f} | {t['compiled']:.3f} | {speedup:.2f}x |")
+
+
+if __name__ == "__main__":
+    main()
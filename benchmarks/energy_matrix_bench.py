@@ -0,0 +1,126 @@
+"""
+Benchmark: matriz de energías entre todos los barrios (algorithms/energy_matrix.py).
+
+Calcula la matriz barrio x barrio de MONTEVIDEO_BARRIOS con energy_matrix,
+compara una muestra de pares contra astar_battery (misma energía) y estima
+lo que costarían las N x M llamadas a astar_battery.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.energy_matrix_bench [--place "Montevideo, Uruguay"]
+        [--workers N] [--baseline-pairs K] [--save matriz.npz]
+"""
+
+import argparse
+import random
+import time
+from typing import Dict
+
+import numpy as np
+
+from algorithms.astar_battery_core import astar_battery
+from algorithms.contraction_hierarchy import get_contraction_hierarchy
+from algorithms.energy_matrix import energy_matrix
+from graph.chargers_loader import get_charger_nodes
+from graph.compiled_graph import compile_graph
+from graph.graph_setup import load_graph
+from graph.montevideo_barrios import MONTEVIDEO_BARRIOS, get_nearest_node
+
+GAMMA = 1.2
+MAX_CAPACITY = 5.0
+INITIAL_CHARGE = 5.0
+RECHARGE_AMOUNT = 4.5
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Matriz de energías entre barrios vs llamadas a astar_battery."
+    )
+    parser.add_argument("--place", default="Montevideo, Uruguay")
+    parser.add_argument(
+        "--workers", type=int, default=1, help="Procesos (1 = serie, 0 = todos los núcleos)"
+    )
+    parser.add_argument(
+        "--baseline-pairs",
+        type=int,
+        default=50,
+        help="Pares que se verifican con astar_battery (0 = todos)",
+    )
+    parser.add_argument("--save", default=None, help="Guardar la matriz en un .npz")
+    args = parser.parse_args()
+
+    print(f"Cargando grafo de {args.place}...")
+    G = load_graph(args.place, gamma=GAMMA)
+    cg = compile_graph(G)
+    charger_nodes, _ = get_charger_nodes(G)
+
+    t0 = time.perf_counter()
+    get_contraction_hierarchy(cg)
+    print(f"Jerarquía de contracción lista en {time.perf_counter() - t0:.2f}s")
+
+    barrios = list(MONTEVIDEO_BARRIOS)
+    nodes = [get_nearest_node(G, barrio) for barrio in barrios]
+
+    search_kwargs = dict(
+        max_capacity=MAX_CAPACITY,
+        initial_charge=INITIAL_CHARGE,
+        gamma_min=GAMMA,
+        charger_nodes=charger_nodes,
+        recharge_amount=RECHARGE_AMOUNT,
+    )
+
+    stats: Dict = {}
+    t0 = time.perf_counter()
+    energy, recharges = energy_matrix(
+        cg, nodes, nodes, workers=args.workers, stats=stats, **search_kwargs
+    )
+    matrix_time = time.perf_counter() - t0
+
+    pairs = [(i, j) for i in range(len(nodes)) for j in range(len(nodes))]
+    sample = pairs
+    if 0 < args.baseline_pairs < len(pairs):
+        sample = random.Random(0).sample(pairs, args.baseline_pairs)
+
+    astar_time = 0.0
+    for i, j in sample:
+        t0 = time.perf_counter()
+        result = astar_battery(cg, nodes[i], nodes[j], **search_kwargs)
+        astar_time += time.perf_counter() - t0
+
+        expected = np.inf if result is None else result[1]
+        if not (expected == energy[i, j] or abs(expected - energy[i, j]) < 1e-6):
+            raise AssertionError(
+                f"Energía distinta para {barrios[i]} -> {barrios[j]}: "
+                f"{energy[i, j]} (matriz) vs {expected} (astar_battery)"
+            )
+    estimated_astar = astar_time / len(sample) * len(pairs)
+
+    n = len(nodes)
+    print(f"\nMatriz {n} x {n} ({len(pairs)} pares, {args.workers} procesos)\n")
+    print("| Paso | Pares | Tiempo (s) |")
+    print("| --- | --- | --- |")
+    print(f"| Buckets CH (cota sin batería) | {len(pairs)} | {stats['ch_time_seconds']:.3f} |")
+    print(f"| Camino CH sin recargar | {stats['ch_pairs']} | {stats['direct_time_seconds']:.3f} |")
+    print(
+        f"| route_many ({stats['searched_sources']} orígenes) | {stats['searched_pairs']} "
+        f"| {stats['search_time_seconds']:.3f} |"
+    )
+    print(f"| Sin camino | {stats['unreachable_pairs']} | - |")
+    print(f"| **Total** | {len(pairs)} | {matrix_time:.3f} |")
+
+    print(
+        f"\nPares viables: {int(np.isfinite(energy).sum())}/{len(pairs)}, "
+        f"con recarga: {int((recharges > 0).sum())}"
+    )
+    print(
+        f"astar_battery: {len(sample)} pares verificados (misma energía) en {astar_time:.2f}s; "
+        f"los {len(pairs)} pares llevarían ~{estimated_astar:.1f}s "
+        f"({estimated_astar / matrix_time:.1f}x la matriz)"
+    )
+
+    if args.save:
+        np.savez(args.save, barrios=np.array(barrios), energy=energy, recharges=recharges)
+        print(f"Matriz guardada en {args.save}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""
+Benchmark: colas de prioridad de la lista abierta (algorithms/priority_queues.py).
+
+Corre astar_battery y greedy_battery sobre el grafo compilado con cada cola
+(Ciudad Vieja -> cada barrio), verifica que todas devuelvan el mismo camino
+y reporta pushes, pops, tamaño máximo de la cola y tiempo.
+
+También verifica que todas las colas den el mismo resultado con una
+heurística que devuelve inf en los nodos sin salida (como ALT o CH cuando
+un nodo no llega al destino).
+
+Además graba la secuencia de push/pop de cada búsqueda con heapq y la
+reproduce sobre cada cola por separado, para medir el costo de la cola sin
+el resto de la búsqueda.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.priority_queue_bench [--place "Montevideo, Uruguay"] [--limit N]
+"""
+
+import argparse
+import math
+import time
+from typing import Dict, List
+
+from algorithms.astar_battery_core import astar_battery
+from algorithms.greedy_battery_core import greedy_battery
+from algorithms.priority_queues import QUEUE_TYPES, HeapqQueue, make_priority_queue
+from graph.chargers_loader import get_charger_nodes
+from graph.compiled_graph import compile_graph
+from graph.graph_setup import load_graph
+from graph.montevideo_barrios import MONTEVIDEO_BARRIOS, get_nearest_node
+from utils.helpers import euclidean_distance
+
+GAMMA = 1.2
+MAX_CAPACITY = 5.0
+INITIAL_CHARGE = 5.0
+RECHARGE_AMOUNT = 4.5
+
+ORIGEN_FIJO = "Ciudad Vieja"
+
+
+class RecordingQueue(HeapqQueue):
+    """
+    heapq que además anota cada operación en trace.
+
+    Un push es (estado, clave); un pop es True si saca la entrada vigente del
+    estado y False si saca un duplicado viejo (los que heapq descarta).
+    """
+
+    def __init__(self, trace: List):
+        super().__init__()
+        self.trace = trace
+        self._live: Dict = {}
+
+    def push(self, state, key):
+        self.trace.append((state, key))
+        live = self._live.get(state)
+        if live is None or key < live[0]:
+            self._live[state] = (key, self.pushes)
+        super().push(state, key)
+
+    def pop(self):
+        key, order, state = self._heap[0]
+        current = self._live.get(state) == (key, order)
+        if current:
+            del self._live[state]
+        self.trace.append(current)
+        return super().pop()
+
+
+def run_search(func, graph, charger_nodes: List[int], orig: int, dest: int, queue, stats: Dict):
+    return func(
+        graph,
+        orig,
+        dest,
+        max_capacity=MAX_CAPACITY,
+        initial_charge=INITIAL_CHARGE,
+        gamma_min=GAMMA,
+        charger_nodes=charger_nodes,
+        recharge_amount=RECHARGE_AMOUNT,
+        queue=queue,
+        stats=stats,
+    )
+
+
+def dead_end_heuristic(G, node, dest):
+    """Distancia euclidiana, o inf si el nodo no tiene aristas de salida."""
+    if node != dest and not G.adjacency()[G.index_of(node)]:
+        return math.inf
+    return euclidean_distance(G, node, dest)
+
+
+def check_infinite_keys(cg, charger_nodes: List[int], orig: int, dests: List[int]) -> None:
+    """Todas las colas devuelven lo mismo en astar_battery aunque la heurística dé inf."""
+    for dest in dests:
+        results = set()
+        for kind in QUEUE_TYPES:
+            result = astar_battery(
+                cg,
+                orig,
+                dest,
+                max_capacity=MAX_CAPACITY,
+                initial_charge=INITIAL_CHARGE,
+                gamma_min=GAMMA,
+                charger_nodes=charger_nodes,
+                recharge_amount=RECHARGE_AMOUNT,
+                heuristic_func=dead_end_heuristic,
+                queue=kind,
+            )
+            results.add(None if result is None else (tuple(result[0]),) + tuple(result[1:4]))
+        if len(results) != 1:
+            raise AssertionError(f"Las colas difieren con claves infinitas ({orig} -> {dest})")
+
+
+def replay(trace: List, kind: str) -> float:
+    """
+    Reproduce una secuencia grabada sobre una cola y devuelve el tiempo.
+
+    Los pops de duplicados solo existen en heapq; las colas con
+    decrease-key los saltean.
+    """
+    pq = make_priority_queue(kind)
+    lazy = isinstance(pq, HeapqQueue)
+    t0 = time.perf_counter()
+    for op in trace:
+        if op is True or (op is False and lazy):
+            pq.pop()
+        elif op is not False:
+            pq.push(op[0], op[1])
+    return time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compara las colas de prioridad de la lista abierta."
+    )
+    parser.add_argument("--place", default="Montevideo, Uruguay")
+    parser.add_argument(
+        "--limit", type=int, default=None, help="Cantidad máxima de destinos"
+    )
+    args = parser.parse_args()
+
+    print(f"Cargando grafo de {args.place}...")
+    G = load_graph(args.place, gamma=GAMMA)
+    cg = compile_graph(G)
+    charger_nodes, _ = get_charger_nodes(G)
+
+    destinos = [b for b in MONTEVIDEO_BARRIOS if b != ORIGEN_FIJO]
+    if args.limit:
+        destinos = destinos[: args.limit]
+
+    orig = get_nearest_node(G, ORIGEN_FIJO)
+    dests = [get_nearest_node(G, destino) for destino in destinos]
+
+    check_infinite_keys(cg, charger_nodes, orig, dests)
+    print("Claves infinitas: todas las colas devuelven el mismo resultado")
+
+    print(f"\nTests: {len(dests)} destinos desde {ORIGEN_FIJO}\n")
+    print("| Algoritmo | Cola | Pushes | Pops | Máx. en cola | Búsqueda (s) | Solo cola (s) |")
+    print("| --- | --- | --- | --- | --- | --- | --- |")
+
+    for name, func in (("astar_battery", astar_battery), ("greedy_battery", greedy_battery)):
+        # Secuencias de operaciones de heapq, una por destino
+        traces: List[List] = []
+        reference = []
+        for dest in dests:
+            trace: List = []
+            result = run_search(
+                func, cg, charger_nodes, orig, dest, lambda: RecordingQueue(trace), {}
+            )
+            traces.append(trace)
+            reference.append(None if result is None else result[:4])
+
+        for kind in QUEUE_TYPES:
+            if kind == "bucket" and func is greedy_battery:
+                # Greedy ordena por h, que no es monótona
+                continue
+            pushes = pops = peak = 0
+            search_time = 0.0
+            for dest, expected in zip(dests, reference):
+                stats: Dict = {}
+                t0 = time.perf_counter()
+                result = run_search(func, cg, charger_nodes, orig, dest, kind, stats)
+                search_time += time.perf_counter() - t0
+
+                if (None if result is None else result[:4]) != expected:
+                    raise AssertionError(f"{name}: la cola {kind} devolvió otro resultado")
+                pushes += stats["heap_pushes"]
+                pops += stats["heap_pops"]
+                peak = max(peak, stats["heap_peak"])
+
+            queue_time = sum(replay(trace, kind) for trace in traces)
+            print(
+                f"| {name} | {kind} | {pushes} | {pops} | {peak} "
+                f"| {search_time:.3f} | {queue_time:.3f} |"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,418 @@
+"""
+Benchmark de escala sobre grafos sintéticos (graph/synthetic_graph.py).
+
+Genera grafos de tamaño creciente (cuadrícula perturbada y Delaunay), ubica
+cargadores sintéticos y corre todas las variantes de benchmark.py (A* con
+cada heurística, Pareto, bidireccional, CH y Greedy) sobre los mismos pares
+origen/destino. No necesita conexión ni el grafo de Montevideo.
+
+Para que el trabajo por consulta sea comparable entre tamaños, cada destino
+está a --od-km kilómetros en línea recta de su origen: lo que crece con el
+grafo es el costo fijo (almacén de estados, tablas por destino, preparación
+de ALT/CH) y la memoria.
+
+Por cada (tipo, tamaño) se registra el tiempo de generar y compilar el grafo,
+el de preparar cada heurística, y por variante la mediana de tiempo por
+consulta, los nodos expandidos y el pico de memoria (tracemalloc). Los
+resultados quedan en scaling.json y en dos gráficos por tipo de grafo.
+
+Antes de cada tamaño se estima la memoria que necesita (grafo compilado y
+sus vistas de Python, más los almacenes de estados si entran densos; ver
+algorithms/state_store.py) y se saltea si supera --max-memory-gb, que por
+defecto es el 80% de la memoria disponible. Así el proceso no queda a merced
+del OOM killer, que lo terminaría sin escribir nada. Los tamaños salteados
+quedan en scaling.json (y en los gráficos) como no medidos.
+
+La contracción de CH es Python puro y tarda horas con millones de nodos:
+ch_battery solo corre hasta --ch-max-nodes. Las tablas de ALT y CH de los
+grafos sintéticos se calculan solo en memoria (no se guardan en
+cache/snapshots/), y su tiempo de preparación se registra aparte del tiempo
+por consulta.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.scaling_bench [--sizes 1000 10000 100000 1000000 5000000]
+        [--kinds grid delaunay] [--queries N] [--variants astar_euclidean greedy ...]
+"""
+
+import argparse
+import copy
+import json
+import math
+import os
+import random
+import time
+import tracemalloc
+from datetime import datetime
+from statistics import median
+from typing import Dict, List, Optional, Tuple
+
+import matplotlib.pyplot as plt
+
+from algorithms.astar_battery_core import astar_battery
+from algorithms.greedy_battery_core import greedy_battery
+from algorithms.state_store import StateStore, release_state_stores, reserve_state_stores
+from benchmark import (
+    ASTAR_VARIANTS,
+    BATTERY_STEP,
+    ENGINE_VARIANTS,
+    GAMMA,
+    GREEDY_NAME,
+    INITIAL_CHARGE,
+    MAX_CAPACITY,
+    RECHARGE_AMOUNT,
+)
+from graph.spatial_index import EARTH_RADIUS_M, SpatialIndex
+from graph.synthetic_graph import KINDS, generate_graph, place_chargers
+from utils.helpers import battery_to_units
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000, 5_000_000]
+
+# Memoria aproximada por nodo del grafo compilado: arreglos CSR, listas de
+# adyacencia de Python, índice espacial y tablas de heurística por destino
+BYTES_PER_NODE = 1024
+
+# Fracción de la memoria disponible que puede usar un tamaño
+MEMORY_FRACTION = 0.8
+
+# Variantes que necesitan la contracción de CH y tamaño máximo por defecto
+CH_VARIANTS = ("ch_battery",)
+CH_MAX_NODES = 100_000
+
+
+def all_variants() -> List[Tuple[str, object, object, float]]:
+    """(nombre, motor, heurística, gamma_min) de todas las variantes de benchmark.py."""
+    variants = [(name, astar_battery, heur, gm) for name, heur, gm in ASTAR_VARIANTS]
+    variants += [(name, search, heur, gm) for name, search, heur, gm, _ in ENGINE_VARIANTS]
+    variants.append((GREEDY_NAME, greedy_battery, None, GAMMA))
+    return [(name, search, memory_only(heur), gm) for name, search, heur, gm in variants]
+
+
+def memory_only(heuristic_func):
+    """
+    Copia de una heurística con tablas en disco (ALT, CH) que no las guarda:
+    los grafos sintéticos no deben llenar cache/snapshots/.
+    """
+    if getattr(heuristic_func, "directory", None) is None:
+        return heuristic_func
+    clone = copy.copy(heuristic_func)
+    clone.directory = None
+    return clone
+
+
+def available_memory_bytes() -> Optional[int]:
+    """Memoria disponible del sistema (MemAvailable), o None si no se puede saber."""
+    try:
+        with open("/proc/meminfo", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def estimate_memory_bytes(size: int, levels: int) -> int:
+    """
+    Memoria aproximada de medir un tamaño: el grafo y, si entran densos, los
+    dos almacenes de estados (si no, usan diccionarios del tamaño de lo que
+    toca cada consulta).
+    """
+    states = size * levels
+    state_bytes = 2 * states * StateStore.BYTES_PER_STATE if StateStore.fits_dense(states) else 0
+    return size * BYTES_PER_NODE + state_bytes
+
+
+def run_query(search_func, heuristic_func, gamma_min, compiled, chargers, orig, dest):
+    kwargs = dict(
+        max_capacity=MAX_CAPACITY,
+        initial_charge=INITIAL_CHARGE,
+        gamma_min=gamma_min,
+        charger_nodes=chargers,
+        recharge_amount=RECHARGE_AMOUNT,
+        battery_step=BATTERY_STEP,
+    )
+    if heuristic_func is not None:
+        kwargs["heuristic_func"] = heuristic_func
+    return search_func(compiled, orig, dest, **kwargs)
+
+
+def pick_queries(compiled, num_queries: int, od_km: float, seed: int) -> List[Tuple[int, int]]:
+    """
+    Pares (origen, destino) con el destino a od_km del origen en una
+    dirección al azar (el nodo más cercano a ese punto).
+    """
+    rng = random.Random(seed)
+    index = SpatialIndex.from_graph(compiled)
+    xs, ys = compiled.coords()
+    deg_lat = od_km / (EARTH_RADIUS_M * math.pi / 180 / 1000)
+
+    queries: List[Tuple[int, int]] = []
+    for _ in range(num_queries):
+        orig = rng.randrange(compiled.num_nodes)
+        angle = rng.uniform(0, 2 * math.pi)
+        lat = ys[orig] + deg_lat * math.sin(angle)
+        lon = xs[orig] + deg_lat * math.cos(angle) / math.cos(math.radians(ys[orig]))
+        queries.append((compiled.node_id(orig), int(index.snap_one(lat, lon))))
+    return queries
+
+
+def measure_size(
+    kind: str,
+    size: int,
+    variants,
+    num_queries: int,
+    od_km: float,
+    seed: int,
+    ch_max_nodes: int = CH_MAX_NODES,
+) -> Dict:
+    """
+    Genera un grafo, prepara las heurísticas y mide cada variante (las de
+    CH solo si el grafo tiene hasta ch_max_nodes nodos).
+    """
+    t0 = time.perf_counter()
+    synthetic = generate_graph(kind, size, seed=seed)
+    generate_time = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    compiled = synthetic.to_compiled(GAMMA)
+    compiled.adjacency()
+    compile_time = time.perf_counter() - t0
+
+    # Los almacenes del tamaño anterior no se reutilizan
+    release_state_stores()
+
+    # Los IDs de nodo del grafo sintético son sus índices (0..n-1)
+    chargers = place_chargers(synthetic, seed=seed)
+    levels = max(
+        battery_to_units(INITIAL_CHARGE, BATTERY_STEP),
+        battery_to_units(MAX_CAPACITY, BATTERY_STEP),
+    ) + 1
+    state_store_bytes = reserve_state_stores(compiled.num_nodes * levels)
+    graph_bytes = sum(
+        arr.nbytes
+        for arr in (
+            compiled.node_ids, compiled.x, compiled.y, compiled.offsets, compiled.targets,
+            compiled.energy_cost, compiled.length, compiled.weight,
+        )
+    )
+
+    result: Dict = {
+        "kind": kind,
+        "requested_size": size,
+        "num_nodes": compiled.num_nodes,
+        "num_edges": compiled.num_edges,
+        "num_chargers": len(chargers),
+        "generate_seconds": generate_time,
+        "compile_seconds": compile_time,
+        "graph_bytes": graph_bytes,
+        "state_store_bytes": state_store_bytes,
+        "prepare_seconds": {},
+        "variants": {},
+        "skipped_variants": {},
+    }
+
+    queries = pick_queries(compiled, num_queries, od_km, seed)
+
+    for name, search_func, heuristic_func, gamma_min in variants:
+        if name in CH_VARIANTS and compiled.num_nodes > ch_max_nodes:
+            result["skipped_variants"][name] = f"más de --ch-max-nodes {ch_max_nodes:,}"
+            print(f"  {name:<20} sin medir (más de {ch_max_nodes:,} nodos)")
+            continue
+
+        # La preparación (tablas de ALT, contracción de CH) se mide aparte
+        if heuristic_func is not None and hasattr(heuristic_func, "prepare"):
+            t0 = time.perf_counter()
+            heuristic_func.prepare(compiled)
+            result["prepare_seconds"][name] = time.perf_counter() - t0
+            print(f"  {name:<20} preparación {result['prepare_seconds'][name]:10.2f} s")
+
+        times: List[float] = []
+        nodes: List[int] = []
+        reached = 0
+        for orig, dest in queries:
+            t0 = time.perf_counter()
+            res = run_query(search_func, heuristic_func, gamma_min, compiled, chargers, orig, dest)
+            times.append(time.perf_counter() - t0)
+            if res is not None:
+                reached += 1
+                nodes.append(res[2])
+
+        # Pico de memoria de una consulta (repetida bajo tracemalloc, sin medir tiempo)
+        orig, dest = queries[0]
+        tracemalloc.start()
+        try:
+            run_query(search_func, heuristic_func, gamma_min, compiled, chargers, orig, dest)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        result["variants"][name] = {
+            "median_time_seconds": median(times),
+            "max_time_seconds": max(times),
+            "median_nodes_expanded": median(nodes) if nodes else None,
+            "reached": reached,
+            "queries": len(queries),
+            "peak_query_memory_bytes": peak,
+        }
+        print(
+            f"  {name:<20} {median(times) * 1e3:10.2f} ms  "
+            f"{reached}/{len(queries)} alcanzados  pico {peak / 2**20:8.1f} MB"
+        )
+
+    return result
+
+
+def plot_scaling(results: List[Dict], kind: str, output_dir: str) -> None:
+    """Tiempo y memoria en función del tamaño (escala log-log), una curva por variante."""
+    runs = sorted(
+        (r for r in results if r["kind"] == kind and "skipped" not in r),
+        key=lambda r: r["num_nodes"],
+    )
+    skipped = [r for r in results if r["kind"] == kind and "skipped" in r]
+    if not runs:
+        return
+    names = sorted({name for r in runs for name in r["variants"]})
+
+    fig, (ax_time, ax_mem) = plt.subplots(1, 2, figsize=(14, 6))
+    for name in names:
+        points = [(r["num_nodes"], r["variants"][name]) for r in runs if name in r["variants"]]
+        sizes = [n for n, _ in points]
+        ax_time.plot(sizes, [v["median_time_seconds"] for _, v in points], marker="o", label=name)
+        ax_mem.plot(
+            sizes,
+            [v["peak_query_memory_bytes"] / 2**20 for _, v in points],
+            marker="o",
+            label=name,
+        )
+
+    sizes = [r["num_nodes"] for r in runs]
+    ax_mem.plot(
+        sizes, [r["state_store_bytes"] / 2**20 for r in runs], "k--", label="almacén de estados"
+    )
+    ax_mem.plot(sizes, [r["graph_bytes"] / 2**20 for r in runs], "k:", label="grafo compilado")
+
+    ax_time.set_title(f"Tiempo por consulta (mediana) - {kind}")
+    ax_time.set_ylabel("Tiempo (s)")
+    ax_mem.set_title(f"Memoria - {kind}")
+    ax_mem.set_ylabel("MB")
+    for ax in (ax_time, ax_mem):
+        ax.set_xscale("log")
+        ax.set_yscale("log")
+        ax.set_xlabel("Nodos")
+        ax.grid(True, which="both", alpha=0.3)
+    ax_mem.legend(fontsize=8)
+    if skipped:
+        fig.text(
+            0.01,
+            0.01,
+            "Sin medir: " + "; ".join(f"{r['requested_size']:,} ({r['skipped']})" for r in skipped),
+            fontsize=8,
+        )
+
+    plt.tight_layout()
+    plt.savefig(os.path.join(output_dir, f"scaling_{kind}.png"), dpi=150)
+    plt.close(fig)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Escalabilidad de todas las variantes sobre grafos sintéticos."
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--kinds", nargs="+", choices=KINDS, default=list(KINDS))
+    parser.add_argument("--queries", type=int, default=5, help="Consultas por tamaño")
+    parser.add_argument(
+        "--od-km", type=float, default=3.0, help="Distancia origen-destino (km en línea recta)"
+    )
+    parser.add_argument(
+        "--variants", nargs="+", default=None, help="Solo estas variantes (por nombre)"
+    )
+    parser.add_argument(
+        "--max-memory-gb",
+        type=float,
+        default=None,
+        help="Saltear tamaños cuya memoria estimada supere esto "
+        "(por defecto: 80%% de la memoria disponible)",
+    )
+    parser.add_argument(
+        "--ch-max-nodes",
+        type=int,
+        default=CH_MAX_NODES,
+        help="Tamaño máximo en el que se corre ch_battery (la contracción es lenta)",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="Directorio de salida")
+    args = parser.parse_args(argv)
+
+    variants = all_variants()
+    if args.variants:
+        unknown = set(args.variants) - {name for name, _, _, _ in variants}
+        if unknown:
+            raise ValueError(f"Variantes desconocidas: {', '.join(sorted(unknown))}")
+        variants = [v for v in variants if v[0] in args.variants]
+
+    output_dir = args.output or os.path.join(
+        "output", "scaling", datetime.now().strftime("%Y%m%d_%H%M%S")
+    )
+    os.makedirs(output_dir, exist_ok=True)
+
+    levels = max(
+        battery_to_units(INITIAL_CHARGE, BATTERY_STEP),
+        battery_to_units(MAX_CAPACITY, BATTERY_STEP),
+    ) + 1
+
+    max_memory_gb = args.max_memory_gb
+    if max_memory_gb is None:
+        available = available_memory_bytes()
+        max_memory_gb = MEMORY_FRACTION * available / 2**30 if available else float("inf")
+    print(f"Memoria máxima por tamaño: {max_memory_gb:.1f} GB")
+
+    results: List[Dict] = []
+    for kind in args.kinds:
+        for size in sorted(args.sizes):
+            memory_gb = estimate_memory_bytes(size, levels) / 2**30
+            skipped = None
+            if memory_gb > max_memory_gb:
+                skipped = f"memoria estimada ~{memory_gb:.1f} GB > {max_memory_gb:.1f} GB"
+            else:
+                print(f"{kind} {size:,} nodos (memoria estimada ~{memory_gb:.1f} GB)")
+                try:
+                    results.append(
+                        measure_size(
+                            kind, size, variants, args.queries, args.od_km, args.seed,
+                            args.ch_max_nodes,
+                        )
+                    )
+                except MemoryError:
+                    skipped = f"sin memoria (estimada ~{memory_gb:.1f} GB)"
+
+            if skipped is not None:
+                print(f"{kind} {size:,} nodos: sin medir, {skipped}")
+                results.append(
+                    {
+                        "kind": kind,
+                        "requested_size": size,
+                        "estimated_memory_bytes": int(memory_gb * 2**30),
+                        "skipped": skipped,
+                    }
+                )
+
+            # Guardar después de cada tamaño: los grandes pueden tardar horas
+            with open(os.path.join(output_dir, "scaling.json"), "w", encoding="utf-8") as f:
+                json.dump(
+                    {"od_km": args.od_km, "queries": args.queries, "seed": args.seed, "results": results},
+                    f,
+                    ensure_ascii=False,
+                    indent=2,
+                )
+
+    for kind in args.kinds:
+        plot_scaling(results, kind, output_dir)
+    print(f"\nResultados en {output_dir}")
+
+
+if __name__ == "__main__":
+    main()
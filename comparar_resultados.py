@@ -0,0 +1,276 @@
+"""
+Compara dos corridas del benchmark y detecta regresiones por consulta.
+
+Cada consulta se identifica por (origen, destino, algoritmo). Para las que
+están en ambas corridas se informa la diferencia de tiempo, nodos expandidos
+y energía, y se marca como regresión si supera los umbrales:
+
+- tiempo: la mediana nueva supera a la base en más de --time-threshold
+  (relativo) y en más de --min-time-ms; si las corridas tienen repeticiones
+  (benchmark.py --repeat), además debe superar el IQR medio de ambas
+- nodos expandidos: más de --nodes-threshold (relativo; 0 = cualquier aumento)
+- energía: más de --energy-tolerance kWh, o el destino dejó de alcanzarse
+
+Termina con código 1 si hay alguna regresión, para usarlo como control en un
+pipeline: python comparar_resultados.py <corrida_base> <corrida_nueva>
+"""
+
+import argparse
+import os
+import sys
+from typing import Any, Dict, List, Optional
+
+from analizar_resultados import (
+    compare_time_by_algorithm,
+    format_float,
+    load_rows,
+    make_table_19_baseline_comparison,
+    save_markdown,
+)
+
+TIME_THRESHOLD = 0.10
+MIN_TIME_MS = 1.0
+NODES_THRESHOLD = 0.0
+ENERGY_TOLERANCE = 1e-6
+
+
+def find_resultados(run_path: str) -> str:
+    """
+    resultados.json de una corrida (o el checkpoint resultados.jsonl si no
+    terminó). run_path puede ser el directorio o el archivo.
+    """
+    if os.path.isfile(run_path):
+        return run_path
+    for name in ("resultados.json", "resultados.jsonl"):
+        path = os.path.join(run_path, name)
+        if os.path.isfile(path):
+            return path
+    raise FileNotFoundError(f"No se encontraron resultados en {run_path}")
+
+
+def index_rows(rows: List[Dict[str, Any]]) -> Dict[Any, Dict[str, Any]]:
+    return {(r["origen"], r["destino"], r["algoritmo"]): r for r in rows}
+
+
+def relative_delta(before: Optional[float], after: Optional[float]) -> Optional[float]:
+    if before is None or after is None or before == 0:
+        return None
+    return after / before - 1
+
+
+def compare_query(
+    base: Dict[str, Any],
+    new: Dict[str, Any],
+    time_threshold: float = TIME_THRESHOLD,
+    min_time_ms: float = MIN_TIME_MS,
+    nodes_threshold: float = NODES_THRESHOLD,
+    energy_tolerance: float = ENERGY_TOLERANCE,
+) -> Dict[str, Any]:
+    """
+    Diferencias de una consulta entre la corrida base y la nueva.
+
+    Returns:
+        Diccionario con los deltas y "regressions", la lista de métricas que
+        empeoraron más allá de los umbrales
+    """
+    regressions: List[str] = []
+    result: Dict[str, Any] = {
+        "origen": new["origen"],
+        "destino": new["destino"],
+        "algoritmo": new["algoritmo"],
+        "time_base": base["time_seconds"],
+        "time_new": new["time_seconds"],
+        "time_delta": relative_delta(base["time_seconds"], new["time_seconds"]),
+        "nodes_base": base["nodes_expanded"],
+        "nodes_new": new["nodes_expanded"],
+        "nodes_delta": relative_delta(base["nodes_expanded"], new["nodes_expanded"]),
+        "energy_base": base["energy_kwh"],
+        "energy_new": new["energy_kwh"],
+        "energy_delta": None,
+        "regressions": regressions,
+    }
+
+    if base["reached_destination"] and not new["reached_destination"]:
+        regressions.append("destino")
+    if not (base["reached_destination"] and new["reached_destination"]):
+        return result
+
+    energy_delta = new["energy_kwh"] - base["energy_kwh"]
+    result["energy_delta"] = energy_delta
+    if energy_delta > energy_tolerance:
+        regressions.append("energia")
+
+    if result["nodes_delta"] is not None and result["nodes_delta"] > nodes_threshold:
+        regressions.append("nodos")
+
+    time_delta = result["time_delta"]
+    if time_delta is not None and time_delta > time_threshold:
+        increase = new["time_seconds"] - base["time_seconds"]
+        # Con repeticiones, un aumento dentro del ruido de la medición no cuenta
+        iqrs = [r["time_iqr_seconds"] for r in (base, new) if r["time_iqr_seconds"]]
+        noise = sum(iqrs) / len(iqrs) if len(iqrs) == 2 else 0.0
+        if increase * 1e3 > min_time_ms and increase > noise:
+            regressions.append("tiempo")
+
+    return result
+
+
+def compare_runs(
+    base_rows: List[Dict[str, Any]], new_rows: List[Dict[str, Any]], **thresholds
+) -> List[Dict[str, Any]]:
+    """Compara las consultas presentes en ambas corridas (orden de la nueva)."""
+    base_index = index_rows(base_rows)
+    return [
+        compare_query(base_index[key], new, **thresholds)
+        for key, new in index_rows(new_rows).items()
+        if key in base_index
+    ]
+
+
+def make_regressions_table(comparisons: List[Dict[str, Any]]) -> str:
+    """Consultas con alguna regresión."""
+    lines: List[str] = ["\n# Regresiones por Consulta\n"]
+
+    regressed = [c for c in comparisons if c["regressions"]]
+    if not regressed:
+        lines.append("Ninguna consulta empeoró más allá de los umbrales.\n")
+        return "\n".join(lines)
+
+    headers = [
+        "Origen", "Destino", "Algoritmo", "Tiempo base (ms)", "Tiempo nuevo (ms)",
+        "Δ tiempo", "Δ nodos", "Δ energía (kWh)", "Empeoró",
+    ]
+    lines.append("| " + " | ".join(headers) + " |")
+    lines.append("| " + " | ".join("---" for _ in headers) + " |")
+
+    for c in regressed:
+        row = [
+            c["origen"],
+            c["destino"],
+            c["algoritmo"],
+            format_float(c["time_base"] * 1e3 if c["time_base"] else None, 2),
+            format_float(c["time_new"] * 1e3 if c["time_new"] else None, 2),
+            format_percent(c["time_delta"]),
+            format_percent(c["nodes_delta"]),
+            format_float(c["energy_delta"], 4),
+            ", ".join(c["regressions"]),
+        ]
+        lines.append("| " + " | ".join(row) + " |")
+
+    return "\n".join(lines)
+
+
+def make_summary_table(comparisons: List[Dict[str, Any]]) -> str:
+    """Cantidad de consultas comparadas y regresiones por algoritmo."""
+    lines: List[str] = ["\n# Resumen por Algoritmo\n"]
+
+    headers = [
+        "Algoritmo", "Consultas", "Regresiones", "Tiempo", "Nodos", "Energía", "Destino",
+    ]
+    lines.append("| " + " | ".join(headers) + " |")
+    lines.append("| " + " | ".join("---" for _ in headers) + " |")
+
+    by_alg: Dict[str, List[Dict[str, Any]]] = {}
+    for c in comparisons:
+        by_alg.setdefault(c["algoritmo"], []).append(c)
+
+    for alg, runs in sorted(by_alg.items()):
+        def count(metric: str) -> str:
+            return str(sum(1 for c in runs if metric in c["regressions"]))
+
+        row = [
+            alg,
+            str(len(runs)),
+            str(sum(1 for c in runs if c["regressions"])),
+            count("tiempo"),
+            count("nodos"),
+            count("energia"),
+            count("destino"),
+        ]
+        lines.append("| " + " | ".join(row) + " |")
+
+    return "\n".join(lines)
+
+
+def format_percent(x: Optional[float]) -> str:
+    if x is None:
+        return "-"
+    return f"{x:+.1%}"
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Compara dos corridas del benchmark y falla si hay regresiones."
+    )
+    parser.add_argument("base", help="Directorio (o resultados.json) de la corrida base")
+    parser.add_argument("nueva", help="Directorio (o resultados.json) de la corrida nueva")
+    parser.add_argument(
+        "--time-threshold",
+        type=float,
+        default=TIME_THRESHOLD,
+        help="Aumento relativo de tiempo tolerado por consulta (por defecto: 0.10)",
+    )
+    parser.add_argument(
+        "--min-time-ms",
+        type=float,
+        default=MIN_TIME_MS,
+        help="Aumento absoluto mínimo de tiempo para contar como regresión (ms)",
+    )
+    parser.add_argument(
+        "--nodes-threshold",
+        type=float,
+        default=NODES_THRESHOLD,
+        help="Aumento relativo de nodos expandidos tolerado (por defecto: 0)",
+    )
+    parser.add_argument(
+        "--energy-tolerance",
+        type=float,
+        default=ENERGY_TOLERANCE,
+        help="Aumento de energía tolerado por consulta (kWh)",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    """
+    Compara las corridas, guarda comparacion.md junto a la corrida nueva y
+    devuelve el código de salida (1 si hay regresiones).
+    """
+    args = parse_args(argv)
+
+    base_rows = load_rows(find_resultados(args.base))
+    new_path = find_resultados(args.nueva)
+    new_rows = load_rows(new_path)
+
+    comparisons = compare_runs(
+        base_rows,
+        new_rows,
+        time_threshold=args.time_threshold,
+        min_time_ms=args.min_time_ms,
+        nodes_threshold=args.nodes_threshold,
+        energy_tolerance=args.energy_tolerance,
+    )
+
+    tables = [
+        f"# Comparación de corridas\n\nBase: {args.base}\n\nNueva: {args.nueva}\n\n"
+        f"Consultas en común: {len(comparisons)}",
+        make_summary_table(comparisons),
+        make_regressions_table(comparisons),
+        make_table_19_baseline_comparison(compare_time_by_algorithm(base_rows, new_rows)),
+    ]
+    md_path = os.path.join(os.path.dirname(os.path.abspath(new_path)), "comparacion.md")
+    save_markdown(md_path, "\n\n".join(tables))
+
+    regressed = [c for c in comparisons if c["regressions"]]
+    print(f"Consultas comparadas: {len(comparisons)}")
+    print(f"Consultas con regresiones: {len(regressed)}")
+    print(f"Detalle guardado en: {md_path}")
+
+    if not comparisons:
+        print("Las corridas no tienen consultas en común.")
+        return 1
+    return 1 if regressed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,10 @@
 """Carga de cargadores eléctricos reales de Uruguay desde JSON."""
 
 import json
-import osmnx as ox
 from pathlib import Path
 
+from graph.spatial_index import get_spatial_index
+
 
 def load_chargers_from_json(json_path="cargadores.json"):
     """
@@ -31,7 +32,7 @@ def get_charger_nodes(G, json_path="cargadores.json", max_chargers=None, verbose
     Obtiene los nodos del grafo más cercanos a los cargadores reales.
     
     Args:
-        G: Grafo de NetworkX
+        G: Grafo de NetworkX (o CompiledGraph)
         json_path: Ruta al archivo JSON con los cargadores
         max_chargers: Número máximo de cargadores a usar (None = todos)
         verbose: Si True, imprime información de progreso
@@ -52,30 +53,34 @@ def get_charger_nodes(G, json_path="cargadores.json", max_chargers=None, verbose
     if verbose:
         print(f"Encontrando nodos para {len(chargers)} cargadores reales...")
     
+    # Descartar cargadores sin coordenadas válidas
+    valid_chargers = []
     for charger in chargers:
         try:
-            lat = charger['lat']
-            lng = charger['lng']
-            
-            # Encontrar el nodo más cercano
-            node_id = ox.nearest_nodes(G, lng, lat)
-            
-            # Evitar duplicados (si dos cargadores mapean al mismo nodo)
-            if node_id not in charger_nodes:
-                charger_nodes.append(node_id)
-                charger_info[node_id] = {
-                    'name': charger.get('name', 'Sin nombre'),
-                    'address': charger.get('address', 'Sin dirección'),
-                    'city': charger.get('city', 'Desconocida'),
-                    'department': charger.get('department', 'Desconocido'),
-                    'status': charger.get('status', 'Desconocido'),
-                    'lat': lat,
-                    'lng': lng,
-                    'connectors': charger.get('connectorStatusAcc', [])
-                }
-        except Exception:
-            # Silenciosamente continuar si hay error con un cargador
+            valid_chargers.append((charger, float(charger['lat']), float(charger['lng'])))
+        except (KeyError, TypeError, ValueError):
+            continue
+    
+    # Ubicar todos los cargadores con una sola consulta al índice espacial
+    node_ids = get_spatial_index(G).snap((lat, lng) for _, lat, lng in valid_chargers)
+    
+    seen = set()
+    for (charger, lat, lng), node_id in zip(valid_chargers, node_ids):
+        # Evitar duplicados (si dos cargadores mapean al mismo nodo)
+        if node_id in seen:
             continue
+        seen.add(node_id)
+        charger_nodes.append(node_id)
+        charger_info[node_id] = {
+            'name': charger.get('name', 'Sin nombre'),
+            'address': charger.get('address', 'Sin dirección'),
+            'city': charger.get('city', 'Desconocida'),
+            'department': charger.get('department', 'Desconocido'),
+            'status': charger.get('status', 'Desconocido'),
+            'lat': charger['lat'],
+            'lng': charger['lng'],
+            'connectors': charger.get('connectorStatusAcc', [])
+        }
     
     if verbose:
         print(f"✅ Se encontraron {len(charger_nodes)} cargadores en el grafo")
@@ -0,0 +1,313 @@
+"""
+Representación compilada (CSR) del grafo para los algoritmos de búsqueda.
+
+Los núcleos de A* y Greedy recorren el grafo millones de veces por consulta.
+Sobre un MultiDiGraph de NetworkX cada expansión implica varios accesos a
+diccionarios anidados (G.neighbors, G.get_edge_data, G.nodes[n]["x"]).
+CompiledGraph guarda la misma información en arreglos contiguos de NumPy y se
+construye una sola vez a partir de la salida de load_graph.
+
+Las aristas paralelas del MultiDiGraph (misma calle en dos tramos de OSM,
+por ejemplo) se colapsan al compilar: para cada par (u, v) queda la de
+menor energy_cost, y edge_key guarda cuál era para poder dibujarla.
+"""
+
+import hashlib
+import weakref
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+# Una compilación por grafo, liberada automáticamente cuando el grafo se destruye
+_COMPILED_CACHE: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+class CompiledGraph:
+    """
+    Grafo dirigido en formato CSR (Compressed Sparse Row).
+
+    Los nodos se identifican internamente por un índice 0..n-1. Los vecinos del
+    nodo i son targets[offsets[i]:offsets[i + 1]], en el mismo orden que
+    devuelve G.neighbors() sobre el grafo original.
+
+    Atributos:
+        node_ids: ID original (OSM) de cada índice
+        node_index: Diccionario {ID original: índice}
+        x, y: Coordenadas (longitud, latitud) de cada nodo
+        offsets: Inicio de la lista de adyacencia de cada nodo (largo n + 1)
+        targets: Índice del nodo destino de cada arista
+        energy_cost: Costo energético de cada arista (kWh, NaN si falta)
+        length: Largo de cada arista (metros, NaN si falta)
+        weight: Peso (tiempo) de cada arista (NaN si falta)
+        edge_key: Key de la arista elegida en el MultiDiGraph original
+    """
+
+    def __init__(
+        self,
+        node_ids: np.ndarray,
+        x: np.ndarray,
+        y: np.ndarray,
+        offsets: np.ndarray,
+        targets: np.ndarray,
+        energy_cost: np.ndarray,
+        length: np.ndarray,
+        weight: np.ndarray,
+        edge_key: Optional[np.ndarray] = None,
+    ):
+        self.node_ids = node_ids
+        self.x = x
+        self.y = y
+        self.offsets = offsets
+        self.targets = targets
+        self.energy_cost = energy_cost
+        self.length = length
+        self.weight = weight
+        self.edge_key = (
+            edge_key if edge_key is not None else np.zeros(len(targets), dtype=np.int64)
+        )
+
+        self.node_index: Dict[int, int] = {
+            node: i for i, node in enumerate(node_ids.tolist())
+        }
+
+        # Vistas en listas de Python para los bucles de búsqueda (se crean a demanda)
+        self._adjacency = None
+        self._reverse_adjacency = None
+        self._coords = None
+        self._csr: Dict[bool, csr_matrix] = {}
+        self._fingerprint = None
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.node_ids)
+
+    @property
+    def num_edges(self) -> int:
+        return len(self.targets)
+
+    def __len__(self) -> int:
+        return self.num_nodes
+
+    def __contains__(self, node) -> bool:
+        return node in self.node_index
+
+    def index_of(self, node: int) -> int:
+        """Devuelve el índice interno de un nodo original."""
+        return self.node_index[node]
+
+    def node_id(self, index: int) -> int:
+        """Devuelve el ID original de un índice interno."""
+        return self.node_ids_list[index]
+
+    @property
+    def node_ids_list(self) -> List[int]:
+        self._build_python_views()
+        return self._node_ids_list
+
+    def adjacency(self) -> List[Tuple[Tuple[int, float], ...]]:
+        """
+        Lista de adyacencia como tuplas de Python: adj[i] = ((j, energy_cost), ...).
+
+        Iterar tuplas de floats nativos es bastante más rápido que indexar
+        arreglos de NumPy elemento a elemento dentro de un bucle de Python.
+        """
+        self._build_python_views()
+        return self._adjacency
+
+    def reverse_adjacency(self) -> List[Tuple[Tuple[int, float], ...]]:
+        """
+        Lista de adyacencia invertida: radj[j] = ((i, energy_cost), ...) por
+        cada arista i -> j, para búsquedas hacia atrás desde un destino.
+        """
+        if self._reverse_adjacency is None:
+            reverse: List[List[Tuple[int, float]]] = [[] for _ in range(self.num_nodes)]
+            for i, edges in enumerate(self.adjacency()):
+                for j, energy_cost in edges:
+                    reverse[j].append((i, energy_cost))
+            self._reverse_adjacency = [tuple(edges) for edges in reverse]
+        return self._reverse_adjacency
+
+    def coords(self) -> Tuple[List[float], List[float]]:
+        """Coordenadas (xs, ys) como listas de floats nativos, indexadas por índice."""
+        self._build_python_views()
+        return self._coords
+
+    def _build_python_views(self) -> None:
+        if self._adjacency is not None:
+            return
+
+        offsets = self.offsets.tolist()
+        targets = self.targets.tolist()
+        energy = self.energy_cost.tolist()
+
+        self._adjacency = [
+            tuple(zip(targets[offsets[i]:offsets[i + 1]], energy[offsets[i]:offsets[i + 1]]))
+            for i in range(self.num_nodes)
+        ]
+        self._coords = (self.x.tolist(), self.y.tolist())
+        self._node_ids_list = self.node_ids.tolist()
+
+    def to_csr(self, reverse: bool = False) -> csr_matrix:
+        """
+        Matriz dispersa (n x n) de SciPy con energy_cost como peso, para usar
+        con scipy.sparse.csgraph (Dijkstra en C).
+
+        Las aristas sin energy_cost (NaN) se omiten. Las aristas de costo 0 se
+        conservan como ceros explícitos, que csgraph trata como aristas.
+
+        Args:
+            reverse: Si True, devuelve el grafo traspuesto (aristas invertidas),
+                útil para búsquedas hacia atrás desde un destino
+        """
+        if reverse not in self._csr:
+            n = self.num_nodes
+            rows = np.repeat(np.arange(n), np.diff(self.offsets))
+            keep = ~np.isnan(self.energy_cost)
+            indptr = np.zeros(n + 1, dtype=np.int64)
+            np.cumsum(np.bincount(rows[keep], minlength=n), out=indptr[1:])
+            forward = csr_matrix(
+                (self.energy_cost[keep], self.targets[keep], indptr), shape=(n, n)
+            )
+            self._csr[False] = forward
+            self._csr[True] = forward.transpose().tocsr()
+        return self._csr[reverse]
+
+    def fingerprint(self) -> str:
+        """
+        Huella del contenido del grafo (nodos, aristas y energy_cost).
+
+        Sirve para asociar datos precalculados (tablas, índices) a una versión
+        concreta del grafo y detectar cuando quedaron desactualizados.
+        """
+        if self._fingerprint is None:
+            h = hashlib.sha1()
+            for arr in (self.node_ids, self.offsets, self.targets, self.energy_cost):
+                h.update(np.ascontiguousarray(arr).tobytes())
+            self._fingerprint = h.hexdigest()[:16]
+        return self._fingerprint
+
+    def neighbors(self, node: int) -> Iterable[int]:
+        """Vecinos de un nodo original (IDs originales), como G.neighbors()."""
+        i = self.node_index[node]
+        ids = self.node_ids_list
+        return [ids[j] for j in self.targets[self.offsets[i]:self.offsets[i + 1]].tolist()]
+
+    def multigraph_key(self, u: int, v: int) -> int:
+        """
+        Key de la arista u -> v (IDs originales) que usan las búsquedas, para
+        marcar el camino sobre el MultiDiGraph: G.edges[u, v, key].
+        """
+        i = self.node_index[u]
+        j = self.node_index[v]
+        start, end = int(self.offsets[i]), int(self.offsets[i + 1])
+        for pos in range(start, end):
+            if self.targets[pos] == j:
+                return int(self.edge_key[pos])
+        raise KeyError((u, v))
+
+
+def compile_graph(G) -> CompiledGraph:
+    """
+    Compila un grafo de NetworkX (salida de load_graph) a formato CSR.
+
+    Para cada par (u, v) se toma la arista paralela de menor energy_cost
+    (min_energy_edge), la misma que eligen astar_battery y greedy_battery
+    sobre NetworkX.
+
+    Args:
+        G: Grafo de NetworkX con atributos 'x'/'y' en nodos y
+           'energy_cost'/'length'/'weight' en aristas
+
+    Returns:
+        CompiledGraph equivalente
+    """
+    nodes = list(G.nodes)
+    index = {node: i for i, node in enumerate(nodes)}
+
+    offsets = np.zeros(len(nodes) + 1, dtype=np.int64)
+    targets: List[int] = []
+    energy: List[float] = []
+    length: List[float] = []
+    weight: List[float] = []
+    keys: List[int] = []
+
+    nan = float("nan")
+    for i, u in enumerate(nodes):
+        for v, keydict in G.adj[u].items():
+            key, data = min_energy_edge(keydict)
+            targets.append(index[v])
+            keys.append(key)
+            energy.append(data.get("energy_cost", nan))
+            length.append(data.get("length", nan))
+            weight.append(data.get("weight", nan))
+        offsets[i + 1] = len(targets)
+
+    return CompiledGraph(
+        node_ids=np.array(nodes, dtype=np.int64),
+        x=np.array([G.nodes[n]["x"] for n in nodes], dtype=np.float64),
+        y=np.array([G.nodes[n]["y"] for n in nodes], dtype=np.float64),
+        offsets=offsets,
+        targets=np.array(targets, dtype=np.int64),
+        energy_cost=np.array(energy, dtype=np.float64),
+        length=np.array(length, dtype=np.float64),
+        weight=np.array(weight, dtype=np.float64),
+        edge_key=np.array(keys, dtype=np.int64),
+    )
+
+
+def min_energy_edge(keydict: Dict[Any, Dict]) -> Tuple[Any, Dict]:
+    """
+    Arista de menor energy_cost entre las paralelas de un par (u, v).
+
+    Args:
+        keydict: Aristas u -> v del MultiDiGraph, {key: atributos} (G.adj[u][v])
+
+    Returns:
+        Tupla (key, atributos). Con empate gana la primera; si ninguna tiene
+        energy_cost se toma la key 0 (o la primera) y la búsqueda usa el
+        fallback euclidiano.
+    """
+    best_key = None
+    best_cost = None
+    for key, data in keydict.items():
+        cost = data.get("energy_cost")
+        # cost == cost descarta NaN
+        if cost is not None and cost == cost and (best_cost is None or cost < best_cost):
+            best_key, best_cost = key, cost
+
+    if best_key is None:
+        best_key = 0 if 0 in keydict else next(iter(keydict))
+    return best_key, keydict[best_key]
+
+
+def get_compiled_graph(G) -> CompiledGraph:
+    """
+    Devuelve el CompiledGraph de G, compilándolo la primera vez.
+
+    Permite que los algoritmos acepten un grafo de NetworkX y trabajen sobre
+    arreglos sin pagar la compilación en cada consulta. Si G ya es un
+    CompiledGraph se devuelve tal cual; si el grafo cambió de tamaño
+    (se agregaron o quitaron nodos) se recompila.
+
+    Cambiar aristas o sus atributos sobre el mismo objeto no se detecta (no
+    se puede sin recorrer todas las aristas en cada consulta): después hay
+    que llamar a invalidate_compiled_graph(G), como hace preprocess_edges.
+    """
+    if isinstance(G, CompiledGraph):
+        return G
+
+    compiled = _COMPILED_CACHE.get(G)
+    if compiled is None or compiled.num_nodes != len(G):
+        compiled = compile_graph(G)
+        _COMPILED_CACHE[G] = compiled
+    return compiled
+
+
+def invalidate_compiled_graph(G) -> None:
+    """
+    Descarta la compilación de G: la próxima get_compiled_graph(G) lo vuelve
+    a compilar (con otra huella, así que CH, ALT y la caché de rutas tampoco
+    reutilizan datos del grafo anterior).
+    """
+    _COMPILED_CACHE.pop(G, None)
@@ -1,15 +1,102 @@
 """Configuración y carga del grafo de OpenStreetMap."""
 
+from typing import Dict, List
+
+import numpy as np
 import osmnx as ox
 
+from graph.compiled_graph import invalidate_compiled_graph
+from graph.graph_snapshot import SNAPSHOT_DIR, load_snapshot, save_snapshot, snapshot_path
+
+
+DEFAULT_MAXSPEED = 40
+
+
+def parse_maxspeed(raw):
+    """
+    Normaliza un valor crudo de "maxspeed" de OSM.
+
+    - None (atributo ausente) -> DEFAULT_MAXSPEED
+    - lista de strings/ints   -> mínimo de los valores
+    - string                  -> int
+    - otro (int, float)       -> sin cambios
+    """
+    if raw is None:
+        return DEFAULT_MAXSPEED
+    if type(raw) == list:
+        return min(int(speed) for speed in raw)
+    if type(raw) == str:
+        return int(raw)
+    return raw
 
-def load_graph(place_name="Uruguay", gamma=2.5):
+
+def preprocess_edges(G, gamma: float) -> Dict[str, np.ndarray]:
+    """
+    Calcula "maxspeed", "weight" y "energy_cost" de todas las aristas en lote.
+
+    En lugar de recorrer G.edges[edge] arista por arista (cada acceso crea
+    vistas de NetworkX), se extraen los diccionarios de atributos una sola
+    vez, se parsea cada valor distinto de maxspeed una única vez y los pesos
+    se calculan como operaciones sobre arreglos. Los resultados son
+    idénticos bit a bit a la limpieza arista por arista.
+
+    Args:
+        G: Grafo de OSMnx (se modifica in-place; su CompiledGraph en caché
+            se descarta)
+        gamma: Coeficiente de consumo de energía (kWh/km)
+
+    Returns:
+        Diccionario de arreglos alineados con G.edges(keys=True):
+        "length", "maxspeed", "weight", "energy_cost"
+    """
+    edge_data = [data for _, _, data in G.edges(data=True)]
+
+    # Parsear cada valor crudo distinto una sola vez. La clave incluye el tipo
+    # para no mezclar 40 y 40.0, y las listas se pasan a tupla para hashearlas
+    parsed_cache: Dict = {}
+    maxspeeds: List = []
+    for data in edge_data:
+        raw = data.get("maxspeed")
+        key = (type(raw), tuple(raw) if type(raw) == list else raw)
+        if key not in parsed_cache:
+            parsed_cache[key] = parse_maxspeed(raw)
+        maxspeeds.append(parsed_cache[key])
+
+    length = np.array([data["length"] for data in edge_data], dtype=np.float64)
+    maxspeed = np.array(maxspeeds, dtype=np.float64)
+
+    # weight = tiempo = distancia / velocidad
+    weight = length / maxspeed
+    # gamma en Wh/m (2.5 Wh/m = 2.5 kWh/km)
+    energy_cost = gamma * (length / 1000)
+
+    # Escribir los atributos de vuelta en una sola pasada
+    for data, speed, w, e in zip(edge_data, maxspeeds, weight.tolist(), energy_cost.tolist()):
+        data["maxspeed"] = speed
+        data["weight"] = w
+        data["energy_cost"] = e
+
+    # Los pesos cambiaron: la compilación en caché (si había) ya no sirve
+    invalidate_compiled_graph(G)
+
+    return {
+        "length": length,
+        "maxspeed": maxspeed,
+        "weight": weight,
+        "energy_cost": energy_cost,
+    }
+
+
+def load_graph(place_name="Uruguay", gamma=2.5, use_snapshot=True, snapshot_dir=SNAPSHOT_DIR):
     """
     Carga y limpia el grafo de OpenStreetMap.
 
     Args:
         place_name: Nombre del lugar a cargar (por defecto "Uruguay")
         gamma: Coeficiente de consumo de energía por kilómetro (por defecto 2.5 kWh/km)
+        use_snapshot: Si True, reutiliza el snapshot guardado en snapshot_dir
+            (y lo crea si no existe) en lugar de descargar y limpiar el grafo
+        snapshot_dir: Carpeta de snapshots (por defecto cache/snapshots)
 
     Returns:
         Grafo de NetworkX con pesos calculados
@@ -17,30 +104,24 @@ def load_graph(place_name="Uruguay", gamma=2.5):
     Nota:
         - "Uruguay" carga todo el país (puede tardar unos minutos)
         - "Ciudad Vieja, Montevideo, Uruguay" carga solo un barrio (más rápido para testing)
+        - Con un snapshot existente la carga no requiere conexión a internet
     """
+    path = snapshot_path(place_name, gamma, snapshot_dir)
+    if use_snapshot:
+        G = load_snapshot(path, place_name, gamma)
+        if G is not None:
+            return G
+
     G = ox.graph_from_place(place_name, network_type="drive")
 
     # Limpiar y calcular pesos
-    for edge in G.edges:
-        # Limpiar el atributo "maxspeed"
-        maxspeed = 40
-
-        if "maxspeed" in G.edges[edge]:
-            maxspeed = G.edges[edge]["maxspeed"]
-
-            if type(maxspeed) == list:
-                speeds = [int(speed) for speed in maxspeed]
-                maxspeed = min(speeds)
-
-            elif type(maxspeed) == str:
-                maxspeed = int(maxspeed)
-
-        G.edges[edge]["maxspeed"] = maxspeed
-        # Agregar el atributo "weight" (tiempo = distancia / velocidad)
-        G.edges[edge]["weight"] = G.edges[edge]["length"] / maxspeed
+    preprocess_edges(G, gamma)
 
-        # gamma en Wh/m (2.5 Wh/m = 2.5 kWh/km)
-        distance_km = G.edges[edge]["length"] / 1000  # convertir metros a km
-        G.edges[edge]["energy_cost"] = gamma * distance_km  # kWh
+    if use_snapshot:
+        try:
+            save_snapshot(G, path, place_name, gamma)
+        except (OSError, TypeError, ValueError):
+            # El snapshot es solo una optimización: si no se puede guardar, seguir
+            pass
 
     return G
@@ -0,0 +1,268 @@
+"""
+Snapshot binario del grafo limpio para evitar descargar y procesar OSM en cada arranque.
+
+El snapshot es un archivo .npz con:
+- un encabezado JSON (versión, place_name, gamma y atributos del grafo)
+- arreglos contiguos con coordenadas de nodos y largo/peso/energía de aristas
+- la geometría de las aristas como coordenadas aplanadas + offsets
+- el resto de los atributos de nodos/aristas serializados en JSON (las
+  tuplas se marcan como {"__tuple__": [...]} para que vuelvan como tuplas)
+
+Cargar un snapshot reconstruye exactamente el mismo MultiDiGraph que
+load_graph construiría desde cero, sin acceso a la red.
+"""
+
+import gc
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import networkx as nx
+import numpy as np
+import shapely
+
+SNAPSHOT_VERSION = 1
+
+SNAPSHOT_DIR = os.path.join("cache", "snapshots")
+
+# Atributos que se guardan como arreglos (el resto va en el JSON de extras)
+_NODE_ARRAY_ATTRS = ("x", "y")
+_EDGE_ARRAY_ATTRS = ("length", "weight", "energy_cost")
+
+
+def snapshot_path(place_name: str, gamma: float, snapshot_dir: str = SNAPSHOT_DIR) -> Path:
+    """
+    Ruta del snapshot para un lugar y un gamma dados.
+
+    Args:
+        place_name: Nombre del lugar (el mismo que recibe load_graph)
+        gamma: Coeficiente de consumo usado para calcular energy_cost
+        snapshot_dir: Carpeta donde se guardan los snapshots
+
+    Returns:
+        Ruta al archivo .npz
+    """
+    key = hashlib.sha1(f"{place_name}|{gamma!r}".encode("utf-8")).hexdigest()[:16]
+    return Path(snapshot_dir) / f"graph_{key}.npz"
+
+
+def _tag_tuples(obj: Any) -> Any:
+    """Copia de obj con las tuplas marcadas (JSON las convertiría en listas)."""
+    if isinstance(obj, tuple):
+        return {"__tuple__": [_tag_tuples(x) for x in obj]}
+    if isinstance(obj, list):
+        return [_tag_tuples(x) for x in obj]
+    if isinstance(obj, dict):
+        return {k: _tag_tuples(v) for k, v in obj.items()}
+    return obj
+
+
+def _untag_tuples(obj: Dict[str, Any]) -> Any:
+    if len(obj) == 1 and "__tuple__" in obj:
+        return tuple(obj["__tuple__"])
+    return obj
+
+
+def _json_array(obj: Any) -> np.ndarray:
+    return np.frombuffer(
+        json.dumps(_tag_tuples(obj), ensure_ascii=False).encode("utf-8"), dtype=np.uint8
+    )
+
+
+def _load_json_array(arr: np.ndarray) -> Any:
+    return json.loads(arr.tobytes().decode("utf-8"), object_hook=_untag_tuples)
+
+
+def save_snapshot(G, path: Path, place_name: str, gamma: float) -> None:
+    """
+    Guarda el grafo limpio en un snapshot .npz.
+
+    Args:
+        G: Grafo devuelto por load_graph
+        path: Ruta destino (ver snapshot_path)
+        place_name: Nombre del lugar (se guarda en el encabezado)
+        gamma: Coeficiente de consumo (se guarda en el encabezado)
+    """
+    nodes = list(G.nodes)
+    index = {node: i for i, node in enumerate(nodes)}
+
+    node_extra: List[Dict[str, Any]] = []
+    for node in nodes:
+        data = G.nodes[node]
+        node_extra.append({k: v for k, v in data.items() if k not in _NODE_ARRAY_ATTRS})
+
+    edges = list(G.edges(keys=True, data=True))
+
+    edge_extra: List[Dict[str, Any]] = []
+    geom_offsets = np.zeros(len(edges) + 1, dtype=np.int64)
+    geom_parts: List[np.ndarray] = []
+    for i, (_, _, _, data) in enumerate(edges):
+        edge_extra.append(
+            {
+                k: v
+                for k, v in data.items()
+                if k not in _EDGE_ARRAY_ATTRS and k != "geometry"
+            }
+        )
+        geometry = data.get("geometry")
+        n_coords = 0
+        if geometry is not None:
+            coords = shapely.get_coordinates(geometry)
+            geom_parts.append(coords)
+            n_coords = len(coords)
+        geom_offsets[i + 1] = geom_offsets[i] + n_coords
+
+    has_geometry = np.array(["geometry" in data for _, _, _, data in edges], dtype=bool)
+    geom_coords = (
+        np.concatenate(geom_parts) if geom_parts else np.empty((0, 2), dtype=np.float64)
+    )
+
+    header = {
+        "version": SNAPSHOT_VERSION,
+        "place_name": place_name,
+        "gamma": gamma,
+        "graph_attrs": dict(G.graph),
+        "num_nodes": len(nodes),
+        "num_edges": len(edges),
+    }
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+
+    # Escritura atómica: si el proceso se corta no queda un snapshot a medias
+    with open(tmp_path, "wb") as f:
+        np.savez(
+            f,
+            header=_json_array(header),
+            node_ids=np.array(nodes, dtype=np.int64),
+            node_x=np.array([G.nodes[n]["x"] for n in nodes], dtype=np.float64),
+            node_y=np.array([G.nodes[n]["y"] for n in nodes], dtype=np.float64),
+            node_extra=_json_array(node_extra),
+            edge_u=np.array([index[u] for u, _, _, _ in edges], dtype=np.int64),
+            edge_v=np.array([index[v] for _, v, _, _ in edges], dtype=np.int64),
+            edge_key=np.array([k for _, _, k, _ in edges], dtype=np.int64),
+            edge_length=np.array([d["length"] for _, _, _, d in edges], dtype=np.float64),
+            edge_weight=np.array([d["weight"] for _, _, _, d in edges], dtype=np.float64),
+            edge_energy_cost=np.array(
+                [d["energy_cost"] for _, _, _, d in edges], dtype=np.float64
+            ),
+            edge_extra=_json_array(edge_extra),
+            edge_has_geometry=has_geometry,
+            geom_offsets=geom_offsets,
+            geom_coords=geom_coords,
+        )
+    os.replace(tmp_path, path)
+
+
+def read_snapshot_header(path: Path) -> Optional[Dict[str, Any]]:
+    """Lee solo el encabezado de un snapshot (None si no existe o está corrupto)."""
+    try:
+        with np.load(path) as data:
+            return _load_json_array(data["header"])
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def load_snapshot(path: Path, place_name: str, gamma: float):
+    """
+    Reconstruye el grafo desde un snapshot.
+
+    Args:
+        path: Ruta al snapshot
+        place_name: Lugar esperado (debe coincidir con el encabezado)
+        gamma: Gamma esperado (debe coincidir con el encabezado)
+
+    Returns:
+        MultiDiGraph idéntico al que devolvería load_graph, o None si el
+        snapshot no existe, es de otra versión o no corresponde a la clave.
+    """
+    path = Path(path)
+    if not path.exists():
+        return None
+
+    # Se crean cientos de miles de dicts sin ciclos: el GC cíclico solo agrega
+    # pausas (casi duplica el tiempo de carga), así que se suspende mientras tanto
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return _load_snapshot(path, place_name, gamma)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+
+def _load_snapshot(path: Path, place_name: str, gamma: float):
+    try:
+        with np.load(path) as data:
+            header = _load_json_array(data["header"])
+            if (
+                header.get("version") != SNAPSHOT_VERSION
+                or header.get("place_name") != place_name
+                or header.get("gamma") != gamma
+            ):
+                return None
+            arrays = {name: data[name] for name in data.files}
+    except (OSError, KeyError, ValueError):
+        return None
+
+    node_ids = arrays["node_ids"].tolist()
+    node_x = arrays["node_x"].tolist()
+    node_y = arrays["node_y"].tolist()
+    node_extra = _load_json_array(arrays["node_extra"])
+
+    for attrs, x, y in zip(node_extra, node_x, node_y):
+        attrs["x"] = x
+        attrs["y"] = y
+
+    edge_u = arrays["edge_u"].tolist()
+    edge_v = arrays["edge_v"].tolist()
+    edge_key = arrays["edge_key"].tolist()
+    edge_extra = _load_json_array(arrays["edge_extra"])
+
+    # Reconstruir todas las geometrías en una sola llamada vectorizada
+    has_geometry = arrays["edge_has_geometry"]
+    geom_offsets = arrays["geom_offsets"]
+    counts = np.diff(geom_offsets)[has_geometry]
+    has_geometry = has_geometry.tolist()
+    geometries = shapely.linestrings(
+        arrays["geom_coords"], indices=np.repeat(np.arange(len(counts)), counts)
+    ) if len(counts) else []
+    geometry_iter = iter(geometries)
+
+    for i, (attrs, length, weight, energy) in enumerate(
+        zip(
+            edge_extra,
+            arrays["edge_length"].tolist(),
+            arrays["edge_weight"].tolist(),
+            arrays["edge_energy_cost"].tolist(),
+        )
+    ):
+        attrs["length"] = length
+        attrs["weight"] = weight
+        attrs["energy_cost"] = energy
+        if has_geometry[i]:
+            attrs["geometry"] = next(geometry_iter)
+
+    return _build_multidigraph(
+        header["graph_attrs"], node_ids, node_extra, edge_u, edge_v, edge_key, edge_extra
+    )
+
+
+def _build_multidigraph(graph_attrs, node_ids, node_attrs, edge_u, edge_v, edge_key, edge_attrs):
+    """
+    Arma el MultiDiGraph con add_nodes_from / add_edges_from.
+
+    Las aristas vienen en el orden original de G.edges, así que el orden de
+    los vecinos (que determina el orden de expansión de las búsquedas) es
+    el mismo que en el grafo guardado.
+    """
+    G = nx.MultiDiGraph(**graph_attrs)
+    G.add_nodes_from(zip(node_ids, node_attrs))
+    G.add_edges_from(
+        (node_ids[u], node_ids[v], key, attrs)
+        for u, v, key, attrs in zip(edge_u, edge_v, edge_key, edge_attrs)
+    )
+    return G
@@ -1,7 +1,8 @@
 """Coordenadas de barrios de Montevideo."""
 
-import osmnx as ox
-from typing import Tuple
+from typing import Dict, List, Optional, Tuple
+
+from graph.spatial_index import get_spatial_index
 
 
 # Coordenadas (latitud, longitud) de barrios de Montevideo
@@ -79,8 +80,30 @@ def get_nearest_node(G, barrio_name: str) -> int:
                       f"Barrios disponibles: {list(MONTEVIDEO_BARRIOS.keys())}")
     
     lat, lon = MONTEVIDEO_BARRIOS[barrio_name]
-    node_id = ox.nearest_nodes(G, lon, lat)
-    return node_id
+    return get_spatial_index(G).snap_one(lat, lon)
+
+
+def get_nearest_nodes(G, barrio_names: Optional[List[str]] = None) -> Dict[str, int]:
+    """
+    Encuentra el nodo mas cercano a varios barrios con una sola consulta.
+    
+    Args:
+        G: Grafo de NetworkX
+        barrio_names: Barrios a ubicar (None = todos los de MONTEVIDEO_BARRIOS)
+        
+    Returns:
+        Diccionario {barrio: ID del nodo mas cercano}
+    """
+    if barrio_names is None:
+        barrio_names = list(MONTEVIDEO_BARRIOS.keys())
+    
+    for name in barrio_names:
+        if name not in MONTEVIDEO_BARRIOS:
+            raise KeyError(f"Barrio '{name}' no encontrado. "
+                          f"Barrios disponibles: {list(MONTEVIDEO_BARRIOS.keys())}")
+    
+    node_ids = get_spatial_index(G).snap(MONTEVIDEO_BARRIOS[name] for name in barrio_names)
+    return dict(zip(barrio_names, node_ids))
 
 
 def list_barrios() -> list:
@@ -0,0 +1,111 @@
+"""
+Índice espacial para ubicar el nodo del grafo más cercano a coordenadas (lat, lon).
+
+ox.nearest_nodes reconstruye su estructura de búsqueda en cada llamada. Este
+índice (un KD-tree de SciPy) se construye una sola vez por grafo y responde
+consultas en lote con una única llamada vectorizada.
+
+Las coordenadas se proyectan a la esfera unitaria (x, y, z): la distancia
+euclidiana entre esos puntos (cuerda) crece monótonamente con la distancia de
+gran círculo, así que el vecino más cercano es el mismo que con haversine
+(lo que usa OSMnx para grafos sin proyectar).
+"""
+
+import weakref
+from typing import Iterable, List, Tuple, Union
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+from graph.compiled_graph import CompiledGraph
+
+EARTH_RADIUS_M = 6_371_009
+
+# Un índice por grafo, liberado automáticamente cuando el grafo se destruye
+_INDEX_CACHE: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def _to_unit_sphere(lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    lat_r = np.radians(lats)
+    lon_r = np.radians(lons)
+    cos_lat = np.cos(lat_r)
+    return np.column_stack((cos_lat * np.cos(lon_r), cos_lat * np.sin(lon_r), np.sin(lat_r)))
+
+
+class SpatialIndex:
+    """
+    KD-tree sobre los nodos de un grafo.
+
+    Atributos:
+        node_ids: ID original de cada punto del árbol
+    """
+
+    def __init__(self, node_ids: np.ndarray, lons: np.ndarray, lats: np.ndarray):
+        self.node_ids = np.asarray(node_ids)
+        self._tree = cKDTree(_to_unit_sphere(np.asarray(lats), np.asarray(lons)))
+
+    def __len__(self) -> int:
+        return len(self.node_ids)
+
+    @classmethod
+    def from_graph(cls, G) -> "SpatialIndex":
+        """
+        Construye el índice a partir de un grafo de NetworkX o un CompiledGraph.
+        """
+        if isinstance(G, CompiledGraph):
+            return cls(G.node_ids, G.x, G.y)
+
+        nodes = list(G.nodes)
+        return cls(
+            np.array(nodes),
+            np.array([G.nodes[n]["x"] for n in nodes], dtype=np.float64),
+            np.array([G.nodes[n]["y"] for n in nodes], dtype=np.float64),
+        )
+
+    def snap(
+        self,
+        points: Iterable[Tuple[float, float]],
+        return_dist: bool = False,
+    ) -> Union[List[int], Tuple[List[int], List[float]]]:
+        """
+        Encuentra el nodo más cercano a cada punto, en una sola consulta.
+
+        Args:
+            points: Secuencia de pares (latitud, longitud), el mismo orden que
+                usan MONTEVIDEO_BARRIOS y cargadores.json
+            return_dist: Si True, devuelve también la distancia en metros
+
+        Returns:
+            Lista de IDs de nodos (y lista de distancias si return_dist=True)
+        """
+        coords = np.asarray(list(points), dtype=np.float64).reshape(-1, 2)
+        if len(coords) == 0:
+            return ([], []) if return_dist else []
+
+        chord, idx = self._tree.query(_to_unit_sphere(coords[:, 0], coords[:, 1]))
+        node_ids = self.node_ids[idx].tolist()
+
+        if not return_dist:
+            return node_ids
+
+        # Cuerda en la esfera unitaria -> distancia de gran círculo en metros
+        dist = 2 * EARTH_RADIUS_M * np.arcsin(np.minimum(chord / 2, 1.0))
+        return node_ids, dist.tolist()
+
+    def snap_one(self, lat: float, lon: float) -> int:
+        """Nodo más cercano a un único punto (latitud, longitud)."""
+        return self.snap([(lat, lon)])[0]
+
+
+def get_spatial_index(G) -> SpatialIndex:
+    """
+    Devuelve el índice espacial del grafo, construyéndolo la primera vez.
+
+    El índice queda asociado al objeto grafo; si el grafo cambia de tamaño
+    (se agregaron o quitaron nodos) se reconstruye.
+    """
+    index = _INDEX_CACHE.get(G)
+    if index is None or len(index) != len(G):
+        index = SpatialIndex.from_graph(G)
+        _INDEX_CACHE[G] = index
+    return index
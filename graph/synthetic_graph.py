@@ -0,0 +1,298 @@
+"""
+Grafos viales sintéticos para benchmarks sin conexión.
+
+Todos los benchmarks dependen de ox.graph_from_place (red o cache/). Este
+módulo genera redes con forma de calle, de tamaño arbitrario (de mil a
+millones de nodos) y con los mismos atributos que devuelve load_graph:
+
+- "grid": cuadrícula con los nodos desplazados al azar y algunas cuadras
+  eliminadas, como un damero urbano
+- "delaunay": triangulación de Delaunay de puntos al azar sin las aristas
+  más largas; plana e irregular, como un trazado no planificado
+
+Las coordenadas están en grados alrededor de CENTER (Montevideo por defecto).
+El largo de cada arista es la distancia de gran círculo entre sus extremos
+multiplicada por un factor de sinuosidad >= 1, así que nunca es menor que la
+distancia en línea recta y las heurísticas en km siguen siendo admisibles.
+Todas las calles son de doble mano.
+
+SyntheticGraph guarda solo arreglos de NumPy: to_compiled() arma el
+CompiledGraph sin pasar por NetworkX (necesario para millones de nodos) y
+to_networkx() el MultiDiGraph equivalente a la salida de load_graph, para
+tamaños chicos.
+"""
+
+import math
+from typing import List, Optional, Tuple
+
+import networkx as nx
+import numpy as np
+from scipy.spatial import Delaunay
+
+from graph.compiled_graph import CompiledGraph
+from graph.spatial_index import EARTH_RADIUS_M
+
+# Centro de los grafos generados (lat, lon)
+CENTER = (-34.88, -56.17)
+
+# Separación media entre esquinas (metros), del orden de una cuadra
+BLOCK_LENGTH_M = 100.0
+
+# Velocidades máximas (km/h) y su frecuencia
+MAXSPEEDS = (30, 45, 60, 75)
+MAXSPEED_WEIGHTS = (0.35, 0.4, 0.2, 0.05)
+
+# Sinuosidad de las calles: largo / distancia en línea recta, entre 1 y 1 + esto
+MAX_DETOUR = 0.15
+
+KINDS = ("grid", "delaunay")
+
+
+class SyntheticGraph:
+    """
+    Grafo vial sintético como arreglos de aristas.
+
+    Atributos:
+        kind: "grid" o "delaunay"
+        x, y: Longitud y latitud de cada nodo (los IDs son 0..n-1)
+        u, v: Extremos de cada arista dirigida
+        length: Largo de cada arista (metros)
+        maxspeed: Velocidad máxima de cada arista (km/h)
+    """
+
+    def __init__(
+        self,
+        kind: str,
+        x: np.ndarray,
+        y: np.ndarray,
+        u: np.ndarray,
+        v: np.ndarray,
+        length: np.ndarray,
+        maxspeed: np.ndarray,
+    ):
+        self.kind = kind
+        self.x = x
+        self.y = y
+        self.u = u
+        self.v = v
+        self.length = length
+        self.maxspeed = maxspeed
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.x)
+
+    @property
+    def num_edges(self) -> int:
+        return len(self.u)
+
+    def edge_costs(self, gamma: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (weight, energy_cost) de cada arista, con las mismas fórmulas que
+        preprocess_edges (graph/graph_setup.py).
+        """
+        weight = self.length / self.maxspeed
+        energy_cost = gamma * (self.length / 1000)
+        return weight, energy_cost
+
+    def to_compiled(self, gamma: float) -> CompiledGraph:
+        """CompiledGraph del grafo, armado directamente desde los arreglos."""
+        n = self.num_nodes
+        order = np.argsort(self.u, kind="stable")
+        offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.u, minlength=n), out=offsets[1:])
+
+        weight, energy_cost = self.edge_costs(gamma)
+        return CompiledGraph(
+            node_ids=np.arange(n, dtype=np.int64),
+            x=self.x,
+            y=self.y,
+            offsets=offsets,
+            targets=self.v[order].astype(np.int64),
+            energy_cost=energy_cost[order],
+            length=self.length[order],
+            weight=weight[order],
+        )
+
+    def to_networkx(self, gamma: float):
+        """
+        MultiDiGraph con los atributos de load_graph: x/y en los nodos y
+        length, maxspeed, weight y energy_cost en las aristas.
+        """
+        G = nx.MultiDiGraph(crs="epsg:4326", name=f"synthetic_{self.kind}_{self.num_nodes}")
+        G.add_nodes_from(
+            (i, {"x": x, "y": y}) for i, (x, y) in enumerate(zip(self.x.tolist(), self.y.tolist()))
+        )
+        weight, energy_cost = self.edge_costs(gamma)
+        G.add_edges_from(
+            (u, v, {"length": length, "maxspeed": speed, "weight": w, "energy_cost": e})
+            for u, v, length, speed, w, e in zip(
+                self.u.tolist(),
+                self.v.tolist(),
+                self.length.tolist(),
+                self.maxspeed.tolist(),
+                weight.tolist(),
+                energy_cost.tolist(),
+            )
+        )
+        return G
+
+
+def generate_graph(
+    kind: str,
+    num_nodes: int,
+    seed: int = 0,
+    block_length_m: float = BLOCK_LENGTH_M,
+    center: Tuple[float, float] = CENTER,
+    **kwargs,
+) -> SyntheticGraph:
+    """
+    Genera un grafo sintético del tipo indicado.
+
+    Args:
+        kind: "grid" o "delaunay"
+        num_nodes: Cantidad aproximada de nodos (la cuadrícula redondea al
+            cuadrado más cercano)
+        seed: Semilla: el mismo (kind, num_nodes, seed) da el mismo grafo
+        block_length_m: Separación media entre nodos (metros)
+        center: (lat, lon) del centro del grafo
+        **kwargs: Parámetros propios de perturbed_grid o delaunay_graph
+    """
+    if kind == "grid":
+        return perturbed_grid(num_nodes, seed, block_length_m, center, **kwargs)
+    if kind == "delaunay":
+        return delaunay_graph(num_nodes, seed, block_length_m, center, **kwargs)
+    raise ValueError(f"Tipo de grafo desconocido: {kind} (opciones: {', '.join(KINDS)})")
+
+
+def perturbed_grid(
+    num_nodes: int,
+    seed: int = 0,
+    block_length_m: float = BLOCK_LENGTH_M,
+    center: Tuple[float, float] = CENTER,
+    jitter: float = 0.25,
+    drop_fraction: float = 0.05,
+) -> SyntheticGraph:
+    """
+    Cuadrícula de side x side esquinas (side = round(sqrt(num_nodes))).
+
+    Args:
+        jitter: Desplazamiento máximo de cada esquina, en fracciones de cuadra
+        drop_fraction: Fracción de cuadras eliminadas al azar
+    """
+    rng = np.random.default_rng(seed)
+    side = max(2, int(round(math.sqrt(num_nodes))))
+
+    rows, cols = np.divmod(np.arange(side * side, dtype=np.int64), side)
+    east = (cols + rng.uniform(-jitter, jitter, side * side)) * block_length_m
+    north = (rows + rng.uniform(-jitter, jitter, side * side)) * block_length_m
+
+    # Cuadras hacia la derecha y hacia arriba de cada esquina
+    ids = np.arange(side * side, dtype=np.int64).reshape(side, side)
+    a = np.concatenate((ids[:, :-1].ravel(), ids[:-1, :].ravel()))
+    b = np.concatenate((ids[:, 1:].ravel(), ids[1:, :].ravel()))
+
+    keep = rng.random(len(a)) >= drop_fraction
+    return _build("grid", east, north, a[keep], b[keep], rng, center)
+
+
+def delaunay_graph(
+    num_nodes: int,
+    seed: int = 0,
+    block_length_m: float = BLOCK_LENGTH_M,
+    center: Tuple[float, float] = CENTER,
+    long_edge_quantile: float = 0.95,
+) -> SyntheticGraph:
+    """
+    Triangulación de Delaunay de num_nodes puntos uniformes en un cuadrado
+    con la misma densidad que la cuadrícula.
+
+    Args:
+        long_edge_quantile: Se eliminan las aristas más largas que este
+            cuantil (las diagonales largas de la triangulación no parecen calles)
+    """
+    rng = np.random.default_rng(seed)
+    side_m = math.sqrt(num_nodes) * block_length_m
+    east = rng.uniform(0, side_m, num_nodes)
+    north = rng.uniform(0, side_m, num_nodes)
+
+    simplices = Delaunay(np.column_stack((east, north))).simplices
+    pairs = np.concatenate((simplices[:, [0, 1]], simplices[:, [1, 2]], simplices[:, [0, 2]]))
+    pairs.sort(axis=1)
+    pairs = np.unique(pairs, axis=0).astype(np.int64)
+    a, b = pairs[:, 0], pairs[:, 1]
+
+    straight = np.hypot(east[a] - east[b], north[a] - north[b])
+    keep = straight <= np.quantile(straight, long_edge_quantile)
+    return _build("delaunay", east, north, a[keep], b[keep], rng, center)
+
+
+def _build(
+    kind: str,
+    east: np.ndarray,
+    north: np.ndarray,
+    a: np.ndarray,
+    b: np.ndarray,
+    rng: np.random.Generator,
+    center: Tuple[float, float],
+) -> SyntheticGraph:
+    """Pasa metros a grados alrededor de center y duplica cada calle en ambos sentidos."""
+    lat0, lon0 = center
+    m_per_deg_lat = EARTH_RADIUS_M * math.pi / 180
+    m_per_deg_lon = m_per_deg_lat * math.cos(math.radians(lat0))
+    y = lat0 + (north - north.mean()) / m_per_deg_lat
+    x = lon0 + (east - east.mean()) / m_per_deg_lon
+
+    length = _great_circle_m(x[a], y[a], x[b], y[b]) * (1 + rng.uniform(0, MAX_DETOUR, len(a)))
+    maxspeed = rng.choice(np.array(MAXSPEEDS), size=len(a), p=MAXSPEED_WEIGHTS)
+
+    return SyntheticGraph(
+        kind=kind,
+        x=x,
+        y=y,
+        u=np.concatenate((a, b)),
+        v=np.concatenate((b, a)),
+        length=np.concatenate((length, length)),
+        maxspeed=np.concatenate((maxspeed, maxspeed)).astype(np.int64),
+    )
+
+
+def _great_circle_m(x1, y1, x2, y2) -> np.ndarray:
+    """Distancia haversine (metros) entre arreglos de puntos (lon, lat)."""
+    lat1, lat2 = np.radians(y1), np.radians(y2)
+    dlat = lat2 - lat1
+    dlon = np.radians(x2 - x1)
+    h = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(h))
+
+
+def place_chargers(
+    graph: SyntheticGraph,
+    spacing_m: float = 2000.0,
+    seed: int = 0,
+    max_chargers: Optional[int] = None,
+) -> List[int]:
+    """
+    Ubica cargadores repartidos en el plano: uno por celda de spacing_m x
+    spacing_m, en un nodo al azar de la celda.
+
+    Returns:
+        IDs de los nodos con cargador (en orden de celda)
+    """
+    rng = np.random.default_rng(seed)
+    m_per_deg_lat = EARTH_RADIUS_M * math.pi / 180
+    m_per_deg_lon = m_per_deg_lat * math.cos(math.radians(float(np.mean(graph.y))))
+    cell_x = np.floor((graph.x - graph.x.min()) * m_per_deg_lon / spacing_m).astype(np.int64)
+    cell_y = np.floor((graph.y - graph.y.min()) * m_per_deg_lat / spacing_m).astype(np.int64)
+    cell = cell_y * (int(cell_x.max()) + 1) + cell_x
+
+    # Orden al azar y después por celda: el primero de cada celda es uno al azar
+    shuffled = rng.permutation(graph.num_nodes)
+    order = shuffled[np.argsort(cell[shuffled], kind="stable")]
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = cell[order][1:] != cell[order][:-1]
+
+    chargers = order[first].tolist()
+    if max_chargers is not None:
+        chargers = chargers[:max_chargers]
+    return chargers
@@ -1,6 +1,11 @@
 """
 Punto de entrada principal del proyecto EV Routing.
 Ejecuta este archivo para acceder a todas las funcionalidades.
+
+Sin menú, para usar en un pipeline:
+    python main.py compare <corrida_base> <corrida_nueva>
+compara dos corridas del benchmark y termina con código 1 si hay regresiones
+(ver comparar_resultados.py).
 """
 
 import sys
@@ -18,10 +23,10 @@ if sys.stdout.encoding.lower() != 'utf-8':
         pass  # Python < 3.7 o entorno limitado
 
 
-def run_benchmark():
+def run_benchmark(workers=1):
     print("\nEjecutando benchmark completo...\n")
     import benchmark
-    benchmark.main()
+    benchmark.main(["--workers", str(workers)])
 
 
 def run_analysis():
@@ -46,8 +51,13 @@ def run_analysis():
     resultados_path = os.path.join(latest_dir, "resultados.json")
     
     if not os.path.exists(resultados_path):
-        print(f"No se encontró {resultados_path}")
-        return
+        # Corrida interrumpida: analizar lo que haya en el checkpoint
+        checkpoint_path = os.path.join(latest_dir, "resultados.jsonl")
+        if not os.path.exists(checkpoint_path):
+            print(f"No se encontró {resultados_path}")
+            return
+        print("La corrida no terminó; se analiza el checkpoint parcial.")
+        resultados_path = checkpoint_path
     
     print(f"Usando resultados desde: {latest_dir}\n")
     
@@ -56,6 +66,34 @@ def run_analysis():
     analizar_resultados.main()
 
 
+def run_compare(argv=None) -> int:
+    import os
+    import comparar_resultados
+
+    if argv is None:
+        # Desde el menú: elegir las dos corridas entre las existentes
+        output_dir = "output/benchmark_heuristicas"
+        subdirs = []
+        if os.path.exists(output_dir):
+            subdirs = sorted(
+                d for d in os.listdir(output_dir) if os.path.isdir(os.path.join(output_dir, d))
+            )
+        if len(subdirs) < 2:
+            print("Hacen falta al menos dos corridas del benchmark para comparar.")
+            return 1
+
+        base = questionary.select("Corrida base:", choices=subdirs).ask()
+        nueva = questionary.select(
+            "Corrida nueva:", choices=[d for d in subdirs if d != base]
+        ).ask()
+        if base is None or nueva is None:
+            return 1
+        argv = [os.path.join(output_dir, base), os.path.join(output_dir, nueva)]
+
+    print("\nComparando corridas...\n")
+    return comparar_resultados.main(argv)
+
+
 def run_battery_test():
     print("\nEjecutando test de visualización...\n")
     import test_battery_colors
@@ -71,7 +109,9 @@ def main():
             "Selecciona una opción:",
             choices=[
                 "Ejecutar benchmark completo (A* vs Greedy)",
+                "Ejecutar benchmark completo en paralelo (todos los núcleos)",
                 "Analizar resultados existentes",
+                "Comparar dos corridas (regresiones)",
                 "Test de visualización con colores de batería",
                 "Salir"
             ]
@@ -79,8 +119,12 @@ def main():
         
         if choice == "Ejecutar benchmark completo (A* vs Greedy)":
             run_benchmark()
+        elif choice == "Ejecutar benchmark completo en paralelo (todos los núcleos)":
+            run_benchmark(workers=0)
         elif choice == "Analizar resultados existentes":
             run_analysis()
+        elif choice == "Comparar dos corridas (regresiones)":
+            run_compare()
         elif choice == "Test de visualización con colores de batería":
             run_battery_test()
         elif choice == "Salir":
@@ -91,6 +135,8 @@ def main():
 
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "compare":
+        sys.exit(run_compare(sys.argv[2:]))
     try:
         main()
     except KeyboardInterrupt:
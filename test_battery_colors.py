@@ -1,5 +1,6 @@
 from graph.graph_setup import load_graph
 from graph.chargers_loader import get_charger_nodes
+from graph.compiled_graph import get_compiled_graph
 from graph.montevideo_barrios import get_nearest_node
 from algorithms.astar_battery_core import astar_battery
 from visualization.plotting import plot_graph
@@ -129,8 +130,9 @@ if result:
         # Colorear edge si existe
         if next_node in path_nodes:
             try:
-                edge = (node, next_node, 0)
                 if G_vis.has_edge(node, next_node):
+                    # La arista paralela que usó la búsqueda (la de menor energía)
+                    edge = (node, next_node, get_compiled_graph(G).multigraph_key(node, next_node))
                     style_path_edge_with_battery(G_vis, edge, max(0, battery_percent))
             except:
                 pass  # Si no existe el edge, continuar
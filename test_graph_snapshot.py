@@ -0,0 +1,102 @@
+"""
+Round-trip del snapshot del grafo (graph/graph_snapshot.py).
+
+Guarda un grafo, lo vuelve a cargar y verifica que sea igual al original:
+atributos del grafo, nodos y aristas con sus atributos (incluidos los de
+OSM que son listas o tuplas), geometrías y el orden de los vecinos, que
+determina el orden de expansión de las búsquedas.
+
+Uso:
+    python -m pytest test_graph_snapshot.py
+    python test_graph_snapshot.py
+"""
+
+import tempfile
+from pathlib import Path
+
+import networkx as nx
+from shapely.geometry import LineString
+
+from graph.graph_setup import load_graph
+from graph.graph_snapshot import load_snapshot, save_snapshot
+
+GAMMA = 1.2
+PLACE = "Ciudad Vieja, Montevideo, Uruguay"
+
+
+def make_graph():
+    """MultiDiGraph chico con la forma de la salida de load_graph."""
+    G = nx.MultiDiGraph(crs="epsg:4326", created_with="osmnx", simplified=True)
+    G.add_node(30, x=-56.21, y=-34.90, street_count=3, highway="traffic_signals")
+    G.add_node(10, x=-56.20, y=-34.91, street_count=2)
+    G.add_node(20, x=-56.19, y=-34.90, street_count=4, ref=("A", "B"))
+
+    edge = dict(length=120.5, weight=4.0, energy_cost=0.1446)
+    G.add_edge(
+        30, 10, key=0, osmid=[101, 102], name=("Sarandí", "Rincón"), highway="residential",
+        oneway=False, reversed=[False, True], lanes=["1", "2"],
+        geometry=LineString([(-56.21, -34.90), (-56.205, -34.905), (-56.20, -34.91)]), **edge,
+    )
+    G.add_edge(10, 30, key=0, osmid=[101, 102], name="Sarandí", oneway=False, reversed=True, **edge)
+    # Aristas paralelas, y vecinos en un orden que no es el de los IDs
+    G.add_edge(10, 20, key=0, osmid=103, highway="primary", maxspeed="45", **edge)
+    G.add_edge(10, 20, key=1, osmid=104, highway=["primary", "secondary"], **edge)
+    G.add_edge(20, 30, key=0, osmid=105, junction="roundabout", **edge)
+    G.add_edge(20, 10, key=0, osmid=106, **edge)
+    return G
+
+
+def assert_same_graph(G, H):
+    assert H.graph == G.graph
+    assert list(H.nodes) == list(G.nodes)
+    for node in G.nodes:
+        assert_same_attrs(G.nodes[node], H.nodes[node])
+        assert list(H.successors(node)) == list(G.successors(node))
+        # El snapshot guarda el orden de G.edges (sucesores), no el de los predecesores
+        assert set(H.predecessors(node)) == set(G.predecessors(node))
+
+    assert list(H.edges(keys=True)) == list(G.edges(keys=True))
+    for u, v, key, data in G.edges(keys=True, data=True):
+        assert_same_attrs(data, H.edges[u, v, key])
+
+
+def assert_same_attrs(expected, actual):
+    assert set(actual) == set(expected)
+    for name, value in expected.items():
+        if name == "geometry":
+            assert actual[name].equals_exact(value, 0)
+        else:
+            # type() para que una tupla no vuelva como lista
+            assert actual[name] == value and type(actual[name]) is type(value), name
+
+
+def roundtrip(G, directory):
+    path = Path(directory) / "graph.npz"
+    save_snapshot(G, path, PLACE, GAMMA)
+    return load_snapshot(path, PLACE, GAMMA)
+
+
+def test_snapshot_roundtrip(tmp_path):
+    G = make_graph()
+    assert_same_graph(G, roundtrip(G, tmp_path))
+
+
+def test_snapshot_matches_load_graph(tmp_path):
+    """El snapshot de la salida de load_graph la reproduce (necesita OSM o su caché)."""
+    try:
+        G = load_graph(PLACE, gamma=GAMMA, use_snapshot=False)
+    except Exception as e:
+        import pytest
+
+        pytest.skip(f"No se pudo descargar el grafo: {e}")
+    assert_same_graph(G, roundtrip(G, tmp_path))
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as directory:
+        test_snapshot_roundtrip(Path(directory))
+        print("OK snapshot de un grafo sintético")
+    with tempfile.TemporaryDirectory() as directory:
+        G = load_graph(PLACE, gamma=GAMMA, use_snapshot=False)
+        assert_same_graph(G, roundtrip(G, directory))
+        print(f"OK snapshot de load_graph({PLACE!r}): {len(G)} nodos")
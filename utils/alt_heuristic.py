@@ -0,0 +1,213 @@
+"""
+Heurística ALT (A*, Landmarks, desigualdad Triangular) para A*.
+
+Las heurísticas geométricas no ven la costa ni los pocos puentes: dos puntos
+cercanos en línea recta pueden estar lejos por la red. ALT usa distancias
+reales precalculadas desde y hacia K nodos de referencia (landmarks). Para
+un landmark L, la desigualdad triangular da dos cotas inferiores de la
+energía mínima de v a t:
+
+    d(L, t) - d(L, v)    y    d(v, L) - d(t, L)
+
+y la heurística es el máximo sobre todos los landmarks. Es admisible y
+consistente para la energía total consumida (con o sin recargas, la energía
+es la suma de energy_cost de las aristas recorridas).
+
+Las distancias se calculan con Dijkstra (SciPy) sobre energy_cost y se
+guardan en un .npy que se abre con mmap, junto a los snapshots del grafo.
+Como la heurística ya está en kWh, se usa con gamma_min=1.0.
+"""
+
+import json
+import os
+import weakref
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+from scipy.sparse.csgraph import dijkstra
+
+from graph.compiled_graph import CompiledGraph, get_compiled_graph
+from graph.graph_snapshot import SNAPSHOT_DIR
+
+ALT_VERSION = 1
+
+DEFAULT_NUM_LANDMARKS = 16
+
+
+def landmarks_path(G: CompiledGraph, num_landmarks: int, directory: str = SNAPSHOT_DIR) -> Path:
+    """Ruta del .npy de landmarks para este grafo (el nombre incluye su huella)."""
+    return Path(directory) / f"landmarks_{G.fingerprint()}_{num_landmarks}.npy"
+
+
+def select_landmarks(G: CompiledGraph, num_landmarks: int):
+    """
+    Elige landmarks por punto más lejano y calcula sus distancias.
+
+    El primero es el nodo más lejano (en energía) del nodo 0; cada siguiente
+    es el nodo alcanzable cuya distancia al landmark más cercano es máxima.
+    Así quedan repartidos en la periferia, que es donde dan mejores cotas.
+
+    Args:
+        G: Grafo compilado
+        num_landmarks: Cantidad de landmarks (K)
+
+    Returns:
+        Tupla (landmarks, distancias): índices de los landmarks y arreglo
+        (2, K, n) con distancias[0][l, v] = d(L, v) y distancias[1][l, v] = d(v, L)
+    """
+    forward = G.to_csr()
+    backward = G.to_csr(reverse=True)
+    n = G.num_nodes
+    k = min(num_landmarks, n)
+
+    distances = np.empty((2, k, n), dtype=np.float64)
+    landmarks: List[int] = []
+
+    from_start = dijkstra(forward, directed=True, indices=0)
+    candidate = int(np.argmax(np.where(np.isfinite(from_start), from_start, -1.0)))
+
+    closest = np.full(n, np.inf)
+    for i in range(k):
+        landmarks.append(candidate)
+        distances[0, i] = dijkstra(forward, directed=True, indices=candidate)
+        distances[1, i] = dijkstra(backward, directed=True, indices=candidate)
+
+        # Distancia de cada nodo al landmark más cercano (solo los alcanzables)
+        closest = np.minimum(closest, distances[0, i])
+        score = np.where(np.isfinite(closest), closest, -1.0)
+        score[landmarks] = -1.0
+        candidate = int(np.argmax(score))
+
+    return landmarks, distances
+
+
+def load_or_build_landmarks(
+    G: CompiledGraph,
+    num_landmarks: int = DEFAULT_NUM_LANDMARKS,
+    directory: Optional[str] = SNAPSHOT_DIR,
+) -> np.ndarray:
+    """
+    Devuelve el arreglo (2, K, n) de distancias de landmarks del grafo.
+
+    Si existe un .npy para este grafo y K se abre con mmap (solo lectura);
+    si no, se calcula y se guarda (directory=None para no usar disco).
+    """
+    if directory is None:
+        return select_landmarks(G, num_landmarks)[1]
+
+    path = landmarks_path(G, num_landmarks, directory)
+    meta_path = path.with_suffix(".json")
+
+    if path.exists() and meta_path.exists():
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if (
+                meta.get("version") == ALT_VERSION
+                and meta.get("graph_fingerprint") == G.fingerprint()
+            ):
+                distances = np.load(path, mmap_mode="r")
+                if distances.shape[2] == G.num_nodes:
+                    return distances
+        except (OSError, ValueError):
+            pass
+
+    landmarks, distances = select_landmarks(G, num_landmarks)
+
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp.npy")
+        np.save(tmp_path, distances)
+        os.replace(tmp_path, path)
+        with open(meta_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "version": ALT_VERSION,
+                    "graph_fingerprint": G.fingerprint(),
+                    "landmarks": [G.node_id(i) for i in landmarks],
+                },
+                f,
+            )
+    except OSError:
+        pass
+
+    return distances
+
+
+class LandmarkHeuristic:
+    """
+    Heurística ALT con la interfaz de heuristic_func: h(G, nodo, destino).
+
+    Las tablas de landmarks se cargan (o calculan) la primera vez que se usa
+    con un grafo, y la cota de todos los nodos se calcula una vez por
+    destino; cada consulta es después una búsqueda O(1). Devuelve kWh, así
+    que va con gamma_min=1.0.
+
+    Args:
+        num_landmarks: Cantidad de landmarks (K)
+        directory: Carpeta donde se guardan las tablas (None = solo memoria)
+    """
+
+    def __init__(
+        self,
+        num_landmarks: int = DEFAULT_NUM_LANDMARKS,
+        directory: Optional[str] = SNAPSHOT_DIR,
+    ):
+        self.num_landmarks = num_landmarks
+        self.directory = directory
+        self.__name__ = "alt"
+
+        self._graph_ref: Optional[weakref.ref] = None
+        self._compiled_ref: Optional[weakref.ref] = None
+        self._distances: Optional[np.ndarray] = None
+        self._node_index = None
+        self._dest = None
+        self._values: List[float] = []
+
+    def __call__(self, G, node, dest) -> float:
+        if dest != self._dest or self._graph_ref is None or self._graph_ref() is not G:
+            self.precompute(G, dest)
+        return self._values[self._node_index[node]]
+
+    def prepare(self, G) -> None:
+        """Carga o calcula las tablas de landmarks de G (antes de un fork, por ejemplo)."""
+        compiled = get_compiled_graph(G)
+        # Misma compilación: las tablas siguen valiendo (una recompilación,
+        # ver invalidate_compiled_graph, da otro objeto)
+        if self._compiled_ref is not None and self._compiled_ref() is compiled:
+            return
+        self._distances = load_or_build_landmarks(compiled, self.num_landmarks, self.directory)
+        self._node_index = compiled.node_index
+        self._graph_ref = weakref.ref(G)
+        self._compiled_ref = weakref.ref(compiled)
+        self._dest = None
+
+    def precompute(self, G, dest) -> np.ndarray:
+        """
+        Calcula la cota ALT de todos los nodos hacia dest (en kWh).
+
+        Returns:
+            Arreglo con el valor de cada nodo, en el orden de índices del
+            CompiledGraph (inf si el nodo no puede llegar a dest)
+        """
+        self.prepare(G)
+        t = self._node_index[dest]
+        from_landmark = self._distances[0]
+        to_landmark = self._distances[1]
+
+        with np.errstate(invalid="ignore"):
+            # d(L, t) - d(L, v) y d(v, L) - d(t, L); inf - inf (NaN) no aporta cota
+            bound_from = from_landmark[:, t:t + 1] - from_landmark
+            bound_to = to_landmark - to_landmark[:, t:t + 1]
+            bounds = np.fmax(bound_from, bound_to)
+        bounds[np.isnan(bounds)] = 0.0
+        values = np.maximum(bounds.max(axis=0), 0.0)
+
+        self._dest = dest
+        # Lista de floats nativos: indexarla es más rápido que un arreglo NumPy
+        self._values = values.tolist()
+        return values
+
+
+alt_heuristic = LandmarkHeuristic()
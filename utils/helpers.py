@@ -2,21 +2,41 @@
 
 from typing import Dict, List, Set, Tuple
 
+from graph.compiled_graph import CompiledGraph
+
+# Paso de discretización de la batería por defecto (kWh por unidad)
+BATTERY_STEP = 0.1
+
+
+def node_coords(G, node) -> Tuple[float, float]:
+    """
+    Devuelve las coordenadas (x, y) de un nodo.
+
+    Acepta tanto un grafo de NetworkX como un CompiledGraph (en ese caso el
+    nodo es el ID original y se traduce a su índice interno).
+    """
+    if isinstance(G, CompiledGraph):
+        xs, ys = G.coords()
+        i = G.node_index[node]
+        return xs[i], ys[i]
+    data = G.nodes[node]
+    return data["x"], data["y"]
+
 
 def euclidean_distance(G, node1, node2):
     """
     Calcula la distancia euclidiana entre dos nodos.
 
     Args:
-        G: Grafo de NetworkX
+        G: Grafo de NetworkX o CompiledGraph
         node1: Primer nodo
         node2: Segundo nodo
 
     Returns:
         Distancia euclidiana entre los nodos
     """
-    x1, y1 = G.nodes[node1]["x"], G.nodes[node1]["y"]
-    x2, y2 = G.nodes[node2]["x"], G.nodes[node2]["y"]
+    x1, y1 = node_coords(G, node1)
+    x2, y2 = node_coords(G, node2)
     return ((x2 - x1) ** 2 + (y2 - y1) ** 2) ** 0.5
 
 
@@ -25,8 +45,8 @@ def manhattan_distance(G, node1, node2):
     Calcula la distancia de Manhattan entre dos nodos.
     Suma de las diferencias absolutas en x e y.
     """
-    x1, y1 = G.nodes[node1]["x"], G.nodes[node1]["y"]
-    x2, y2 = G.nodes[node2]["x"], G.nodes[node2]["y"]
+    x1, y1 = node_coords(G, node1)
+    x2, y2 = node_coords(G, node2)
     return abs(x2 - x1) + abs(y2 - y1)
 
 
@@ -35,8 +55,8 @@ def octile_distance(G, node1, node2):
     Distancia octil: permite movimientos diagonales.
     Optimizada para grids con movimiento en 8 direcciones.
     """
-    x1, y1 = G.nodes[node1]["x"], G.nodes[node1]["y"]
-    x2, y2 = G.nodes[node2]["x"], G.nodes[node2]["y"]
+    x1, y1 = node_coords(G, node1)
+    x2, y2 = node_coords(G, node2)
     dx = abs(x2 - x1)
     dy = abs(y2 - y1)
     return max(dx, dy) + (2**0.5 - 1) * min(dx, dy)
@@ -136,11 +156,50 @@ def reconstruct_path_with_battery(
     return path_with_battery
 
 
-def discretize_battery(battery: float, step: float = 0.1) -> float:
+def reconstruct_packed_path(
+    came_from,
+    current_state: int,
+    levels: int,
+    charger_set: Set[int],
+) -> List[Tuple[int, int, bool]]:
     """
-    Discretiza el nivel de batería para reducir espacio de estados.
-    
-    Step=0.1 proporciona suficiente granularidad para baterías pequeñas (~3 kWh)
-    sin explotar el espacio de estados.
+    Reconstruye el camino de una búsqueda con estados empaquetados.
+
+    Cada estado es el entero nodo * levels + unidades_de_batería y
+    came_from[estado] es el estado anterior (-1 en el origen).
+
+    Args:
+        came_from: Arreglo de predecesores indexado por estado
+        current_state: Estado final
+        levels: Cantidad de niveles de batería (unidades posibles)
+        charger_set: Conjunto de índices de nodos con cargadores
+
+    Returns:
+        Lista de tuplas (índice_nodo, unidades, recargó_aquí) desde origen a destino
+    """
+    steps = []
+    state = current_state
+    while state != -1:
+        node, units = divmod(state, levels)
+        prev_state = came_from[state]
+        recharged = False
+        if prev_state != -1:
+            prev_node, prev_units = divmod(prev_state, levels)
+            # Mismo nodo con más batería = RECARGA
+            recharged = prev_node == node and units > prev_units and node in charger_set
+        steps.append((node, units, recharged))
+        state = prev_state
+
+    steps.reverse()
+    return steps
+
+
+def battery_to_units(battery: float, step: float = BATTERY_STEP) -> int:
+    """
+    Convierte kWh a unidades enteras de batería (redondeo al más cercano).
+
+    Los núcleos de búsqueda guardan la batería como un entero de unidades
+    de step kWh: las claves de estado son enteros exactos y no floats como
+    0.30000000000000004.
     """
-    return round(battery / step) * step
+    return int(battery / step + 0.5)
@@ -0,0 +1,51 @@
+"""Lectura y escritura de checkpoints JSONL (un registro JSON por línea)."""
+
+import json
+import os
+from typing import Any, Dict, Iterator
+
+
+def iter_jsonl_records(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Recorre un archivo JSONL registro por registro, sin cargarlo entero.
+
+    Una última línea incompleta (el proceso se cortó a mitad de escritura)
+    se ignora.
+
+    Args:
+        path: Ruta al archivo .jsonl
+
+    Yields:
+        Cada registro como diccionario
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.endswith("\n"):
+                return
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def repair_jsonl(path: str) -> None:
+    """
+    Trunca una línea final incompleta para poder seguir agregando registros.
+    """
+    with open(path, "rb+") as f:
+        data = f.read()
+        if not data or data.endswith(b"\n"):
+            return
+        f.truncate(data.rfind(b"\n") + 1)
+
+
+def append_jsonl_record(f, record: Dict[str, Any]) -> None:
+    """
+    Agrega un registro a un archivo JSONL abierto en modo append y lo fuerza a disco.
+
+    Args:
+        f: Archivo abierto con open(path, "a", encoding="utf-8")
+        record: Registro a guardar
+    """
+    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    f.flush()
+    os.fsync(f.fileno())
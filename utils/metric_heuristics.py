@@ -0,0 +1,123 @@
+"""
+Heurísticas métricas (en kilómetros) para A*.
+
+euclidean_distance, manhattan_distance y octile_distance (utils/helpers.py)
+miden en grados de longitud/latitud. Multiplicadas por gamma_min (kWh/km)
+dan una cota unas 100 veces menor que la energía real, y A* se comporta casi
+como Dijkstra.
+
+Estas heurísticas proyectan las coordenadas a kilómetros con una escala
+equirectangular: 1° de latitud = R·π/180 km y 1° de longitud = eso mismo
+por cos(lat). Para que la heurística euclidiana sea admisible se usa el
+cos(lat) del nodo con mayor |latitud| del grafo (la escala más chica) y un
+margen de 0.1% que cubre la diferencia con la distancia de gran círculo.
+El largo de cada arista (OSMnx, haversine sobre la geometría) nunca es menor
+que esa distancia, así que con gamma_min <= gamma la cota no sobreestima.
+
+Manhattan y octile en km pueden superar a la euclidiana (hasta √2 y
+√(4 - 2√2) ≈ 1.082 veces, en diagonal): se dividen por ese factor máximo
+(NORM_SCALE) para que nunca la superen y sean admisibles. Como son normas,
+también son consistentes.
+
+Cada heurística calcula, una vez por destino, un arreglo con el valor para
+todos los nodos; después cada consulta es una búsqueda O(1).
+"""
+
+import math
+import weakref
+from typing import List, Optional
+
+import numpy as np
+
+from graph.compiled_graph import get_compiled_graph
+
+# Radio medio de la Tierra (el mismo que usa OSMnx para calcular "length")
+EARTH_RADIUS_KM = 6371.009
+
+KM_PER_DEGREE = EARTH_RADIUS_KM * math.pi / 180
+
+# Margen para que la aproximación equirectangular quede por debajo del gran círculo
+SAFETY_FACTOR = 0.999
+
+# Máximo de norma / euclidiana: dividir por esto deja cada norma por debajo
+# de la distancia euclidiana (y por lo tanto admisible)
+NORM_SCALE = {
+    "euclidean": 1.0,
+    "manhattan": 2**0.5,
+    "octile": (4 - 2 * 2**0.5) ** 0.5,
+}
+
+
+class MetricHeuristic:
+    """
+    Heurística en km con valores precalculados por destino.
+
+    Se usa como cualquier heuristic_func: h(G, nodo, destino). La primera
+    llamada con un (grafo, destino) nuevo calcula el arreglo de todos los
+    nodos con NumPy; las siguientes solo lo indexan.
+
+    Args:
+        kind: "euclidean", "manhattan" u "octile"
+    """
+
+    KINDS = ("euclidean", "manhattan", "octile")
+
+    def __init__(self, kind: str = "euclidean"):
+        if kind not in self.KINDS:
+            raise ValueError(f"Heurística desconocida: {kind}")
+        self.kind = kind
+        # Nombre como el de las funciones de helpers (lo usa benchmark.py)
+        self.__name__ = f"{kind}_km"
+
+        self._graph_ref: Optional[weakref.ref] = None
+        self._dest = None
+        self._node_index = None
+        self._values: List[float] = []
+
+    def __call__(self, G, node, dest) -> float:
+        if dest != self._dest or self._graph_ref is None or self._graph_ref() is not G:
+            self.precompute(G, dest)
+        return self._values[self._node_index[node]]
+
+    def precompute(self, G, dest) -> np.ndarray:
+        """
+        Calcula la heurística de todos los nodos hacia dest (en km).
+
+        Args:
+            G: Grafo de NetworkX o CompiledGraph
+            dest: Nodo destino (ID original)
+
+        Returns:
+            Arreglo con el valor de cada nodo, en el orden de índices del
+            CompiledGraph
+        """
+        compiled = get_compiled_graph(G)
+        d = compiled.node_index[dest]
+
+        # cos(lat) más chico del grafo: escala este-oeste conservadora
+        max_abs_lat = float(np.max(np.abs(compiled.y))) if compiled.num_nodes else 0.0
+        kx = KM_PER_DEGREE * math.cos(math.radians(max_abs_lat)) * SAFETY_FACTOR
+        ky = KM_PER_DEGREE * SAFETY_FACTOR
+
+        dx = np.abs(compiled.x - compiled.x[d]) * kx
+        dy = np.abs(compiled.y - compiled.y[d]) * ky
+
+        if self.kind == "euclidean":
+            values = np.hypot(dx, dy)
+        elif self.kind == "manhattan":
+            values = dx + dy
+        else:
+            values = np.maximum(dx, dy) + (2**0.5 - 1) * np.minimum(dx, dy)
+        values = values / NORM_SCALE[self.kind]
+
+        self._graph_ref = weakref.ref(G)
+        self._dest = dest
+        self._node_index = compiled.node_index
+        # Lista de floats nativos: indexarla es más rápido que un arreglo NumPy
+        self._values = values.tolist()
+        return values
+
+
+euclidean_km = MetricHeuristic("euclidean")
+manhattan_km = MetricHeuristic("manhattan")
+octile_km = MetricHeuristic("octile")